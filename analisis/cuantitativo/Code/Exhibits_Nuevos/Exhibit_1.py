@@ -1,68 +1,152 @@
 # Ajuste menor del eje Y izquierdo para precisión de definición ENIF
+import os
+import textwrap
+
 import matplotlib.pyplot as plt
 import numpy as np
-import os
 
-sistemas = ["CoDi", "DiMo"]
-conocimiento = np.array([38.0, 18.5])
-uso = np.array([12.8, 6.8])
-activacion_millones = np.array([18.6, 5.28])
-conv = np.round(uso / conocimiento * 100, 1)
-
-x = np.arange(len(sistemas))
-width = 0.22
-
-fig, ax_left = plt.subplots(figsize=(12, 7), dpi=300)
-
-bars_con = ax_left.bar(x - width, conocimiento, width, label="Conocimiento (%)")
-bars_uso = ax_left.bar(x, uso, width, label="Uso activo (≥1 vez) entre quienes conocen (%)", hatch='//', edgecolor='black')
-
-ax_left.set_ylabel("Porcentaje (ENIF 2024)", fontsize=13)
-ax_left.set_xticks(x, sistemas, fontsize=12)
-ax_left.set_ylim(0, max(conocimiento.max(), uso.max()) * 1.35)
-ax_left.grid(True, axis='y', linestyle='--', alpha=0.35)
-ax_left.spines['top'].set_visible(False); ax_left.spines['right'].set_visible(False)
-
-ax_right = ax_left.twinx()
-bars_act = ax_right.bar(x + width, activacion_millones, width, label="Activación (proxy, millones)")
-ax_right.set_ylabel("Activación (millones de usuarios/cuentas)", fontsize=13)
-ax_right.set_ylim(0, activacion_millones.max() * 1.5)
-ax_right.spines['top'].set_visible(False)
-
-plt.title("Embudo de adopción: Conocimiento, Activación y Uso (México, 2024)", fontsize=16, pad=12)
-
-def label_bars(bars, fmt="{:.1f}%"):
-    for b in bars:
-        val = b.get_height()
-        ax = b.axes
-        ax.text(b.get_x() + b.get_width()/2, val + (ax.get_ylim()[1] * 0.02),
-                fmt.format(val), ha='center', va='bottom', fontsize=12)
-
-label_bars(bars_con, "{:.1f}%")
-label_bars(bars_uso, "{:.1f}%")
-
-for b in bars_act:
-    ax_right.text(b.get_x() + b.get_width()/2, b.get_height() + (ax_right.get_ylim()[1] * 0.02),
-                  f"{b.get_height():.2f} M", ha='center', va='bottom', fontsize=12)
-
-for xi, c in zip(x, conv):
-    ax_left.annotate(f"Tasa de conversión: {c:.1f}%",
-                     xy=(xi, uso[list(x).index(xi)]), xycoords='data',
-                     xytext=(xi, ax_left.get_ylim()[1]*0.80), textcoords='data',
-                     ha='center', va='center', fontsize=12,
+from toolkit.bootstrap import funnel_bootstrap
+from toolkit.datasets import dataset_files, get_dataset
+from toolkit.export import flush
+from toolkit.figures import subplots
+from toolkit.labels import LabelLayout
+from toolkit.microdata import ENIF_FUNNEL, get_survey, survey_files
+from toolkit.registry import exhibit
+from toolkit.variants import VariantSpec, render_variants, variant_matrix
+
+
+# Textos por idioma (toolkit.variants): el español es el original y el respaldo
+TEXTS_1 = {
+    "title": {"es": "Embudo de adopción: Conocimiento, Activación y Uso (México, 2024)",
+              "en": "Adoption funnel: Awareness, Activation and Use (Mexico, 2024)"},
+    "conocimiento": {"es": "Conocimiento (%)", "en": "Awareness (%)"},
+    "uso": {"es": "Uso activo (≥1 vez, % de adultos)",
+            "en": "Active use (≥1 time, % of adults)"},
+    "activacion": {"es": "Activación (proxy, millones)", "en": "Activation (proxy, millions)"},
+    "ylabel_left": {"es": "Porcentaje (ENIF 2024)", "en": "Percent (ENIF 2024)"},
+    "ylabel_right": {"es": "Activación (millones de usuarios/cuentas)",
+                     "en": "Activation (millions of users/accounts)"},
+    "conversion": {"es": "Tasa de conversión: {c:.1f}%", "en": "Conversion rate: {c:.1f}%"},
+    "conversion_ic": {"es": "Tasa de conversión: {c:.1f}%\n(IC {nivel:.0%}: {lo:.1f}–{hi:.1f})",
+                      "en": "Conversion rate: {c:.1f}%\n({nivel:.0%} CI: {lo:.1f}–{hi:.1f})"},
+    "nota_ic": {"es": "Barras de error: IC {nivel:.0%} bootstrap ponderado por factor de expansión "
+                      "({replicas:,} réplicas, {n:,} entrevistados)",
+                "en": "Error bars: {nivel:.0%} CI, bootstrap weighted by expansion factors "
+                      "({replicas:,} replicates, {n:,} respondents)"},
+}
+
+
+def prepare_exhibit_1():
+    # Data/embudo_enif.csv (ENIF 2024); la conversión uso/conocimiento viene precalculada.
+    # Con los microdatos en Data/microdatos/enif_2024.csv, conocimiento, uso y conversión se calculan
+    # de ellos, con intervalos bootstrap (toolkit.bootstrap) que se dibujan como barras de error.
+    embudo = get_dataset("embudo_enif")
+    conocimiento, uso, conv, ic = embudo.conocimiento, embudo.uso, embudo.conv, None
+    if survey_files("enif_2024"):
+        ic = funnel_bootstrap(get_survey("enif_2024"), {name: ENIF_FUNNEL[name] for name in embudo.sistemas})
+        conocimiento = np.round(ic.estimate("conocimiento"), 1)
+        uso = np.round(ic.estimate("uso"), 1)
+        conv = np.round(ic.estimate("conversion"), 1)
+    return {"sistemas": list(embudo.sistemas), "conocimiento": conocimiento, "uso": uso,
+            "activacion_millones": embudo.activacion_millones, "conv": conv, "ic": ic}
+
+
+def draw_exhibit_1(data, t, figsize):
+    sistemas = data["sistemas"]
+    conocimiento = data["conocimiento"]
+    uso = data["uso"]
+    activacion_millones = data["activacion_millones"]
+    conv = data["conv"]
+    ic = data.get("ic")
+
+    x = np.arange(len(sistemas))
+    width = 0.22
+
+    fig, ax_left = subplots(figsize=figsize, dpi=300)
+
+    err_con = ic.yerr("conocimiento") if ic else None
+    err_uso = ic.yerr("uso") if ic else None
+    error_kw = dict(ecolor='black', elinewidth=1, capsize=4)
+    bars_con = ax_left.bar(x - width, conocimiento, width, label=t("conocimiento"), yerr=err_con, error_kw=error_kw)
+    bars_uso = ax_left.bar(x, uso, width, label=t("uso"), hatch='//', edgecolor='black', yerr=err_uso,
+                           error_kw=error_kw)
+
+    ax_left.set_ylabel(t("ylabel_left"), fontsize=13)
+    ax_left.set_xticks(x, sistemas, fontsize=12)
+    # La anotación con intervalo ocupa dos líneas: más margen para que no tape las etiquetas
+    ax_left.set_ylim(0, max(conocimiento.max(), uso.max()) * (1.5 if ic else 1.35))
+    ax_left.grid(True, axis='y', linestyle='--', alpha=0.35)
+    ax_left.spines['top'].set_visible(False); ax_left.spines['right'].set_visible(False)
+
+    ax_right = ax_left.twinx()
+    bars_act = ax_right.bar(x + width, activacion_millones, width, label=t("activacion"))
+    ax_right.set_ylabel(t("ylabel_right"), fontsize=13)
+    ax_right.set_ylim(0, activacion_millones.max() * 1.5)
+    ax_right.spines['top'].set_visible(False)
+
+    # El título se parte en líneas en figuras angostas (variante cuadrada)
+    plt.title(textwrap.fill(t("title"), width=max(40, int(figsize[0] * 6.5))), fontsize=16, pad=12)
+
+    handles1, labels1 = ax_left.get_legend_handles_labels()
+    handles2, labels2 = ax_right.get_legend_handles_labels()
+    plt.legend(handles1 + handles2, labels1 + labels2, loc='upper right', fontsize=11, frameon=False)
+
+    if ic:
+        ax_left.set_xlabel(textwrap.fill(t("nota_ic", nivel=ic.level, replicas=ic.replicates, n=ic.respondents),
+                                         width=max(60, int(figsize[0] * 11))), fontsize=10, color='dimgray')
+
+    plt.tight_layout()
+
+    # Etiquetas de valor (con intervalos, sobre la barra de error) y callouts de
+    # conversión colocados sin traslapes (toolkit.labels): primero el eje derecho,
+    # cuyas etiquetas pasan a ser obstáculos del izquierdo.
+    right = LabelLayout(ax_right).add_obstacles(ax_left)
+    right.value_labels(bars_act, [f"{v:.2f} M" for v in activacion_millones], fontsize=12)
+    right.place()
+
+    ends_con = conocimiento + err_con[1] if ic else conocimiento
+    ends_uso = uso + err_uso[1] if ic else uso
+    left = LabelLayout(ax_left).add_obstacles(ax_right)
+    for xi, end, v in zip(x - width, ends_con, conocimiento):
+        left.value_label((xi, end), f"{v:.1f}%", fontsize=12)
+    for xi, end, v in zip(x, ends_uso, uso):
+        left.value_label((xi, end), f"{v:.1f}%", fontsize=12)
+    for xi, end, c, sistema in zip(x, ends_uso, conv, sistemas):
+        if ic:
+            _, lo, hi = ic.interval(sistema, "conversion")
+            texto = t("conversion_ic", c=c, lo=lo, hi=hi, nivel=ic.level)
+        else:
+            texto = t("conversion", c=c)
+        # Primero en vertical sobre la barra de uso (donde iba a mano), cada vez más arriba
+        left.callout(texto, xy=(xi, end), offsets=[(0, dy) for dy in range(30, 400, 10)], fontsize=12,
+                     multialignment='center',
                      bbox=dict(boxstyle='round,pad=0.3', fc='white', ec='gray', lw=1),
-                     arrowprops=dict(arrowstyle='->', lw=1, connectionstyle='angle3,angleA=0,angleB=90'))
+                     arrowprops=dict(arrowstyle='->', lw=1))
+    left.place()
+    return fig
+
+
+EMBUDO_1 = VariantSpec("embudo-1", "Exhibit1_Embudo_Conocimiento_Activacion_Uso", prepare=prepare_exhibit_1,
+                       draw=draw_exhibit_1, figsize=(12, 7), texts=TEXTS_1)
+
+
+@exhibit("1", "Embudo de adopción: Conocimiento, Activación y Uso",
+         inputs=dataset_files("embudo_enif") + survey_files("enif_2024"))
+def build_exhibit_1():
+    paths = render_variants(EMBUDO_1, [EMBUDO_1.base])
+
+    for path in paths:
+        print(f"{os.path.splitext(path)[1][1:].upper()} guardado en: {path}")
+    return paths
 
-handles1, labels1 = ax_left.get_legend_handles_labels()
-handles2, labels2 = ax_right.get_legend_handles_labels()
-plt.legend(handles1 + handles2, labels1 + labels2, loc='upper right', fontsize=11, frameon=False)
 
-plt.tight_layout()
+# Copias en inglés, 16:9 para diapositivas y cuadradas, para web y miniaturas, desde la misma definición
+@exhibit("1-variantes", "Embudo de adopción — variantes (idioma × tamaño × medio)",
+         inputs=dataset_files("embudo_enif") + survey_files("enif_2024"))
+def build_exhibit_1_variantes():
+    return render_variants(EMBUDO_1, variant_matrix(("es", "en"), ("report", "slide", "square"), ("web", "thumb")))
 
-png_path = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit1_Embudo_Conocimiento_Activacion_Uso.png"
-svg_path = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit1_Embudo_Conocimiento_Activacion_Uso.svg"
-plt.savefig(png_path, dpi=300, bbox_inches='tight')
-plt.savefig(svg_path, bbox_inches='tight')
 
-print(f"PNG guardado en: {png_path}")
-print(f"SVG guardado en: {svg_path}")
+if __name__ == "__main__":
+    build_exhibit_1()
+    flush()
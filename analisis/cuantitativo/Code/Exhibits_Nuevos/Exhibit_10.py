@@ -1,9 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
-# === Toolkit de estilo “board-ready” ===
-import matplotlib.pyplot as plt
+from toolkit.adoption import fit_curves
+from toolkit.datasets import dataset_files, get_dataset
+from toolkit.downsample import plot_decimated
+from toolkit.export import export_figure, flush
+from toolkit.figures import subplots
+from toolkit.labels import LabelLayout
+from toolkit.paths import OUTPUT_DIR
+from toolkit.registry import exhibit
 
+# === Toolkit de estilo “board-ready” ===
 PALETTE = {
     "pix": "#FFC107",     # amarillo (Pix)
     "mx": "#005B9A",      # azul (México: CoDi/DiMo)
@@ -23,63 +29,87 @@ def apply_board_style(ax, title, xlabel, ylabel):
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
 
-def annotate_box(ax, text, xy, xytext, color, fontsize=11):
-    ax.annotate(
-        text, xy=xy, xytext=xytext,
+def annotate_box(layout, text, xy, color, fontsize=11):
+    # La posición la elige LabelLayout (toolkit.labels): sin tapar curvas, textos ni leyenda.
+    layout.callout(
+        text, xy=xy,
         arrowprops=dict(arrowstyle='->', color=color, lw=1.2),
         bbox=dict(boxstyle='round,pad=0.3', fc='white', ec=color, alpha=0.9),
         fontsize=fontsize, color=color
     )
 
-def export_fig(fig, filename_base, output_dir="output"):
+def export_fig(fig, filename_base, output_dir=OUTPUT_DIR):
     """
-    Guarda la figura en formatos PNG y SVG en el directorio especificado.
+    Guarda la figura en formatos PNG y SVG en el directorio especificado
+    y devuelve las rutas escritas (ver ``toolkit.export.export_figure``).
     """
-    import os
-    # Crear directorio de salida si no existe
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Ruta completa del archivo
-    base_path = os.path.join(output_dir, filename_base)
-    
-    # Guardar en ambos formatos
     fig.tight_layout()
-    fig.savefig(f"{base_path}.png", dpi=300, bbox_inches="tight")
-    fig.savefig(f"{base_path}.svg", bbox_inches="tight")
+    paths = export_figure(fig, filename_base, output_dir=output_dir)
     print(f"Gráficos guardados en: {output_dir}/")
+    return paths
+
+
+# Datos (meses desde lanzamiento → usuarios activos en millones): Data/adopcion.csv
+# CoDi: Sep-2019 → Mar-2020 (~6m) → Sep-2023 (~48m), “≥1 pago” (proxy de usuario activo alguna vez)
 
+# Curvas ajustadas (difusión de Bass: parte de 0 en el lanzamiento). Las líneas pasan por
+# toolkit.downsample: con series diarias o intradía se diezman al ancho del eje en píxeles.
+ADOPTION_MODEL = "bass"
+CURVE_MONTHS = np.linspace(0, 48, 241)
 
-# Datos (meses desde lanzamiento → usuarios activos en millones)
-pix_months  = np.array([0, 6, 12, 24, 48])
-pix_users_m = np.array([0, 67, 107, 133, 160.5])
 
-codi_months  = np.array([0, 6, 48])      # Sep-2019 → Mar-2020 (~6m) → Sep-2023 (~48m)
-codi_users_m = np.array([0, 0.11, 1.6])  # “≥1 pago” (proxy de usuario activo alguna vez)
+@exhibit("10", "Trayectorias de adopción — Pix vs CoDi", inputs=dataset_files("adopcion"))
+def build_exhibit_10():
+    adopcion = get_dataset("adopcion")
+    pix_months, pix_users_m = adopcion["pix"].months, adopcion["pix"].users_m
+    codi_months, codi_users_m = adopcion["codi"].months, adopcion["codi"].users_m
+    pix_fit, codi_fit = fit_curves([(pix_months, pix_users_m), (codi_months, codi_users_m)], ADOPTION_MODEL)
 
-fig, ax = plt.subplots(figsize=(12, 7))
+    fig, ax = subplots(figsize=(12, 7))
 
-# Pix (línea protagonista)
-ax.plot(pix_months, pix_users_m, color=PALETTE["pix"], linewidth=3.5, marker='o', label="Pix (Brasil)")
+    # Pix (línea protagonista): curva ajustada, banda al 95% y puntos observados
+    lo, hi = pix_fit.band(CURVE_MONTHS)
+    ax.fill_between(CURVE_MONTHS, lo, hi, color=PALETTE["pix"], alpha=0.2, linewidth=0)
+    plot_decimated(ax, CURVE_MONTHS, pix_fit.curve(CURVE_MONTHS), color=PALETTE["pix"], linewidth=3.5,
+                   label="Pix (Brasil)")
+    ax.plot(pix_months, pix_users_m, color=PALETTE["pix"], linestyle='none', marker='o')
 
-# México (serie secundaria)
-ax.plot(codi_months, codi_users_m, color=PALETTE["mx"], linewidth=2.5, marker='o', label="CoDi (México, ≥1 pago)")
+    # México (serie secundaria); con 3 puntos no hay grados de libertad para banda
+    lo, hi = codi_fit.band(CURVE_MONTHS)
+    if np.isfinite(lo).all():
+        ax.fill_between(CURVE_MONTHS, lo, hi, color=PALETTE["mx"], alpha=0.2, linewidth=0)
+    plot_decimated(ax, CURVE_MONTHS, codi_fit.curve(CURVE_MONTHS), color=PALETTE["mx"], linewidth=2.5,
+                   label="CoDi (México, ≥1 pago)")
+    ax.plot(codi_months, codi_users_m, color=PALETTE["mx"], linestyle='none', marker='o')
+
+    # Estilo y ejes
+    apply_board_style(
+        ax,
+        title="Trayectorias de adopción — Pix escala en meses; México no cruza 2 M en 4 años",
+        xlabel="Meses desde el lanzamiento",
+        ylabel="Usuarios activos (millones)"
+    )
+    ax.set_xlim(0, 48); ax.set_ylim(0, 170)
+    ax.set_xticks([0, 6, 12, 24, 36, 48])
+
+    ax.legend(loc="upper left", fontsize=12)
+    fig.tight_layout()
 
-# Estilo y ejes
-apply_board_style(
-    ax,
-    title="Trayectorias de adopción — Pix escala en meses; México no cruza 2 M en 4 años",
-    xlabel="Meses desde el lanzamiento",
-    ylabel="Usuarios activos (millones)"
-)
-ax.set_xlim(0, 48); ax.set_ylim(0, 170)
-ax.set_xticks([0, 6, 12, 24, 36, 48])
+    # Anotaciones clave: señalan los puntos observados (no la curva ajustada) y salen de los datos
+    pix_obs = dict(zip(pix_months.tolist(), pix_users_m.tolist()))
+    codi_obs = dict(zip(codi_months.tolist(), codi_users_m.tolist()))
+    layout = LabelLayout(ax)
+    annotate_box(layout, f"~{pix_obs[24]:g} M en 24 meses (observado)", xy=(24, pix_obs[24]), color=PALETTE["pix"])
+    annotate_box(layout, f"≈{pix_obs[48]:g} M en 48 meses (observado)", xy=(48, pix_obs[48]), color=PALETTE["pix"])
+    annotate_box(layout, f"~{codi_obs[6]:g} M (6 meses, observado)\nCoDi con ≥1 pago", xy=(6, codi_obs[6]),
+                 color=PALETTE["mx"])
+    annotate_box(layout, f"≤{codi_obs[48]:g} M (48 meses, observado)\nCoDi con ≥1 pago", xy=(48, codi_obs[48]),
+                 color=PALETTE["mx"])
+    layout.place()
 
-# Anotaciones clave
-annotate_box(ax, "~133 M en 24 meses", xy=(24, 133), xytext=(28, 120), color=PALETTE["pix"])
-annotate_box(ax, "≈160.5 M en 48 meses", xy=(48, 160.5), xytext=(33, 150), color=PALETTE["pix"])
-annotate_box(ax, "~0.11 M (6 meses)\nCoDi con ≥1 pago", xy=(6, 0.11), xytext=(10, 5), color=PALETTE["mx"])
-annotate_box(ax, "≤1.6 M (48 meses)\nCoDi con ≥1 pago", xy=(48, 1.6), xytext=(30, 10), color=PALETTE["mx"])
+    return export_fig(fig, "Exhibit_Adopcion_Trayectorias")
 
-ax.legend(loc="upper left", fontsize=12)
 
-export_fig(fig, "Exhibit_Adopcion_Trayectorias")
+if __name__ == "__main__":
+    build_exhibit_10()
+    flush()
@@ -2,77 +2,91 @@
 # Diseño: Barras horizontales a la misma escala (0–280 M), números grandes, ratio 23× en el centro.
 # Reglas: matplotlib puro, 1 gráfico por figura, sin seaborn. No se insertan pies de fuente en la imagen.
 
-import matplotlib.pyplot as plt
-import numpy as np
 import os
-from math import floor
-
-# ---------------------------
-# Datos (millones de transacciones)
-# ---------------------------
-codi_total_m = 11.9     # CoDi acumuladas (2019–1T 2024)
-pix_day_m    = 276.7    # Pix en un día (6 jun 2025)
-
-labels = ["CoDi — acumulado (2019–1T 2024)", "Pix — en 1 día (6 jun 2025)"]
-values = [codi_total_m, pix_day_m]
-
-ratio = pix_day_m / codi_total_m
-
-# ---------------------------
-# Gráfico
-# ---------------------------
-fig, ax = plt.subplots(figsize=(11, 6))
-
-y = np.arange(len(labels))
-bars = ax.barh(y, values)
-
-# Título narrativo y ejes
-ax.set_title("Brecha de órdenes de magnitud — Pix en 1 día vs CoDi histórico (México)", fontsize=18, pad=16)
-ax.set_xlabel("Transacciones (millones)", fontsize=14, labelpad=10)
-ax.set_yticks(y, labels, fontsize=13)
-ax.tick_params(axis='x', labelsize=13)
-
-# Rango común 0–~280 M
-ax.set_xlim(0, max(values)*1.05)
-
-# Grid sutil y limpieza
-ax.grid(True, axis='x', linestyle='--', alpha=0.35)
-ax.spines['top'].set_visible(False)
-ax.spines['right'].set_visible(False)
-
-# Etiquetas grandes al final de cada barra
-for rect, v in zip(bars, values):
-    ax.text(v + max(values)*0.02, rect.get_y() + rect.get_height()/2, f"{v:,.1f} M",
-            va="center", fontsize=16)
-
-# Callout central de la brecha (anclado a fracción de ejes)
-ax.text(0.5, 0.15, f"≈ {ratio:.0f}×", transform=ax.transAxes,
-        ha="center", va="center", fontsize=28, weight="bold",
-        bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1))
-
-fig.tight_layout()
-
-# ---------------------------
-# Exportación (patrón de tu proyecto + copias en /mnt/data)
-# ---------------------------
-try:
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.abspath(os.path.join(script_dir, '..', '..', '..'))
-except NameError:
-    project_root = "/mnt/data"
-
-results_dir = os.path.join(project_root, "0_Analisis_Cuantitativo", "Results", "Nuevos")
-os.makedirs(results_dir, exist_ok=True)
-
-png_path = os.path.join(results_dir, "Exhibit2_alt_Brecha_Ordenes_Magnitud_v2.png")
-svg_path = os.path.join(results_dir, "Exhibit2_alt_Brecha_Ordenes_Magnitud_v2.svg")
-fig.savefig(png_path, dpi=300, bbox_inches="tight")
-fig.savefig(svg_path, bbox_inches="tight")
-
-# Copias para descarga inmediata
-png_dl = "/mnt/data/Exhibit2_alt_Brecha_Ordenes_Magnitud_v2.png"
-svg_dl = "/mnt/data/Exhibit2_alt_Brecha_Ordenes_Magnitud_v2.svg"
-fig.savefig(png_dl, dpi=300, bbox_inches="tight")
-fig.savefig(svg_dl, bbox_inches="tight")
-
-png_dl, svg_dl, ratio
+
+import numpy as np
+
+from toolkit.datasets import dataset_files, get_dataset
+from toolkit.export import export_figure, flush
+from toolkit.figures import subplots
+from toolkit.ledger import META_FILE, aggregate
+from toolkit.paths import download_dirs
+from toolkit.registry import exhibit
+
+# Libros de transacciones opcionales (toolkit/ledger.py). El manifiesto
+# ledger.json fija configuración y semilla, así que basta como entrada de caché.
+PIX_LEDGER = os.environ.get("EXHIBITS_PIX_LEDGER")
+CODI_LEDGER = os.environ.get("EXHIBITS_CODI_LEDGER")
+
+
+def _ledger_daily_m(path):
+    # Transacciones por día del libro en millones (una pasada por lotes), o None si no hay libro.
+    return aggregate(path).daily_counts / 1e6 if path else None
+
+
+@exhibit("2", "Brecha de órdenes de magnitud — Pix en 1 día vs CoDi histórico",
+         inputs=dataset_files("brecha_transacciones")
+         + tuple(os.path.join(p, META_FILE) for p in (PIX_LEDGER, CODI_LEDGER) if p))
+def build_exhibit_2():
+    # ---------------------------
+    # Datos (millones de transacciones): Data/brecha_transacciones.csv
+    # ---------------------------
+    brecha = get_dataset("brecha_transacciones")
+    codi_daily = _ledger_daily_m(CODI_LEDGER)
+    pix_daily = _ledger_daily_m(PIX_LEDGER)
+    codi_total_m = brecha.codi_total_m if codi_daily is None else codi_daily.sum()   # CoDi acumuladas (2019–1T 2024)
+    pix_day_m = brecha.pix_day_m if pix_daily is None else pix_daily.max()           # Pix en un día (6 jun 2025)
+
+    # Con un libro de varios días, la barra de Pix es su día pico.
+    pix_label = ("Pix — en 1 día (6 jun 2025)" if pix_daily is None or len(pix_daily) == 1
+                 else f"Pix — día pico de {len(pix_daily)} días")
+    labels = ["CoDi — acumulado (2019–1T 2024)", pix_label]
+    values = [codi_total_m, pix_day_m]
+
+    ratio = brecha.ratio if not (PIX_LEDGER or CODI_LEDGER) else pix_day_m / codi_total_m
+
+    # ---------------------------
+    # Gráfico
+    # ---------------------------
+    fig, ax = subplots(figsize=(11, 6))
+
+    y = np.arange(len(labels))
+    bars = ax.barh(y, values)
+
+    # Título narrativo y ejes
+    ax.set_title("Brecha de órdenes de magnitud — Pix en 1 día vs CoDi histórico (México)", fontsize=18, pad=16)
+    ax.set_xlabel("Transacciones (millones)", fontsize=14, labelpad=10)
+    ax.set_yticks(y, labels, fontsize=13)
+    ax.tick_params(axis='x', labelsize=13)
+
+    # Rango común 0–~280 M
+    ax.set_xlim(0, max(values)*1.05)
+
+    # Grid sutil y limpieza
+    ax.grid(True, axis='x', linestyle='--', alpha=0.35)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    # Etiquetas grandes al final de cada barra
+    for rect, v in zip(bars, values):
+        ax.text(v + max(values)*0.02, rect.get_y() + rect.get_height()/2, f"{v:,.1f} M",
+                va="center", fontsize=16)
+
+    # Callout central de la brecha (anclado a fracción de ejes)
+    ax.text(0.5, 0.15, f"≈ {ratio:.0f}×", transform=ax.transAxes,
+            ha="center", va="center", fontsize=28, weight="bold",
+            bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1))
+
+    fig.tight_layout()
+
+    # ---------------------------
+    # Exportación (patrón de tu proyecto + copias en /mnt/data)
+    # ---------------------------
+    # Un solo cálculo de layout/bbox y una codificación por formato; las copias
+    # en /mnt/data se enlazan a los mismos bytes.
+    return export_figure(fig, "Exhibit2_alt_Brecha_Ordenes_Magnitud_v2", copy_dirs=download_dirs())
+
+
+if __name__ == "__main__":
+    build_exhibit_2()
+    flush()
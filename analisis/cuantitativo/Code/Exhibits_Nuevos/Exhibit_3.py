@@ -1,79 +1,129 @@
-# Fix overlap in Exhibit 3 callout by anchoring the text to axes-fraction coordinates
-# and moving it to the top-right; also increase spacing and clean spines.
+# Exhibit 3: value labels and the SME callout are placed by toolkit.labels (no overlap
+# with bars or each other); also increase spacing and clean spines.
+import os
+
 import matplotlib.pyplot as plt
 import numpy as np
-import os
 
-labels = ["Tarjeta (Agregador)", "Tarjeta (Banco)", "Pix/QR"]
-values = [3.55, 2.50, 0.22]
-
-ventas_mensuales = 200_000
-tasa_alta = 0.025
-tasa_baja = 0.0022
-ahorro_mensual = ventas_mensuales * (tasa_alta - tasa_baja)
-ahorro_anual = ahorro_mensual * 12
-
-fig, ax = plt.subplots(figsize=(11, 6))
-
-y_pos = np.arange(len(labels))
-bars = ax.barh(y_pos, values)
-
-# Title & axes
-ax.set_title("El ‘impuesto invisible’ de la aceptación — MDR comparado por método", fontsize=16, pad=16)
-ax.set_xlabel("Costo por transacción (%)", fontsize=14, labelpad=8)
-ax.set_yticks(y_pos, labels=labels, fontsize=12)
-ax.tick_params(axis='x', labelsize=12)
-
-# Subtle grid & clean spines
-ax.grid(True, axis='x', linestyle='--', alpha=0.35)
-ax.spines['top'].set_visible(False)
-ax.spines['right'].set_visible(False)
-
-# Value labels at bar end
-for rect, v in zip(bars, values):
-    ax.text(v + max(values)*0.02, rect.get_y() + rect.get_height()/2,
-            f"{v:.2f}%", va="center", fontsize=12)
-
-# Improved callout placement — anchor to axes fraction (top-right), arrow to Banco bar
-callout_text = (f"PYME con $200,000 MXN/mes:\n"
-                f"migrar de 2.5% → 0.22%\n"
-                f"libera ≈ ${ahorro_mensual:,.0f} MXN/mes\n"
-                f"(≈ ${ahorro_anual:,.0f} MXN/año)")
-
-ax.annotate(
-    callout_text,
-    xy=(values[1], 1), xycoords='data',         # arrow target (Banco bar)
-    xytext=(0.72, 0.88), textcoords='axes fraction',  # text box location (top-right, inside axes)
-    ha='left', va='top', fontsize=12,
-    arrowprops=dict(arrowstyle="->", lw=1.2, connectionstyle="arc3,rad=-0.2"),
-    bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1)
-)
-
-# Limits & margins
-ax.set_xlim(0, max(values)*1.28)
-ax.set_ylim(-0.6, len(labels)-0.4)
-plt.subplots_adjust(top=0.88)  # more room for title
-fig.tight_layout()
-
-# Export paths
-try:
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.abspath(os.path.join(script_dir, '..', '..', '..'))
-except NameError:
-    project_root = "/mnt/data"
-
-results_dir = os.path.join(project_root, "0_Analisis_Cuantitativo", "Results", "Nuevos")
-os.makedirs(results_dir, exist_ok=True)
-
-png_path = os.path.join(results_dir, "Exhibit3_Impuesto_Invisible_MDR_v2.png")
-svg_path = os.path.join(results_dir, "Exhibit3_Impuesto_Invisible_MDR_v2.svg")
-fig.savefig(png_path, dpi=300, bbox_inches="tight")
-fig.savefig(svg_path, bbox_inches="tight")
-
-# Quick download copies
-png_dl = "/mnt/data/Exhibit3_Impuesto_Invisible_MDR_v2.png"
-svg_dl = "/mnt/data/Exhibit3_Impuesto_Invisible_MDR_v2.svg"
-fig.savefig(png_dl, dpi=300, bbox_inches="tight")
-fig.savefig(svg_dl, bbox_inches="tight")
-
-png_dl, svg_dl
+from toolkit.datasets import dataset_files, get_dataset
+from toolkit.export import export_figure, flush
+from toolkit.figures import subplots
+from toolkit.labels import LabelLayout
+from toolkit.merchants import summarize_population
+from toolkit.paths import download_dirs
+from toolkit.registry import exhibit
+
+# Merchant population for the savings distribution: a CSV/Parquet file
+# (EXHIBITS_MERCHANTS_FILE) or, by default, a synthetic population of this size.
+MERCHANTS_FILE = os.environ.get("EXHIBITS_MERCHANTS_FILE")
+N_SYNTHETIC_MERCHANTS = 5_000_000
+
+
+@exhibit("3", "El ‘impuesto invisible’ de la aceptación — MDR comparado por método",
+         inputs=dataset_files("mdr_comparado", "escenario_pyme"))
+def build_exhibit_3():
+    # Data/mdr_comparado.csv and Data/escenario_pyme.csv (savings precomputed there)
+    mdr = get_dataset("mdr_comparado")
+    labels = list(mdr.metodos)
+    values = list(mdr.mdr_pct)
+
+    pyme = get_dataset("escenario_pyme")
+    ahorro_mensual = pyme.ahorro_mensual
+    ahorro_anual = pyme.ahorro_anual
+
+    fig, ax = subplots(figsize=(11, 6))
+
+    y_pos = np.arange(len(labels))
+    bars = ax.barh(y_pos, values)
+
+    # Title & axes
+    ax.set_title("El ‘impuesto invisible’ de la aceptación — MDR comparado por método", fontsize=16, pad=16)
+    ax.set_xlabel("Costo por transacción (%)", fontsize=14, labelpad=8)
+    ax.set_yticks(y_pos, labels=labels, fontsize=12)
+    ax.tick_params(axis='x', labelsize=12)
+
+    # Subtle grid & clean spines
+    ax.grid(True, axis='x', linestyle='--', alpha=0.35)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    # Limits & margins
+    ax.set_xlim(0, max(values)*1.28)
+    ax.set_ylim(-0.6, len(labels)-0.4)
+    plt.subplots_adjust(top=0.88)  # more room for title
+    fig.tight_layout()
+
+    # Value labels at bar end + callout (arrow to Banco bar), placed without overlap
+    callout_text = (f"PYME con ${pyme.ventas_mensuales:,.0f} MXN/mes:\n"
+                    f"migrar de {pyme.tasa_alta * 100:.1f}% → {pyme.tasa_baja * 100:.2f}%\n"
+                    f"libera ≈ ${ahorro_mensual:,.0f} MXN/mes\n"
+                    f"(≈ ${ahorro_anual:,.0f} MXN/año)")
+
+    layout = LabelLayout(ax)
+    layout.value_labels(bars, [f"{v:.2f}%" for v in values], fontsize=12)
+    layout.callout(callout_text, xy=(values[1], 1), fontsize=12,
+                   arrowprops=dict(arrowstyle="->", lw=1.2, connectionstyle="arc3,rad=-0.2"),
+                   bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1))
+    layout.place()
+
+    # Export paths
+    # PNG/SVG encoded once; /mnt/data copies are linked to the same bytes
+    return export_figure(fig, "Exhibit3_Impuesto_Invisible_MDR_v2", copy_dirs=download_dirs())
+
+
+@exhibit("3-dist", "Distribución del ahorro anual por comercio al migrar al modelo Pix",
+         inputs=dataset_files("costos_aceptacion", "escenario_pyme") + ((MERCHANTS_FILE,) if MERCHANTS_FILE else ()))
+def build_exhibit_3_dist():
+    summary = summarize_population(MERCHANTS_FILE or N_SYNTHETIC_MERCHANTS)
+    hist = summary.histogram
+    edges = hist.edges
+    share = hist.counts[0] / hist.total[0] * 100
+
+    # Coarser display bins (the accumulated histogram is fine-grained for the deciles)
+    step = 32
+    display_edges = edges[::step]
+    display_share = share.reshape(-1, step).sum(axis=1)
+
+    # Same PYME scenario as Exhibit 3, for reference
+    pyme = get_dataset("escenario_pyme")
+    pyme_anual = pyme.ahorro_anual
+
+    fig, ax = subplots(figsize=(11, 6))
+    ax.stairs(display_share, display_edges, fill=True, alpha=0.6)
+
+    deciles = summary.deciles[:, 0]
+    for q, value in zip(range(10, 100, 10), deciles):
+        ax.axvline(value, linestyle=':', lw=1, alpha=0.6)
+        if q in (10, 50, 90):
+            ax.text(value, 0.98, f"D{q // 10}\n${value:,.0f}", transform=ax.get_xaxis_transform(),
+                    ha='center', va='top', fontsize=10, bbox=dict(fc="white", ec="none", alpha=0.8))
+    ax.axvline(pyme_anual, lw=1.5)
+    ax.annotate(f"PYME ${pyme.ventas_mensuales:,.0f} MXN/mes\n≈ ${pyme_anual:,.0f} MXN/año", xy=(pyme_anual, 0.6),
+                xycoords=('data', 'axes fraction'), xytext=(8, 0), textcoords='offset points',
+                ha='left', va='center', fontsize=11)
+
+    ax.set_xscale('log')
+    ax.set_ylim(0, display_share.max() * 1.22)
+    ax.set_xlim(1e2, 1e7)
+    ax.set_title("Distribución del ahorro anual por comercio al migrar al modelo Pix", fontsize=16, pad=16)
+    ax.set_xlabel("Ahorro anual por comercio (MXN, escala log)", fontsize=14, labelpad=8)
+    ax.set_ylabel("% de comercios", fontsize=14)
+    ax.grid(True, axis='y', linestyle='--', alpha=0.35)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    total_bn = summary.total_savings * 12 / 1e9
+    source = "archivo de comercios" if MERCHANTS_FILE else "población sintética"
+    fig.text(0.01, 0.01,
+             f"{summary.n_merchants:,} comercios ({source}); ahorro agregado ≈ ${total_bn:,.1f} mil millones MXN/año. "
+             "Tasas: punto medio de los rangos por método vs. 0.22%.",
+             fontsize=9, ha='left', va='bottom')
+    fig.tight_layout(rect=(0, 0.04, 1, 1))
+
+    return export_figure(fig, "Exhibit3_Distribucion_Ahorro_Comercios", copy_dirs=download_dirs())
+
+
+if __name__ == "__main__":
+    build_exhibit_3()
+    build_exhibit_3_dist()
+    flush()
@@ -0,0 +1,125 @@
+# Exhibit 3 — Sensibilidad del ahorro PYME (ventas_mensuales, tasa_alta, tasa_baja).
+# Tornado uno-a-la-vez alrededor del caso de Exhibit_3.py y mapa de calor sobre la
+# malla completa (toolkit/sensitivity.py). Matplotlib puro, sin seaborn.
+import numpy as np
+from matplotlib.ticker import FuncFormatter
+
+from toolkit.datasets import dataset_files, get_dataset
+from toolkit.export import export_figure, flush
+from toolkit.figures import figure_scope, subplots
+from toolkit.paths import download_dirs
+from toolkit.registry import exhibit
+from toolkit.sensitivity import pyme_annual_savings, sweep, tornado
+
+INPUTS = dataset_files("escenario_pyme", "costos_aceptacion")
+# Rangos fijos; tasa_alta sale de la tabla de costos (ver ``sweep_ranges``)
+VENTAS_RANGE = (100_000, 400_000)
+TASA_BAJA_RANGE = (0.0010, 0.0050)
+LABELS = {
+    "ventas_mensuales": "Ventas mensuales (MXN)",
+    "tasa_alta": "Tasa actual (MDR)",
+    "tasa_baja": "Tasa de llegada (tipo Pix)",
+}
+
+
+def sweep_ranges():
+    # tasa_alta cubre de la tarjeta más barata a la más cara de Data/costos_aceptacion.csv
+    costos = get_dataset("costos_aceptacion").ranges
+    card_rates = [rate for label, rng in costos.items() if label.startswith("Tarjeta") for rate in rng]
+    return {
+        "ventas_mensuales": VENTAS_RANGE,
+        "tasa_alta": (min(card_rates) / 100, max(card_rates) / 100),
+        "tasa_baja": TASA_BAJA_RANGE,
+    }
+
+
+def heatmap_grid():
+    # Malla del mapa de calor: 1000 × 1000 × 100 puntos
+    ranges = sweep_ranges()
+    return {
+        "ventas_mensuales": np.geomspace(20_000, 2_000_000, 1000),
+        "tasa_alta": np.linspace(*ranges["tasa_alta"], 1000),
+        "tasa_baja": np.linspace(*ranges["tasa_baja"], 100),
+    }
+
+
+def _fmt_param(name, value):
+    return f"${value:,.0f}" if name == "ventas_mensuales" else f"{value * 100:.2f}%"
+
+
+@exhibit("3-tornado", "Sensibilidad del ahorro PYME — tornado", inputs=INPUTS)
+def build_exhibit_3_tornado():
+    # Caso base: el escenario PYME de Exhibit 3 (Data/escenario_pyme.csv)
+    base_output, bars = tornado(pyme_annual_savings, get_dataset("escenario_pyme").as_params(), sweep_ranges())
+
+    fig, ax = subplots(figsize=(11, 6))
+    y_pos = np.arange(len(bars))[::-1]   # mayor oscilación arriba
+    lefts = [min(bar.output_low, bar.output_high) for bar in bars]
+    ax.barh(y_pos, [bar.swing for bar in bars], left=lefts, height=0.55)
+    for y, bar in zip(y_pos, bars):
+        ax.text(bar.output_low, y, f"{_fmt_param(bar.name, bar.low)}  ",
+                ha="right" if bar.output_low <= bar.output_high else "left", va="center", fontsize=11)
+        ax.text(bar.output_high, y, f"  {_fmt_param(bar.name, bar.high)}",
+                ha="left" if bar.output_high >= bar.output_low else "right", va="center", fontsize=11)
+    ax.axvline(base_output, color="black", lw=1.2)
+    ax.text(base_output, len(bars) - 0.45, f"Caso base ≈ ${base_output:,.0f} MXN/año",
+            ha="center", va="bottom", fontsize=11, bbox=dict(fc="white", ec="none", pad=2))
+
+    ax.set_title("¿Qué mueve el ahorro PYME? — sensibilidad uno a la vez", fontsize=16, pad=16)
+    ax.set_xlabel("Ahorro anual (MXN)", fontsize=14, labelpad=8)
+    ax.set_yticks(y_pos, labels=[LABELS[bar.name] for bar in bars], fontsize=12)
+    ax.xaxis.set_major_formatter(FuncFormatter(lambda v, _: f"${v:,.0f}"))
+    ax.set_ylim(-0.6, len(bars) - 0.1)
+    ax.grid(True, axis='x', linestyle='--', alpha=0.35)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    low = min(min(b.output_low, b.output_high) for b in bars)
+    high = max(max(b.output_low, b.output_high) for b in bars)
+    ax.set_xlim(low - (high - low) * 0.18, high + (high - low) * 0.18)
+    fig.tight_layout()
+
+    return export_figure(fig, "Exhibit3_Sensibilidad_Tornado", copy_dirs=download_dirs())
+
+
+@exhibit("3-heatmap", "Sensibilidad del ahorro PYME — mapa de calor", inputs=INPUTS)
+def build_exhibit_3_heatmap():
+    grid_axes = heatmap_grid()
+    result = sweep(pyme_annual_savings, grid_axes, workers=None)
+    grid = result.marginal_mean("ventas_mensuales", "tasa_alta")   # (tasa_alta, ventas)
+
+    ventas, alta = grid_axes["ventas_mensuales"], grid_axes["tasa_alta"]
+    fig, ax = subplots(figsize=(11, 7))
+    extent = (np.log10(ventas[0]), np.log10(ventas[-1]), alta[0] * 100, alta[-1] * 100)
+    image = ax.imshow(grid, origin="lower", aspect="auto", extent=extent, interpolation="nearest")
+    contours = ax.contour(np.log10(ventas), alta * 100, grid, levels=[10_000, 25_000, 50_000, 100_000, 250_000, 500_000],
+                          colors="white", linewidths=0.9)
+    ax.clabel(contours, fmt=lambda v: f"${v / 1000:,.0f}k", fontsize=10)
+
+    pyme = get_dataset("escenario_pyme")
+    base_x, base_y = np.log10(pyme.ventas_mensuales), pyme.tasa_alta * 100
+    ax.plot(base_x, base_y, marker="o", color="white", markeredgecolor="black", markersize=9)
+    ax.annotate("Caso base (Exhibit 3)", xy=(base_x, base_y), xytext=(12, 12), textcoords="offset points",
+                fontsize=11, bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", lw=1))
+
+    ax.set_title("Ahorro anual PYME por ventas y tasa actual (promedio sobre tasa de llegada 0.10–0.50%)",
+                 fontsize=14, pad=14)
+    ax.set_xlabel("Ventas mensuales (MXN, escala log)", fontsize=13, labelpad=8)
+    ax.set_ylabel("Tasa actual (%)", fontsize=13, labelpad=8)
+    ticks = [20_000, 50_000, 100_000, 200_000, 500_000, 1_000_000, 2_000_000]
+    ax.set_xticks(np.log10(ticks), labels=[f"${t / 1000:,.0f}k" for t in ticks])
+    cbar = fig.colorbar(image, ax=ax)
+    cbar.set_label("Ahorro anual (MXN)", fontsize=12)
+    cbar.ax.yaxis.set_major_formatter(FuncFormatter(lambda v, _: f"${v:,.0f}"))
+    fig.text(0.01, 0.01, f"Malla de {result.count:,} combinaciones "
+             f"({len(ventas)} × {len(alta)} × {len(grid_axes['tasa_baja'])}).", fontsize=9, ha="left", va="bottom")
+    fig.tight_layout(rect=(0, 0.03, 1, 1))
+
+    return export_figure(fig, "Exhibit3_Sensibilidad_Mapa_Calor", copy_dirs=download_dirs())
+
+
+if __name__ == "__main__":
+    for build in (build_exhibit_3_tornado, build_exhibit_3_heatmap):
+        with figure_scope():
+            build()
+    flush()
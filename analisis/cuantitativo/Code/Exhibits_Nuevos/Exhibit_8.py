@@ -2,108 +2,193 @@
 # SET DE EXHIBITS DE PROYECCIÓN (texto enriquecido)
 # ============================
 # Reglas: matplotlib (sin seaborn), un gráfico por figura, sin especificar colores.
+from functools import lru_cache
+
 import matplotlib.pyplot as plt
 
+from toolkit.datasets import dataset_files, get_dataset
+from toolkit.export import export_figure, flush
+from toolkit.figures import figure_scope, subplots
+from toolkit.labels import LabelLayout
+from toolkit.montecarlo import calibrate, simulate
+from toolkit.registry import exhibit
+
 # --------------------------- 
-# Datos validados (Tabla 4)
+# Datos validados (Tabla 4): Data/tabla4.csv vía toolkit.datasets
 # --------------------------- 
-years = [1, 2, 3, 4, 5]
-savings_usd_bn = [1.5, 3.0, 4.5, 5.5, 6.0]          # Ahorros anuales (USD bn)
-delta_gdp_pct = [0.10, 0.20, 0.35, 0.45, 0.50]      # Δ PIB (p.p. del PIB)
-new_users_m = [5, 10, 14, 17, 18]                   # Nuevos individuos (millones)
+TABLA4_FILES = dataset_files("tabla4")
+
 
 # ================
 # Exhibit 5.1 — Ahorros sistémicos anuales
 # ================
-fig1, ax1 = plt.subplots(figsize=(9, 6))
-bars1 = ax1.bar(years, savings_usd_bn)
-
-ax1.set_title("Exhibit 5.1: Proyección de Ahorros Sistémicos Anuales para México (USD miles de millones)", pad=12)
-ax1.set_xlabel("Año desde el lanzamiento")
-ax1.set_ylabel("Ahorro anual (USD bn)")
-ax1.set_xticks(years)
-ax1.set_ylim(0, max(savings_usd_bn) * 1.25)
-ax1.yaxis.grid(True, linestyle="--", alpha=0.3)
-
-for b, v in zip(bars1, savings_usd_bn):
-    ax1.text(b.get_x() + b.get_width()/2, v + 0.08, f"{v:.1f}", ha="center", va="bottom", fontsize=11)
-
-cum_savings = sum(savings_usd_bn)
-ax1.annotate(f"Acumulado a 5 años ≈ ${cum_savings:.1f} bn",
-             xy=(5, savings_usd_bn[-1]), xytext=(3.5, max(savings_usd_bn)*0.92),
-             arrowprops=dict(arrowstyle='->', lw=1),
-             bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1), fontsize=11)
-
-# Pie profesional y transparente (metodología + validación)
-foot_51 = (
-    "Fuente: Proyección propia (Tabla 4). Metodología: aplicación de benchmarks de eficiencia de pagos instantáneos "
-    "a bases macro de México (INEGI, Banxico). Validación externa de orden de magnitud: ACI Worldwide & Cebr, "
-    "'Real-Time Payments — Economic Impact' (Brasil)."
-)
-# plt.figtext(0.01, 0.01, foot_51, ha="left", fontsize=9)
-
-plt.tight_layout(rect=[0, 0.05, 1, 1])
-plt.savefig("0_Analisis_Cuantitativo/Results/Nuevos/Exhibit5_1.png", dpi=300, bbox_inches="tight")
+@exhibit("5.1", "Proyección de Ahorros Sistémicos Anuales para México", inputs=TABLA4_FILES)
+def build_exhibit_5_1():
+    t4 = get_dataset("tabla4")
+    years, savings_usd_bn = t4.years, t4.savings_usd_bn
+
+    fig1, ax1 = subplots(figsize=(9, 6))
+    bars1 = ax1.bar(years, savings_usd_bn)
+
+    ax1.set_title("Exhibit 5.1: Proyección de Ahorros Sistémicos Anuales para México (USD miles de millones)", pad=12)
+    ax1.set_xlabel("Año desde el lanzamiento")
+    ax1.set_ylabel("Ahorro anual (USD bn)")
+    ax1.set_xticks(years)
+    ax1.set_ylim(0, max(savings_usd_bn) * 1.25)
+    ax1.yaxis.grid(True, linestyle="--", alpha=0.3)
+
+    cum_savings = t4.cum_savings_usd_bn
+
+    # Pie profesional y transparente (metodología + validación)
+    foot_51 = (
+        "Fuente: Proyección propia (Tabla 4). Metodología: aplicación de benchmarks de eficiencia de pagos instantáneos "
+        "a bases macro de México (INEGI, Banxico). Validación externa de orden de magnitud: ACI Worldwide & Cebr, "
+        "'Real-Time Payments — Economic Impact' (Brasil)."
+    )
+    # plt.figtext(0.01, 0.01, foot_51, ha="left", fontsize=9)
+
+    plt.tight_layout(rect=[0, 0.05, 1, 1])
+
+    # Etiquetas de valor y callout colocados sin traslapes (toolkit.labels)
+    layout = LabelLayout(ax1)
+    layout.value_labels(bars1, [f"{v:.1f}" for v in savings_usd_bn], fontsize=11)
+    layout.callout(f"Acumulado a 5 años ≈ ${cum_savings:.1f} bn", xy=(5, savings_usd_bn[-1]),
+                   arrowprops=dict(arrowstyle='->', lw=1),
+                   bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1), fontsize=11)
+    layout.place()
+    return export_figure(fig1, "Exhibit5_1", formats=("png",))
+
 
 # ================
 # Exhibit 5.2 — Contribución adicional al PIB (p.p.) - VERSIÓN CORREGIDA
 # ================
-fig2, ax2 = plt.subplots(figsize=(9, 6))
-bars2 = ax2.bar(years, delta_gdp_pct)
-
-ax2.set_title("Exhibit 5.2: Proyección de Contribución Adicional al PIB (p.p.)", pad=12)
-ax2.set_xlabel("Año desde el lanzamiento")
-ax2.set_ylabel("Δ PIB (puntos porcentuales)")
-ax2.set_xticks(years)
-ax2.set_ylim(0, max(delta_gdp_pct) * 1.25)
-ax2.yaxis.grid(True, linestyle="--", alpha=0.3)
-
-for b, v in zip(bars2, delta_gdp_pct):
-    ax2.text(b.get_x() + b.get_width()/2, v + 0.015, f"{v:.2f} p.p.", ha="center", va="bottom", fontsize=11)
-
-# --- INICIO DE LA MODIFICACIÓN ---
-# Se han ajustado las coordenadas de xytext para bajar la caja de texto.
-ax2.annotate("Validación externa (Brasil):\nACI/Cebr proyecta hasta 2.08% del PIB en 2026",
-             xy=(4, delta_gdp_pct[-2]), # La flecha ahora apunta a la barra del año 4 para más espacio
-             xytext=(2.5, max(delta_gdp_pct)*0.85), # Posición de la caja de texto
-             arrowprops=dict(arrowstyle='->', lw=1.5, connectionstyle="arc3,rad=.2"), # Flecha más visible y curvada
-             bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1, alpha=0.9), fontsize=11)
-# --- FIN DE LA MODIFICACIÓN ---
-
-# Se elimina el pie de foto de la imagen
-# plt.figtext(...) 
-
-plt.tight_layout()
-plt.savefig("0_Analisis_Cuantitativo/Results/Nuevos/Exhibit5_2_Corregido.png", dpi=300, bbox_inches="tight")
-plt.savefig("0_Analisis_Cuantitativo/Results/Nuevos/Exhibit5_2_Corregido.svg", bbox_inches="tight")
+@exhibit("5.2", "Proyección de Contribución Adicional al PIB", inputs=TABLA4_FILES)
+def build_exhibit_5_2():
+    t4 = get_dataset("tabla4")
+    years, delta_gdp_pct = t4.years, t4.delta_gdp_pct
+
+    fig2, ax2 = subplots(figsize=(9, 6))
+    bars2 = ax2.bar(years, delta_gdp_pct)
+
+    ax2.set_title("Exhibit 5.2: Proyección de Contribución Adicional al PIB (p.p.)", pad=12)
+    ax2.set_xlabel("Año desde el lanzamiento")
+    ax2.set_ylabel("Δ PIB (puntos porcentuales)")
+    ax2.set_xticks(years)
+    ax2.set_ylim(0, max(delta_gdp_pct) * 1.25)
+    ax2.yaxis.grid(True, linestyle="--", alpha=0.3)
+
+    # Se elimina el pie de foto de la imagen
+    # plt.figtext(...)
+
+    plt.tight_layout()
+
+    # Etiquetas de valor y callout (flecha a la barra del año 4) colocados sin traslapes
+    layout = LabelLayout(ax2)
+    layout.value_labels(bars2, [f"{v:.2f} p.p." for v in delta_gdp_pct], fontsize=11)
+    layout.callout("Validación externa (Brasil):\nACI/Cebr proyecta hasta 2.08% del PIB en 2026",
+                   xy=(4, delta_gdp_pct[-2]),
+                   arrowprops=dict(arrowstyle='->', lw=1.5, connectionstyle="arc3,rad=.2"),
+                   bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1, alpha=0.9), fontsize=11)
+    layout.place()
+    return export_figure(fig2, "Exhibit5_2_Corregido")
+
+
 # ================
 # Exhibit 5.3 — Inclusión financiera (nuevos individuos) - VERSIÓN CORREGIDA
 # ================
-fig3, ax3 = plt.subplots(figsize=(9, 6))
-bars3 = ax3.bar(years, new_users_m)
-
-ax3.set_title("Exhibit 5.3: Proyección de Inclusión Financiera Acelerada — Nuevos individuos (millones)", pad=12)
-ax3.set_xlabel("Año desde el lanzamiento")
-ax3.set_ylabel("Millones de personas")
-ax3.set_xticks(years)
-ax3.set_ylim(0, max(new_users_m) * 1.25)
-ax3.yaxis.grid(True, linestyle="--", alpha=0.3)
-
-for b, v in zip(bars3, new_users_m):
-    ax3.text(b.get_x() + b.get_width()/2, v + 0.3, f"{v} M", ha="center", va="bottom", fontsize=11)
-
-# --- INICIO DE LA MODIFICACIÓN ---
-# Se han ajustado las coordenadas de xytext para bajar la caja de texto.
-ax3.annotate("Referencia Brasil (BCB/EPC):\n71.5 M realizaron su primera\ntransferencia electrónica con Pix (a dic-2022)",
-             xy=(4, new_users_m[-2]), # La flecha ahora apunta a la barra del año 4 para más espacio
-             xytext=(2, max(new_users_m)*0.8), # Posición de la caja de texto
-             arrowprops=dict(arrowstyle='->', lw=1.5, connectionstyle="arc3,rad=.2"), # Flecha más visible y curvada
-             bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1, alpha=0.9), fontsize=11)
-# --- FIN DE LA MODIFICACIÓN ---
-
-# Se elimina el pie de foto de la imagen
-# plt.figtext(...)
-
-plt.tight_layout()
-plt.savefig("0_Analisis_Cuantitativo/Results/Nuevos/Exhibit5_3_Corregido.png", dpi=300, bbox_inches="tight")
-plt.savefig("0_Analisis_Cuantitativo/Results/Nuevos/Exhibit5_3_Corregido.svg", bbox_inches="tight")
\ No newline at end of file
+@exhibit("5.3", "Proyección de Inclusión Financiera Acelerada", inputs=TABLA4_FILES)
+def build_exhibit_5_3():
+    t4 = get_dataset("tabla4")
+    years, new_users_m = t4.years, t4.new_users_m
+
+    fig3, ax3 = subplots(figsize=(9, 6))
+    bars3 = ax3.bar(years, new_users_m)
+
+    ax3.set_title("Exhibit 5.3: Proyección de Inclusión Financiera Acelerada — Nuevos individuos (millones)", pad=12)
+    ax3.set_xlabel("Año desde el lanzamiento")
+    ax3.set_ylabel("Millones de personas")
+    ax3.set_xticks(years)
+    ax3.set_ylim(0, max(new_users_m) * 1.25)
+    ax3.yaxis.grid(True, linestyle="--", alpha=0.3)
+
+    # Se elimina el pie de foto de la imagen
+    # plt.figtext(...)
+
+    plt.tight_layout()
+
+    # Etiquetas de valor y callout (flecha a la barra del año 4) colocados sin traslapes
+    layout = LabelLayout(ax3)
+    layout.value_labels(bars3, [f"{v:g} M" for v in new_users_m], fontsize=11)
+    layout.callout("Referencia Brasil (BCB/EPC):\n71.5 M realizaron su primera\ntransferencia electrónica con Pix (a dic-2022)",
+                   xy=(4, new_users_m[-2]),
+                   arrowprops=dict(arrowstyle='->', lw=1.5, connectionstyle="arc3,rad=.2"),
+                   bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="gray", lw=1, alpha=0.9), fontsize=11)
+    layout.place()
+    return export_figure(fig3, "Exhibit5_3_Corregido")
+
+
+# ================
+# Variantes "fan chart" (5.1–5.3): barras de la Tabla 4 + bandas Monte Carlo
+# ================
+FAN_DRAWS = 1_000_000
+
+
+@lru_cache(maxsize=1)
+def tabla4_simulation():
+    # Una sola simulación compartida por los tres fan charts del mismo proceso,
+    # calibrada para que el escenario central reproduzca la Tabla 4.
+    return simulate(FAN_DRAWS, calibration=calibrate(get_dataset("tabla4")))
+
+
+def draw_fan(ax, metric):
+    sim = tabla4_simulation()
+    t4 = get_dataset("tabla4")
+    years, values = t4.years, getattr(t4, metric)
+    # Colores del ciclo por defecto: C0 para la Tabla 4, C1 para el abanico
+    ax.bar(years, values, color="C0", alpha=0.35, label="Tabla 4 (punto)")
+    ax.fill_between(years, sim.band(metric, 5), sim.band(metric, 95), color="C1", alpha=0.2, lw=0, label="P5–P95")
+    ax.fill_between(years, sim.band(metric, 25), sim.band(metric, 75), color="C1", alpha=0.4, lw=0, label="P25–P75")
+    ax.plot(years, sim.band(metric, 50), color="C1", marker="o", lw=2, label="Mediana")
+    ax.set_xlabel("Año desde el lanzamiento")
+    ax.set_xticks(years)
+    ax.set_ylim(0, sim.band(metric, 95).max() * 1.15)
+    ax.yaxis.grid(True, linestyle="--", alpha=0.3)
+    ax.legend(loc="upper left", fontsize=10, frameon=False)
+
+
+@exhibit("5.1-fan", "Ahorros Sistémicos Anuales — bandas Monte Carlo", inputs=TABLA4_FILES)
+def build_exhibit_5_1_fan():
+    fig, ax = subplots(figsize=(9, 6))
+    draw_fan(ax, "savings_usd_bn")
+    ax.set_title("Exhibit 5.1: Ahorros Sistémicos Anuales para México — Rango de escenarios (USD bn)", pad=12)
+    ax.set_ylabel("Ahorro anual (USD bn)")
+    plt.tight_layout()
+    return export_figure(fig, "Exhibit5_1_Fan")
+
+
+@exhibit("5.2-fan", "Contribución Adicional al PIB — bandas Monte Carlo", inputs=TABLA4_FILES)
+def build_exhibit_5_2_fan():
+    fig, ax = subplots(figsize=(9, 6))
+    draw_fan(ax, "delta_gdp_pct")
+    ax.set_title("Exhibit 5.2: Contribución Adicional al PIB — Rango de escenarios (p.p.)", pad=12)
+    ax.set_ylabel("Δ PIB (puntos porcentuales)")
+    plt.tight_layout()
+    return export_figure(fig, "Exhibit5_2_Fan")
+
+
+@exhibit("5.3-fan", "Inclusión Financiera Acelerada — bandas Monte Carlo", inputs=TABLA4_FILES)
+def build_exhibit_5_3_fan():
+    fig, ax = subplots(figsize=(9, 6))
+    draw_fan(ax, "new_users_m")
+    ax.set_title("Exhibit 5.3: Inclusión Financiera Acelerada — Rango de escenarios (millones)", pad=12)
+    ax.set_ylabel("Millones de personas")
+    plt.tight_layout()
+    return export_figure(fig, "Exhibit5_3_Fan")
+
+
+if __name__ == "__main__":
+    for build in (build_exhibit_5_1, build_exhibit_5_2, build_exhibit_5_3,
+                  build_exhibit_5_1_fan, build_exhibit_5_2_fan, build_exhibit_5_3_fan):
+        with figure_scope():
+            build()
+    flush()
@@ -1,230 +1,231 @@
 # Generate Exhibits 3–8 as figures (PNG+SVG), using only matplotlib defaults (no custom colors).
-import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.patches import FancyBboxPatch
 
-outputs = []
+from toolkit.datasets import dataset_files, get_dataset
+from toolkit.export import export_figure, flush
+from toolkit.figures import figure_scope, subplots
+from toolkit.labels import LabelLayout
+from toolkit.registry import exhibit
+from toolkit.scorecard import StatusStyle, draw_scorecard, scorecard_legend
+
 
 # ----------------------
 # Exhibit 3: Costo de Aceptación (rango con "whiskers") + mini-escenario PYME
 # ----------------------
-methods = ["Efectivo (costos operativos)", "Tarjeta (TPV) Débito", "Tarjeta (TPV) Crédito", "Tarjeta (Agregador)", "Modelo Pix (Comercio)"]
-# Ranges as (mean, half_range) in percentage points
-ranges = {
-    "Efectivo (costos operativos)": ( (2+5)/2, (5-2)/2 ),
-    "Tarjeta (TPV) Débito": ( (1.70+2.50)/2, (2.50-1.70)/2 ),
-    "Tarjeta (TPV) Crédito": ( (1.80+2.75)/2, (2.75-1.80)/2 ),
-    "Tarjeta (Agregador)": ( (3.5+3.6)/2, (3.6-3.5)/2 ),
-    "Modelo Pix (Comercio)": (0.22, 0.0),
-}
-means = [ranges[m][0] for m in methods]
-errs = [ranges[m][1] for m in methods]
-
-fig3, ax3 = plt.subplots(figsize=(10, 6))
-y_pos = np.arange(len(methods))
-ax3.errorbar(means, y_pos, xerr=errs, fmt='o', capsize=6)
-ax3.set_yticks(y_pos, labels=methods)
-ax3.set_xlabel("Costo por transacción (%)")
-ax3.set_title("Exhibit 3: El 'Impuesto Invisible' de la Aceptación de Pagos vs. Modelo de Bajo Costo")
-
-# Mini-escenario PYME: ventas mensuales $200,000 MXN, pasar de 2.5% a 0.22%
-ventas_mensuales = 200_000
-tasa_alta = 0.025
-tasa_pix = 0.0022
-ahorro_mensual = ventas_mensuales * (tasa_alta - tasa_pix)
-ahorro_anual = ahorro_mensual * 12
-scenario_text = (
-    f"Escenario PYME (ventas mensuales $200,000 MXN):\n"
-    f"Ahorro al migrar de 2.5% a 0.22% ≈ ${ahorro_mensual:,.0f} MXN/mes\n"
-    f"(≈ ${ahorro_anual:,.0f} MXN/año)"
-)
-ax3.text(0.98, -0.35, scenario_text, ha="right", va="top", fontsize=10, transform=ax3.transAxes,
-         bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="black", lw=1))
-
-foot3 = ("Fuente: 'Impacto Económico de Pix en Brasil' (Tabla de costos comparativos y tasas promedio); "
-         "Banxico (tasas de descuento), valores compilados en tus documentos.")
-ax3.text(0.01, -0.18, foot3, ha="left", va="top", fontsize=9, transform=ax3.transAxes)
-
-png3 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit3_Costo_Aceptacion.png"
-svg3 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit3_Costo_Aceptacion.svg"
-fig3.tight_layout()
-fig3.savefig(png3, dpi=300, bbox_inches="tight")
-fig3.savefig(svg3, bbox_inches="tight")
-outputs.append((png3, svg3))
+@exhibit("proto-3", "El 'Impuesto Invisible' de la Aceptación de Pagos vs. Modelo de Bajo Costo",
+         inputs=dataset_files("costos_aceptacion", "escenario_pyme"))
+def build_proto_exhibit_3():
+    costos = get_dataset("costos_aceptacion")
+    methods = list(costos.metodos)
+    # Ranges as (mean, half_range) in percentage points
+    ranges = {m: ((lo + hi) / 2, (hi - lo) / 2) for m, (lo, hi) in costos.ranges.items()}
+    means = [ranges[m][0] for m in methods]
+    errs = [ranges[m][1] for m in methods]
+
+    fig3, ax3 = subplots(figsize=(10, 6))
+    y_pos = np.arange(len(methods))
+    ax3.errorbar(means, y_pos, xerr=errs, fmt='o', capsize=6)
+    ax3.set_yticks(y_pos, labels=methods)
+    ax3.set_xlabel("Costo por transacción (%)")
+    ax3.set_title("Exhibit 3: El 'Impuesto Invisible' de la Aceptación de Pagos vs. Modelo de Bajo Costo")
+
+    # Mini-escenario PYME (Data/escenario_pyme.csv): ventas mensuales $200,000 MXN, pasar de 2.5% a 0.22%
+    pyme = get_dataset("escenario_pyme")
+    scenario_text = (
+        f"Escenario PYME (ventas mensuales ${pyme.ventas_mensuales:,.0f} MXN):\n"
+        f"Ahorro al migrar de {pyme.tasa_alta * 100:.1f}% a {pyme.tasa_baja * 100:.2f}% "
+        f"≈ ${pyme.ahorro_mensual:,.0f} MXN/mes\n"
+        f"(≈ ${pyme.ahorro_anual:,.0f} MXN/año)"
+    )
+    ax3.text(0.98, -0.35, scenario_text, ha="right", va="top", fontsize=10, transform=ax3.transAxes,
+             bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="black", lw=1))
+
+    foot3 = ("Fuente: 'Impacto Económico de Pix en Brasil' (Tabla de costos comparativos y tasas promedio); "
+             "Banxico (tasas de descuento), valores compilados en tus documentos.")
+    ax3.text(0.01, -0.18, foot3, ha="left", va="top", fontsize=9, transform=ax3.transAxes)
+
+    fig3.tight_layout()
+    return export_figure(fig3, "Exhibit3_Costo_Aceptacion")
+
 
 # ----------------------
 # Exhibit 4: Dividendo Digital ya materializado (callout + proyección 2030)
 # ----------------------
-fig4, ax4 = plt.subplots(figsize=(10, 6))
-ax4.axis("off")
-
-# Big callout for USD 21 bn (2020–jun 2025)
-ax4.text(0.5, 0.78, "Exhibit 4: Dividendo Digital Ya Materializado", ha="center", va="center", fontsize=18, weight="bold")
-box1 = FancyBboxPatch((0.10, 0.48), 0.80, 0.20, boxstyle="round,pad=0.6,rounding_size=16", ec="black", fc="white", lw=1.2)
-ax4.add_patch(box1)
-ax4.text(0.5, 0.58, "$21 Mil Millones USD", ha="center", va="center", fontsize=28, weight="bold")
-ax4.text(0.5, 0.50, "Ahorro acumulado 2020–jun 2025 (MBC)", ha="center", va="center", fontsize=12)
-
-# Smaller callout for 2030 projection
-box2 = FancyBboxPatch((0.15, 0.25), 0.70, 0.16, boxstyle="round,pad=0.5,rounding_size=12", ec="black", fc="white", lw=1.0)
-ax4.add_patch(box2)
-ax4.text(0.50, 0.32, "Proyección 2030: R$40.1 Mil Millones / año", ha="center", va="center", fontsize=14)
-ax4.text(0.50, 0.27, "(Ahorro anual estimado por MBC)", ha="center", va="center", fontsize=11)
-
-foot4 = ("Fuente: Movimento Brasil Competitivo (MBC), 2025; cifras compiladas en tus documentos.")
-ax4.text(0.02, 0.08, foot4, ha="left", va="center", fontsize=10)
-
-png4 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit4_Dividendo_Digital.png"
-svg4 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit4_Dividendo_Digital.svg"
-fig4.savefig(png4, dpi=300, bbox_inches="tight")
-fig4.savefig(svg4, bbox_inches="tight")
-outputs.append((png4, svg4))
+@exhibit("proto-4", "Dividendo Digital Ya Materializado")
+def build_proto_exhibit_4():
+    fig4, ax4 = subplots(figsize=(10, 6))
+    ax4.axis("off")
+
+    # Big callout for USD 21 bn (2020–jun 2025)
+    ax4.text(0.5, 0.78, "Exhibit 4: Dividendo Digital Ya Materializado", ha="center", va="center", fontsize=18, weight="bold")
+    box1 = FancyBboxPatch((0.10, 0.48), 0.80, 0.20, boxstyle="round,pad=0.6,rounding_size=16", ec="black", fc="white", lw=1.2)
+    ax4.add_patch(box1)
+    ax4.text(0.5, 0.58, "$21 Mil Millones USD", ha="center", va="center", fontsize=28, weight="bold")
+    ax4.text(0.5, 0.50, "Ahorro acumulado 2020–jun 2025 (MBC)", ha="center", va="center", fontsize=12)
+
+    # Smaller callout for 2030 projection
+    box2 = FancyBboxPatch((0.15, 0.25), 0.70, 0.16, boxstyle="round,pad=0.5,rounding_size=12", ec="black", fc="white", lw=1.0)
+    ax4.add_patch(box2)
+    ax4.text(0.50, 0.32, "Proyección 2030: R$40.1 Mil Millones / año", ha="center", va="center", fontsize=14)
+    ax4.text(0.50, 0.27, "(Ahorro anual estimado por MBC)", ha="center", va="center", fontsize=11)
+
+    foot4 = ("Fuente: Movimento Brasil Competitivo (MBC), 2025; cifras compiladas en tus documentos.")
+    ax4.text(0.02, 0.08, foot4, ha="left", va="center", fontsize=10)
+
+    return export_figure(fig4, "Exhibit4_Dividendo_Digital")
+
 
 # ----------------------
 # Exhibit 5: PIB – % y valor (dos ejes, puntos/columna)
 # ----------------------
-years = [2026, 2028]
-pib_pct = [2.08, None]  # % del PIB (proyección ACI) en 2026
-pib_val_brl = [None, 280.7]  # BRL bn 2028
-
-fig5, ax5 = plt.subplots(figsize=(10, 6))
-ax5.set_title("Exhibit 5: Del Ahorro al Crecimiento – Contribución Proyectada al PIB de Brasil")
-ax5.set_xlabel("Año")
-
-# Plot % PIB as scatter
-ax5b = ax5.twinx()
-ax5.set_xlim(2025.5, 2028.5)
-ax5.set_xticks([2026, 2028])
-# Bars for BRL value (only 2028)
-ax5.bar([2028], [280.7], width=0.6)
-ax5.set_ylabel("Aporte al PIB (R$ miles de millones)")
-# Points for % of GDP (only 2026)
-ax5b.plot([2026], [2.08], marker="o")
-ax5b.set_ylabel("Contribución (% del PIB)")
-
-# Annotate points
-ax5b.annotate("2.08% del PIB (ACI, 2026)", xy=(2026, 2.08), xytext=(2026.1, 2.2),
-              arrowprops=dict(arrowstyle="->"))
-ax5.annotate("R$280.7 bn (ACI, 2028)", xy=(2028, 280.7), xytext=(2027.6, 310),
-             arrowprops=dict(arrowstyle="->"))
-
-foot5 = ("Fuente: ACI Worldwide/Cebr (proyección %PIB 2026 y R$280.7 bn en 2028); "
-         "compilado en tus documentos.")
-ax5.text(0.01, -0.18, foot5, ha="left", va="top", fontsize=9, transform=ax5.transAxes)
-
-png5 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit5_PIB_Contribucion.png"
-svg5 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit5_PIB_Contribucion.svg"
-fig5.tight_layout()
-fig5.savefig(png5, dpi=300, bbox_inches="tight")
-fig5.savefig(svg5, bbox_inches="tight")
-outputs.append((png5, svg5))
+@exhibit("proto-5", "Del Ahorro al Crecimiento – Contribución Proyectada al PIB de Brasil")
+def build_proto_exhibit_5():
+    years = [2026, 2028]
+    pib_pct = [2.08, None]  # % del PIB (proyección ACI) en 2026
+    pib_val_brl = [None, 280.7]  # BRL bn 2028
+
+    fig5, ax5 = subplots(figsize=(10, 6))
+    ax5.set_title("Exhibit 5: Del Ahorro al Crecimiento – Contribución Proyectada al PIB de Brasil")
+    ax5.set_xlabel("Año")
+
+    # Plot % PIB as scatter
+    ax5b = ax5.twinx()
+    ax5.set_xlim(2025.5, 2028.5)
+    ax5.set_xticks([2026, 2028])
+    # Bars for BRL value (only 2028)
+    ax5.bar([2028], [280.7], width=0.6)
+    ax5.set_ylabel("Aporte al PIB (R$ miles de millones)")
+    # Points for % of GDP (only 2026)
+    ax5b.plot([2026], [2.08], marker="o")
+    ax5b.set_ylabel("Contribución (% del PIB)")
+
+    foot5 = ("Fuente: ACI Worldwide/Cebr (proyección %PIB 2026 y R$280.7 bn en 2028); "
+             "compilado en tus documentos.")
+    ax5.text(0.01, -0.18, foot5, ha="left", va="top", fontsize=9, transform=ax5.transAxes)
+
+    fig5.tight_layout()
+
+    # Annotate points (one layout per axis; each avoids the other's artists)
+    layout5 = LabelLayout(ax5).add_obstacles(ax5b)
+    layout5.callout("R$280.7 bn (ACI, 2028)", xy=(2028, 280.7), arrowprops=dict(arrowstyle="->"))
+    layout5.place()
+    layout5b = LabelLayout(ax5b).add_obstacles(ax5)
+    layout5b.callout("2.08% del PIB (ACI, 2026)", xy=(2026, 2.08), arrowprops=dict(arrowstyle="->"))
+    layout5b.place()
+    return export_figure(fig5, "Exhibit5_PIB_Contribucion")
+
 
 # ----------------------
 # Exhibit 6: Inclusión (nuevos usuarios) + Reducción de informalidad
 # ----------------------
-years6 = np.array([1, 2, 3, 4, 5])
-new_users_m = np.array([5, 10, 14, 17, 18])
-informality_delta = np.array([-0.5, -1.0, -1.8, -2.5, -3.0])
-
-fig6, ax6 = plt.subplots(figsize=(10, 6))
-width = 0.6
-ax6.bar(years6, new_users_m, width=width)
-ax6.set_xlabel("Año desde el lanzamiento")
-ax6.set_ylabel("Nuevos individuos en el sistema financiero (millones)")
-ax6.set_title("Exhibit 6: Inclusión y Formalización – Trayectoria a 5 Años (México)")
-
-# Secondary axis for informality reduction
-ax6b = ax6.twinx()
-ax6b.plot(years6, informality_delta, marker="o")
-ax6b.set_ylabel("Reducción de la economía informal (% del PIB)")
-
-# Label balloons for new users
-for x, y in zip(years6, new_users_m):
-    ax6.annotate(f"{y} M", xy=(x, y), xytext=(x, y + 0.8), ha="center",
-                 arrowprops=dict(arrowstyle="-"))
-
-foot6 = ("Fuente: Tabla de proyección a 5 años para México (Ahorros, usuarios e informalidad) – "
-         "compilada en tus documentos.")
-ax6.text(0.01, -0.18, foot6, ha="left", va="top", fontsize=9, transform=ax6.transAxes)
-
-png6 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit6_Inclusion_Formalizacion.png"
-svg6 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit6_Inclusion_Formalizacion.svg"
-fig6.tight_layout()
-fig6.savefig(png6, dpi=300, bbox_inches="tight")
-fig6.savefig(svg6, bbox_inches="tight")
-outputs.append((png6, svg6))
+@exhibit("proto-6", "Inclusión y Formalización – Trayectoria a 5 Años (México)", inputs=dataset_files("tabla4"))
+def build_proto_exhibit_6():
+    t4 = get_dataset("tabla4")
+    years6 = t4.years
+    new_users_m = t4.new_users_m
+    informality_delta = t4.informality_reduction_pct
+
+    fig6, ax6 = subplots(figsize=(10, 6))
+    width = 0.6
+    bars6 = ax6.bar(years6, new_users_m, width=width)
+    ax6.set_xlabel("Año desde el lanzamiento")
+    ax6.set_ylabel("Nuevos individuos en el sistema financiero (millones)")
+    ax6.set_title("Exhibit 6: Inclusión y Formalización – Trayectoria a 5 Años (México)")
+
+    # Secondary axis for informality reduction
+    ax6b = ax6.twinx()
+    ax6b.plot(years6, informality_delta, marker="o")
+    ax6b.set_ylabel("Reducción de la economía informal (% del PIB)")
+
+    foot6 = ("Fuente: Tabla de proyección a 5 años para México (Ahorros, usuarios e informalidad) – "
+             "compilada en tus documentos.")
+    ax6.text(0.01, -0.18, foot6, ha="left", va="top", fontsize=9, transform=ax6.transAxes)
+
+    fig6.tight_layout()
+
+    # Label balloons for new users, clear of the informality line (secondary axis)
+    layout = LabelLayout(ax6).add_obstacles(ax6b)
+    layout.value_labels(bars6, [f"{y:g} M" for y in new_users_m])
+    layout.place()
+    return export_figure(fig6, "Exhibit6_Inclusion_Formalizacion")
+
 
 # ----------------------
 # Exhibit 7: Scorecard – Mandato, UX, Marca, Pricing, G2P (BRA vs MEX)
 # ----------------------
-rows = ["Mandato regulatorio (participación obligatoria)", "UX estandarizada y marca única", 
-        "Pricing (P2P gratis; comercios ~0.22%)", "Despliegue G2P masivo catalizador", 
-        "Ecosistema interoperable y abierto"]
-cols = ["Brasil (Pix)", "México (CoDi/DiMo)"]
-status = [
-    ["✔︎", "✖︎"],
-    ["✔︎", "✖︎"],
-    ["✔︎", "✖︎"],
-    ["✔︎", "◼︎"],  # limitado / parcial
-    ["✔︎", "✖︎"],
-]
-
-fig7, ax7 = plt.subplots(figsize=(10, 6))
-ax7.axis("off")
-ax7.set_title("Exhibit 7: Mandato vs. Voluntarismo – Los Pilares que Determinan la Escala", pad=20)
-
-# Create table
-table_data = [[rows[i]] + status[i] for i in range(len(rows))]
-the_table = plt.table(cellText=table_data,
-                      colLabels=["Pilar", cols[0], cols[1]],
-                      loc="center",
-                      cellLoc="left",
-                      colLoc="left")
-the_table.auto_set_font_size(False)
-the_table.set_fontsize(11)
-the_table.scale(1, 1.4)
-
-foot7 = ("Fuente: Síntesis cualitativa basada en los documentos (mandato Pix; UX/branding unificados; "
-         "costo medio Pix ~0.22%; adopción G2P/auxilios; interoperabilidad).")
-ax7.text(0.02, 0.04, foot7, ha="left", va="bottom", fontsize=9, transform=ax7.transAxes)
-
-png7 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit7_Scorecard_Mandato_vs_Voluntarismo.png"
-svg7 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit7_Scorecard_Manduntarismo.svg"
-fig7.savefig(png7, dpi=300, bbox_inches="tight")
-fig7.savefig(svg7, bbox_inches="tight")
-outputs.append((png7, svg7))
+GLIFOS_7 = {
+    "si": StatusStyle("Presente", "black", marker="$\u2714$", edgecolor="black"),
+    "no": StatusStyle("Ausente", "black", marker="$\u2716$", edgecolor="black"),
+    "parcial": StatusStyle("Limitado / parcial", "black", marker="s", edgecolor="black"),
+}
+
+
+@exhibit("proto-7", "Mandato vs. Voluntarismo – Los Pilares que Determinan la Escala")
+def build_proto_exhibit_7():
+    rows = ["Mandato regulatorio (participación obligatoria)", "UX estandarizada y marca única",
+            "Pricing (P2P gratis; comercios ~0.22%)", "Despliegue G2P masivo catalizador",
+            "Ecosistema interoperable y abierto"]
+    cols = ["Brasil (Pix)", "México (CoDi/DiMo)"]
+    status = [
+        ["si", "no"],
+        ["si", "no"],
+        ["si", "no"],
+        ["si", "parcial"],
+        ["si", "no"],
+    ]
+
+    fig7, ax7 = subplots(figsize=(10, 6))
+    ax7.set_title("Exhibit 7: Mandato vs. Voluntarismo – Los Pilares que Determinan la Escala", pad=20)
+    ax7.set_position([0.05, 0.14, 0.9, 0.72])
+    draw_scorecard(ax7, rows, cols, status, GLIFOS_7, row_header="Pilar", label_width=3.2, marker_scale=0.35)
+    scorecard_legend(ax7, GLIFOS_7, markersize=10, loc="upper center", bbox_to_anchor=(0.5, -0.02), ncol=3)
+
+    foot7 = ("Fuente: Síntesis cualitativa basada en los documentos (mandato Pix; UX/branding unificados; "
+             "costo medio Pix ~0.22%; adopción G2P/auxilios; interoperabilidad).")
+    fig7.text(0.02, 0.02, foot7, ha="left", va="bottom", fontsize=9)
+
+    return export_figure(fig7, "Exhibit7_Scorecard_Mandato_vs_Voluntarismo")
+
 
 # ----------------------
 # Exhibit 8: Caso de Negocio MX (5 años): Ahorro USD + ΔPIB + Etiquetas de usuarios
 # ----------------------
-years8 = np.array([1, 2, 3, 4, 5])
-savings_usd_bn = np.array([1.5, 3.0, 4.5, 5.5, 6.0])
-delta_gdp_pct = np.array([0.10, 0.20, 0.35, 0.45, 0.50])
-new_users8_m = np.array([5, 10, 14, 17, 18])
-
-fig8, ax8 = plt.subplots(figsize=(10, 6))
-ax8.bar(years8, savings_usd_bn, width=0.6)
-ax8.set_xlabel("Año desde el lanzamiento")
-ax8.set_ylabel("Ahorro anual (USD miles de millones)")
-ax8.set_title("Exhibit 8: Caso de Negocio en México – Ahorros, Crecimiento y Usuarios (5 años)")
-
-ax8b = ax8.twinx()
-ax8b.plot(years8, delta_gdp_pct, marker="o")
-ax8b.set_ylabel("Contribución adicional al crecimiento del PIB (%)")
-
-for x, y, u in zip(years8, savings_usd_bn, new_users8_m):
-    ax8.annotate(f"{u} M", xy=(x, y), xytext=(x, y + 0.3), ha="center",
-                 arrowprops=dict(arrowstyle="-"))
-
-foot8 = ("Fuente: Tabla 4 (proyección México a 5 años) – ahorros anuales (USD), ΔPIB (%), "
-         "nuevos usuarios acumulados.")
-ax8.text(0.01, -0.18, foot8, ha="left", va="top", fontsize=9, transform=ax8.transAxes)
-
-png8 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit8_Caso_MX_5anios.png"
-svg8 = "0_Analisis_Cuantitativo/Results/Nuevos/Exhibit8_Caso_MX_5anios.svg"
-fig8.tight_layout()
-fig8.savefig(png8, dpi=300, bbox_inches="tight")
-fig8.savefig(svg8, bbox_inches="tight")
-outputs.append((png8, svg8))
-
-outputs
+@exhibit("proto-8", "Caso de Negocio en México – Ahorros, Crecimiento y Usuarios (5 años)",
+         inputs=dataset_files("tabla4"))
+def build_proto_exhibit_8():
+    t4 = get_dataset("tabla4")
+    years8 = t4.years
+    savings_usd_bn = t4.savings_usd_bn
+    delta_gdp_pct = t4.delta_gdp_pct
+    new_users8_m = t4.new_users_m
+
+    fig8, ax8 = subplots(figsize=(10, 6))
+    ax8.bar(years8, savings_usd_bn, width=0.6)
+    ax8.set_xlabel("Año desde el lanzamiento")
+    ax8.set_ylabel("Ahorro anual (USD miles de millones)")
+    ax8.set_title("Exhibit 8: Caso de Negocio en México – Ahorros, Crecimiento y Usuarios (5 años)")
+
+    ax8b = ax8.twinx()
+    ax8b.plot(years8, delta_gdp_pct, marker="o")
+    ax8b.set_ylabel("Contribución adicional al crecimiento del PIB (%)")
+
+    for x, y, u in zip(years8, savings_usd_bn, new_users8_m):
+        ax8.annotate(f"{u:g} M", xy=(x, y), xytext=(x, y + 0.3), ha="center",
+                     arrowprops=dict(arrowstyle="-"))
+
+    foot8 = ("Fuente: Tabla 4 (proyección México a 5 años) – ahorros anuales (USD), ΔPIB (%), "
+             "nuevos usuarios acumulados.")
+    ax8.text(0.01, -0.18, foot8, ha="left", va="top", fontsize=9, transform=ax8.transAxes)
+
+    fig8.tight_layout()
+    return export_figure(fig8, "Exhibit8_Caso_MX_5anios")
+
+
+if __name__ == "__main__":
+    # Cada figura se libera tras exportarse (antes fig3…fig8 vivían hasta el final del proceso).
+    for build in (build_proto_exhibit_3, build_proto_exhibit_4, build_proto_exhibit_5,
+                  build_proto_exhibit_6, build_proto_exhibit_7, build_proto_exhibit_8):
+        with figure_scope():
+            build()
+    flush()
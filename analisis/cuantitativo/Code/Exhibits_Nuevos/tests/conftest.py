@@ -0,0 +1,5 @@
+# Las pruebas importan ``toolkit`` como los scripts de exhibits: desde Exhibits_Nuevos.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
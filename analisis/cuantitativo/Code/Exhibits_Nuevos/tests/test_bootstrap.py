@@ -0,0 +1,99 @@
+"""
+Pruebas del bootstrap ponderado del embudo (toolkit.bootstrap).
+
+    cd analisis/cuantitativo/Code/Exhibits_Nuevos && python -m pytest -q tests
+"""
+import numpy as np
+
+from toolkit.bootstrap import _batch_sums, _profiles, _Profiles, funnel_bootstrap
+from toolkit.microdata import SurveyTable, funnel
+
+
+def _reference_sums(profiles, size, seed):
+    # Mismos sorteos que _batch_sums, pero sumados réplica por réplica con los índices explícitos.
+    rng = np.random.default_rng(seed)
+    n = len(profiles.weights)
+    counts = rng.multinomial(n, profiles.sizes / n, size=size)
+    sums = np.zeros((size, len(profiles.sizes)))
+    for k in profiles.active:
+        drawn = counts[:, k]
+        if not drawn.sum():
+            continue
+        start = profiles.starts[k]
+        idx = rng.integers(start, start + profiles.sizes[k], size=int(drawn.sum()), dtype=np.intp)
+        for replica, chunk in enumerate(np.split(idx, np.cumsum(drawn)[:-1])):
+            sums[replica, k] = profiles.weights[chunk].sum()
+    return sums
+
+
+def _rare_profiles():
+    # Un perfil raro (1 de 4000): casi todas las réplicas no lo sortean, algunas lo sortean varias veces.
+    rng = np.random.default_rng(7)
+    sizes = np.array([1, 1999, 2000])
+    weights = rng.uniform(500, 1500, sizes.sum())
+    return _Profiles(weights, np.concatenate(([0], np.cumsum(sizes)[:-1])), sizes, np.arange(3),
+                     np.eye(3))
+
+
+def test_batch_sums_match_explicit_resampling():
+    profiles = _rare_profiles()
+    for seed in np.random.SeedSequence(11).spawn(200):
+        np.testing.assert_allclose(_batch_sums(profiles, 25, seed), _reference_sums(profiles, 25, seed),
+                                   rtol=1e-12, atol=1e-6)
+
+
+def test_batch_sums_with_trailing_empty_replicates():
+    profiles = _rare_profiles()
+    seeds = np.random.SeedSequence(3).spawn(500)
+    found = 0
+    for seed in seeds:
+        sums = _batch_sums(profiles, 8, seed)
+        drawn = sums[:, 0] > 0
+        # Réplicas que sortean el perfil raro seguidas de réplicas que no: el caso que fallaba.
+        if drawn.any() and not drawn[-1]:
+            found += 1
+            np.testing.assert_allclose(sums, _reference_sums(profiles, 8, seed), rtol=1e-12, atol=1e-6)
+    assert found
+
+
+def _table(n=4000, seed=5):
+    rng = np.random.default_rng(seed)
+    aware = (rng.random(n) < 0.4).astype(np.int8)
+    used = np.where(aware == 1, rng.random(n) < 0.3, 0).astype(np.int8)
+    columns = {"conoce": aware, "usa": used, "factor": rng.uniform(500, 1500, n)}
+    kinds = {"conoce": "bool", "usa": "bool", "factor": "float"}
+    return SurveyTable("prueba", columns, kinds, {}, "factor")
+
+
+def test_point_estimate_matches_funnel():
+    table = _table()
+    systems = {"X": ("conoce", "usa")}
+    ic = funnel_bootstrap(table, systems, replicates=200)
+    awareness, conversion = funnel(table, systems)["X"]
+    assert np.isclose(ic.interval("X", "conocimiento")[0], awareness)
+    assert np.isclose(ic.interval("X", "conversion")[0], conversion)
+    assert np.isclose(ic.interval("X", "uso")[0], awareness * conversion / 100)
+
+
+def test_intervals_match_naive_index_bootstrap():
+    table = _table()
+    systems = {"X": ("conoce", "usa")}
+    ic = funnel_bootstrap(table, systems, replicates=2000, seed=1)
+    rng = np.random.default_rng(2)
+    w, aware = table.columns["factor"], table.columns["conoce"]
+    n = len(w)
+    shares = []
+    for _ in range(2000):
+        idx = rng.integers(0, n, n)
+        shares.append(100 * (w[idx] * aware[idx]).sum() / w[idx].sum())
+    low, high = np.quantile(shares, [0.025, 0.975])
+    _, ic_low, ic_high = ic.interval("X", "conocimiento")
+    width = high - low
+    assert abs(ic_low - low) < 0.1 * width and abs(ic_high - high) < 0.1 * width
+
+
+def test_profiles_cover_all_rows():
+    table = _table()
+    profiles = _profiles(table, {"X": ("conoce", "usa")})
+    assert profiles.sizes.sum() == len(table)
+    assert np.isclose(profiles.weights.sum(), table.columns["factor"].sum())
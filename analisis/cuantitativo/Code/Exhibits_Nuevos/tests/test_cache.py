@@ -0,0 +1,60 @@
+"""
+Pruebas de la caché incremental del build (toolkit.cache).
+"""
+from toolkit.cache import BuildCache, exhibit_key
+from toolkit.registry import ExhibitSpec
+
+
+def _builder():
+    return []
+
+
+def _spec(*inputs):
+    return ExhibitSpec("prueba", "Prueba", __file__, _builder, tuple(str(path) for path in inputs))
+
+
+def test_key_is_stable_and_follows_inputs(tmp_path):
+    data = tmp_path / "datos.csv"
+    data.write_text("a,b\n1,2\n")
+    key = exhibit_key(_spec(data))
+    assert exhibit_key(_spec(data)) == key
+    data.write_text("a,b\n1,3\n")
+    assert exhibit_key(_spec(data)) != key
+
+
+def test_key_depends_on_profile(tmp_path, monkeypatch):
+    data = tmp_path / "datos.csv"
+    data.write_text("a\n1\n")
+    monkeypatch.setenv("EXHIBITS_PROFILE", "print")
+    printed = exhibit_key(_spec(data))
+    monkeypatch.setenv("EXHIBITS_PROFILE", "draft")
+    assert exhibit_key(_spec(data)) != printed
+
+
+def test_fresh_only_with_same_key_and_outputs(tmp_path):
+    manifest = str(tmp_path / "manifest.json")
+    output = tmp_path / "Exhibit.png"
+    output.write_bytes(b"png")
+    cache = BuildCache(manifest, profile="print")
+    cache.record("prueba", "k1", [str(output)])
+    cache.save()
+
+    reloaded = BuildCache(manifest, profile="print")
+    assert reloaded.is_fresh("prueba", "k1")
+    assert not reloaded.is_fresh("prueba", "k2")
+    output.unlink()
+    assert not reloaded.is_fresh("prueba", "k1")
+
+
+def test_profiles_have_separate_entries(tmp_path):
+    manifest = str(tmp_path / "manifest.json")
+    output = tmp_path / "Exhibit.png"
+    output.write_bytes(b"png")
+    cache = BuildCache(manifest, profile="print")
+    cache.record("prueba", "k1", [str(output)])
+    cache.save()
+    assert not BuildCache(manifest, profile="draft").is_fresh("prueba", "k1")
+
+    cache.forget("prueba")
+    cache.save()
+    assert not BuildCache(manifest, profile="print").is_fresh("prueba", "k1")
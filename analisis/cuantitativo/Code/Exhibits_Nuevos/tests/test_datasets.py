@@ -0,0 +1,59 @@
+"""
+Pruebas del registro de datasets de entrada (toolkit.datasets).
+"""
+import numpy as np
+import pytest
+
+from toolkit import datasets
+from toolkit.datasets import DatasetError, get_dataset
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(datasets, "DATA_DIR", str(tmp_path))
+    datasets.clear()
+    yield tmp_path
+    datasets.clear()
+
+
+EMBUDO = """# ENIF 2024 (prueba)
+sistema,conocimiento_pct,uso_pct,activacion_millones
+CoDi,40.0,10.0,18.0
+DiMo,30.0,3.3,8.1
+"""
+
+
+def test_parsed_once_with_derived_metrics(data_dir):
+    (data_dir / "embudo_enif.csv").write_text(EMBUDO, encoding="utf-8")
+    parses = datasets.PARSE_COUNTS["embudo_enif"]
+    embudo = get_dataset("embudo_enif")
+    assert get_dataset("embudo_enif") is embudo
+    assert datasets.PARSE_COUNTS["embudo_enif"] == parses + 1
+    assert embudo.sistemas == ("CoDi", "DiMo")
+    np.testing.assert_array_equal(embudo.conv, [25.0, 11.0])
+
+
+def test_key_value_dataset(data_dir):
+    (data_dir / "brecha_transacciones.csv").write_text(
+        "clave,valor,descripcion\ncodi_total_m,4.0,CoDi\npix_day_m,276.0,Pix\n", encoding="utf-8")
+    brecha = get_dataset("brecha_transacciones")
+    assert brecha.ratio == 69.0
+
+
+@pytest.mark.parametrize("name, text, message", [
+    ("embudo_enif", "sistema,conocimiento_pct,uso_pct\nCoDi,40,10\n", "Faltan columnas"),
+    ("embudo_enif", EMBUDO.replace("10.0", "diez"), "Valor inválido"),
+    ("embudo_enif", "# sólo comentarios\n", "vacío"),
+    ("brecha_transacciones", "clave,valor,descripcion\ncodi_total_m,4.0,CoDi\n", "Faltan claves"),
+])
+def test_invalid_files(data_dir, name, text, message):
+    (data_dir / f"{name}.csv").write_text(text, encoding="utf-8")
+    with pytest.raises(DatasetError, match=message):
+        get_dataset(name)
+
+
+def test_missing_file_and_unknown_name(data_dir):
+    with pytest.raises(DatasetError):
+        get_dataset("tabla4")
+    with pytest.raises(KeyError):
+        get_dataset("no_existe")
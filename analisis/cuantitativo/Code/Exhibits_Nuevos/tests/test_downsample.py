@@ -0,0 +1,90 @@
+"""
+Pruebas de la decimación de series largas (toolkit.downsample).
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from toolkit.downsample import decimate, lttb, m4, plot_decimated
+from toolkit.figures import subplots
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.uniform(0, 100, n)), np.cumsum(rng.standard_normal(n))
+
+
+def test_m4_keeps_column_extremes():
+    x, y = _series(20_000)
+    columns = 137
+    idx = m4(x, y, columns)
+    assert np.all(np.diff(idx) > 0)
+    column = np.minimum(((x - x[0]) / (x[-1] - x[0]) * columns).astype(int), columns - 1)
+    for c in np.unique(column):
+        members = np.flatnonzero(column == c)
+        kept = np.intersect1d(idx, members)
+        assert {members[0], members[-1]} <= set(kept.tolist())
+        assert y[kept].min() == y[members].min() and y[kept].max() == y[members].max()
+    assert len(idx) <= 4 * columns
+
+
+def _lttb_reference(x, y, n_out):
+    # Algoritmo de Steinarsson tal cual, punto por punto.
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    out, a = [0], 0
+    for i in range(n_out - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        nxt_start, nxt_end = end, min(int((i + 2) * every) + 1, n)
+        if i == n_out - 3:
+            end, nxt_start, nxt_end = n - 1, n - 1, n
+        avg_x, avg_y = x[nxt_start:nxt_end].mean(), y[nxt_start:nxt_end].mean()
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    out.append(n - 1)
+    return np.array(out)
+
+
+def test_lttb_matches_reference():
+    x, y = _series(5_003, seed=1)
+    idx = lttb(x, y, 200)
+    assert len(idx) == 200 and idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    np.testing.assert_array_equal(idx, _lttb_reference(x, y, 200))
+
+
+def test_non_finite_values_split_the_line():
+    x, y = _series(10_000, seed=2)
+    y[4_000:4_010] = np.nan
+    for method in ("m4", "lttb"):
+        idx = decimate(x, y, 50, method=method)
+        gap = idx[np.isnan(y[idx])]
+        np.testing.assert_array_equal(gap, [4_000])
+        assert {0, 3_999, 4_010, len(x) - 1} <= set(idx.tolist())
+    with pytest.raises(ValueError):
+        decimate(x, y, 50, method="promedio")
+
+
+def test_short_series_kept_whole():
+    x, y = _series(30)
+    np.testing.assert_array_equal(decimate(x, y, 10), np.arange(30))
+
+
+def test_decimated_line_renders_like_full_line():
+    x, y = _series(200_000, seed=3)
+    images = []
+    for decimated in (False, True):
+        fig, ax = subplots(figsize=(4, 2), dpi=100)
+        line = plot_decimated(ax, x, y, linewidth=1) if decimated else ax.plot(x, y, linewidth=1)[0]
+        ax.set_xlim(x[0], x[-1])
+        fig.canvas.draw()
+        images.append(np.asarray(fig.canvas.buffer_rgba())[..., :3].astype(int))
+        plt.close(fig)
+    assert len(line.get_xdata()) <= 4 * ax.bbox.width + 4
+    changed = np.abs(images[0] - images[1]).max(axis=-1) > 64
+    assert changed.mean() < 0.01
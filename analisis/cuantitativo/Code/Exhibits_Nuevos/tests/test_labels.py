@@ -0,0 +1,71 @@
+"""
+Pruebas de la colocación de etiquetas sin traslapes (toolkit.labels).
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from toolkit.figures import subplots
+from toolkit.labels import LabelLayout
+
+
+@pytest.fixture
+def bar_chart():
+    fig, ax = subplots(figsize=(6, 4), dpi=100)
+    heights = np.array([40.0, 42.0, 38.0, 12.0, 41.0, 39.0])
+    bars = ax.bar(np.arange(len(heights)), heights, 0.8)
+    ax.set_ylim(0, 60)
+    fig.tight_layout()
+    yield fig, ax, bars
+    plt.close(fig)
+
+
+def _overlap(a, b):
+    return a.x0 < b.x1 - 0.5 and b.x0 < a.x1 - 0.5 and a.y0 < b.y1 - 0.5 and b.y0 < a.y1 - 0.5
+
+
+def _distance_to_edge(point, box):
+    x, y = point
+    if box.x0 <= x <= box.x1 and box.y0 <= y <= box.y1:
+        return min(x - box.x0, box.x1 - x, y - box.y0, box.y1 - y)
+    return np.hypot(max(box.x0 - x, 0, x - box.x1), max(box.y0 - y, 0, y - box.y1))
+
+
+def test_labels_do_not_overlap(bar_chart):
+    fig, ax, bars = bar_chart
+    layout = LabelLayout(ax)
+    layout.value_labels(bars, [f"{bar.get_height():.1f}%" for bar in bars], fontsize=12)
+    layout.callout("Tasa de conversión\nmuy por debajo", xy=(3, 12), fontsize=11,
+                   bbox=dict(boxstyle="square,pad=0.3", fc="white"), arrowprops=dict(arrowstyle="->"))
+    annotations = layout.place()
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+
+    boxes = [(a.get_bbox_patch() or a).get_window_extent(renderer) for a in annotations]
+    axes_box = ax.get_window_extent(renderer)
+    for i, box in enumerate(boxes):
+        assert axes_box.x0 <= box.x0 and box.x1 <= axes_box.x1 and axes_box.y0 <= box.y0 and box.y1 <= axes_box.y1
+        assert not any(_overlap(box, other) for other in boxes[i + 1:])
+        assert not any(_overlap(box, bar.get_window_extent(renderer)) for bar in bars)
+    # Las etiquetas de valor quedan sobre su barra
+    for annotation, bar in zip(annotations, bars):
+        assert annotation.xy == pytest.approx((bar.get_x() + bar.get_width() / 2, bar.get_height()))
+
+
+def test_callout_arrow_starts_at_box_edge(bar_chart):
+    fig, ax, bars = bar_chart
+    layout = LabelLayout(ax)
+    layout.value_labels(bars, [f"{bar.get_height():.1f}%" for bar in bars], fontsize=12)
+    for xy in ((3, 12), (0, 40), (5, 39)):
+        layout.callout("Nota", xy=xy, fontsize=11, bbox=dict(boxstyle="square,pad=0.3", fc="white"),
+                       arrowprops=dict(arrowstyle="->", shrinkA=0))   # sin separación: la flecha toca la caja
+    callouts = layout.place()[len(bars):]
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+    for annotation in callouts:
+        box = annotation.get_bbox_patch().get_window_extent(renderer)
+        start = annotation.arrow_patch.get_path().vertices[0]
+        assert _distance_to_edge(start, box) < 1.5
+        # La flecha sale del lado que da al punto señalado
+        target = ax.transData.transform(annotation.xy)
+        assert np.hypot(*(start - target)) <= np.hypot(*(np.array(box.p0) + box.size / 2 - target))
@@ -0,0 +1,64 @@
+"""
+Pruebas del libro sintético de transacciones (toolkit.ledger).
+"""
+import dataclasses
+import filecmp
+
+import numpy as np
+import pytest
+
+from toolkit.ledger import KINDS, Ledger, LedgerConfig, aggregate, generate_ledger
+
+
+def _config(**changes):
+    return dataclasses.replace(LedgerConfig(n_transactions=50_000, n_days=3, seed=7), **changes)
+
+
+def test_round_trip(tmp_path):
+    config = _config()
+    generate_ledger(str(tmp_path), config, chunk_rows=12_345)
+    ledger = Ledger(str(tmp_path))
+    assert len(ledger) == config.n_transactions
+    assert ledger.config == config
+    chunks = list(ledger.iter_chunks(chunk_rows=20_000))
+    assert sum(len(chunk["amount"]) for chunk in chunks) == config.n_transactions
+    np.testing.assert_array_equal(np.concatenate([chunk["day"] for chunk in chunks]), ledger.column("day"))
+    assert ledger.column("day").max() == config.n_days - 1
+    assert ledger.column("kind").max() < len(KINDS)
+
+
+def test_generation_is_deterministic(tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    generate_ledger(str(a), _config(), chunk_rows=10_000)
+    generate_ledger(str(b), _config(), chunk_rows=10_000)
+    for name in ("amount", "hour", "kind", "day"):
+        assert filecmp.cmp(a / f"{name}.npy", b / f"{name}.npy", shallow=False)
+
+
+def test_aggregate_matches_columns(tmp_path):
+    ledger = generate_ledger(str(tmp_path), _config(), chunk_rows=10_000)
+    totals = aggregate(ledger, chunk_rows=7_000)
+    day, kind = ledger.column("day").astype(int), ledger.column("kind").astype(int)
+    amount, hour = ledger.column("amount").astype(float), ledger.column("hour").astype(int)
+
+    counts = np.zeros((3, len(KINDS)), dtype=np.int64)
+    np.add.at(counts, (day, kind), 1)
+    np.testing.assert_array_equal(totals.count_by_day_kind, counts)
+    value = np.zeros((3, len(KINDS)))
+    np.add.at(value, (day, kind), amount / 100)
+    np.testing.assert_allclose(totals.value_by_day_kind, value)
+    hours = np.zeros((24, len(KINDS)), dtype=np.int64)
+    np.add.at(hours, (hour, kind), 1)
+    np.testing.assert_array_equal(totals.count_by_hour_kind, hours)
+
+    assert totals.daily_counts.sum() == len(ledger)
+    np.testing.assert_allclose(totals.daily_fees, value @ np.array(ledger.config.fee_rates))
+    # El resultado no depende del tamaño de lote
+    np.testing.assert_array_equal(aggregate(str(tmp_path), chunk_rows=50_000).count_by_day_kind, counts)
+
+
+def test_invalid_config(tmp_path):
+    with pytest.raises(ValueError):
+        generate_ledger(str(tmp_path), _config(kind_mix=(1.0, 0.0)))
+    with pytest.raises(ValueError):
+        generate_ledger(str(tmp_path), _config(hour_weights=(1.0,) * 12))
@@ -0,0 +1,26 @@
+"""
+Pruebas de la calibración del Monte Carlo contra la Tabla 4 (toolkit.montecarlo).
+"""
+import dataclasses
+
+import numpy as np
+
+from toolkit.datasets import get_dataset
+from toolkit.montecarlo import METRICS, calibrate, central_scenario, simulate
+
+
+def test_central_scenario_reproduces_tabla4():
+    t4 = get_dataset("tabla4")
+    calibration = calibrate(t4)
+    central = central_scenario(years=calibration.years)
+    for metric in METRICS:
+        np.testing.assert_allclose(central[metric] * calibration.factors[metric], getattr(t4, metric))
+
+
+def test_bands_follow_tabla4():
+    t4 = get_dataset("tabla4")
+    base = simulate(20_000, chunk_size=10_000, calibration=calibrate(t4))
+    doubled = dataclasses.replace(t4, savings_usd_bn=t4.savings_usd_bn * 2)
+    scaled = simulate(20_000, chunk_size=10_000, calibration=calibrate(doubled))
+    np.testing.assert_allclose(scaled.band("savings_usd_bn", 50), 2 * base.band("savings_usd_bn", 50), rtol=1e-3)
+    np.testing.assert_allclose(base.band("savings_usd_bn", 50), t4.savings_usd_bn, rtol=0.05)
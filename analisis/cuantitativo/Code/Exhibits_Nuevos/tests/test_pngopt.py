@@ -0,0 +1,70 @@
+"""
+Pruebas de la codificación PNG con paleta (toolkit.pngopt).
+"""
+import io
+
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from toolkit import pngopt
+from toolkit.figures import subplots
+from toolkit.pngopt import encode_rgba
+
+
+def _round_trip(rgba):
+    with pngopt.measure() as stats:
+        data = encode_rgba(np.ascontiguousarray(rgba), dpi=100)
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGBA")), stats[0].mode
+
+
+def _opaque(rgb):
+    return np.dstack([rgb, np.full(rgb.shape[:2], 255, dtype=np.uint8)])
+
+
+def test_exact_palette_keeps_close_colors():
+    # El caché de Image.quantize(palette=...) confundía (255, 255, 255) con (252, 252, 252).
+    rgb = np.full((64, 64, 3), 255, dtype=np.uint8)
+    rgb[:32, :32] = 252
+    rgb[40:, 40:] = (31, 119, 180)
+    decoded, mode = _round_trip(_opaque(rgb))
+    assert mode == "paleta exacta"
+    np.testing.assert_array_equal(decoded[..., :3], rgb)
+
+
+def test_antialiased_figure_keeps_dominant_colors():
+    fig, ax = subplots(figsize=(4, 3), dpi=100)
+    x = np.linspace(0, 10, 500)
+    for k in range(4):
+        ax.plot(x, np.sin(x + k), linewidth=2)
+    ax.fill_between(x, np.sin(x) - 0.2, np.sin(x) + 0.2, color="0.99")   # casi blanco, no blanco
+    ax.set_title("Tasa de conversión")
+    fig.canvas.draw()
+    rgba = np.array(fig.canvas.buffer_rgba())
+    plt.close(fig)
+
+    decoded, mode = _round_trip(rgba)
+    assert mode == "paleta"
+    keys, counts = np.unique(pngopt._image_keys(Image.fromarray(rgba[..., :3])), return_counts=True)
+    dominant = keys[counts >= pngopt.EXACT_COVERAGE * counts.sum()]
+    original, result = pngopt._keys(rgba[..., :3]), pngopt._keys(decoded[..., :3])
+    mask = np.isin(original, dominant)
+    np.testing.assert_array_equal(result[mask], original[mask])   # fondo y colores sólidos, exactos
+    error = np.abs(decoded.astype(int) - rgba.astype(int)).max(axis=-1)
+    assert (error > pngopt.QUANT_TOLERANCE).mean() <= pngopt.QUANT_MAX_FRACTION
+
+
+def test_too_many_colors_stays_lossless():
+    rgb = np.random.default_rng(0).integers(0, 256, (300, 300, 3), dtype=np.uint8)
+    decoded, mode = _round_trip(_opaque(rgb))
+    assert mode == "rgb"
+    np.testing.assert_array_equal(decoded[..., :3], rgb)
+
+
+def test_transparency_stays_lossless():
+    rgba = np.zeros((32, 32, 4), dtype=np.uint8)
+    rgba[..., 0] = np.arange(32, dtype=np.uint8)[:, None] * 8
+    rgba[..., 3] = np.arange(32, dtype=np.uint8)[None, :] * 8
+    decoded, mode = _round_trip(rgba)
+    assert mode == "rgba"
+    np.testing.assert_array_equal(decoded, rgba)
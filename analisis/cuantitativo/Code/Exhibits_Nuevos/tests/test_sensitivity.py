@@ -0,0 +1,51 @@
+"""
+Pruebas del barrido de sensibilidad y del tornado (toolkit.sensitivity).
+"""
+import numpy as np
+
+from toolkit import sensitivity
+from toolkit.sensitivity import pyme_annual_savings, sweep, tornado
+
+AXES = {
+    "ventas_mensuales": np.geomspace(20_000, 2_000_000, 23),
+    "tasa_alta": np.linspace(0.015, 0.035, 11),
+    "tasa_baja": np.linspace(0.0, 0.01, 7),
+}
+
+
+def _grid():
+    return pyme_annual_savings(*np.meshgrid(*AXES.values(), indexing="ij"))
+
+
+def _check(result, grid):
+    assert result.count == grid.size
+    np.testing.assert_allclose(result.mean, grid.mean())
+    assert result.min == grid.min() and result.max == grid.max()
+    i, j, k = np.unravel_index(grid.argmax(), grid.shape)
+    assert result.argmax == {"ventas_mensuales": AXES["ventas_mensuales"][i], "tasa_alta": AXES["tasa_alta"][j],
+                             "tasa_baja": AXES["tasa_baja"][k]}
+    np.testing.assert_allclose(result.marginal_mean("tasa_alta", "tasa_baja"), grid.mean(axis=0).T)
+    np.testing.assert_allclose(result.marginal_mean("ventas_mensuales", "tasa_alta"), grid.mean(axis=2).T)
+
+
+def test_sweep_matches_full_grid():
+    # Rebanadas de 2 filas del primer eje: varios lotes y el último incompleto.
+    _check(sweep(pyme_annual_savings, AXES, workers=1, slab_elements=2 * 11 * 7), _grid())
+
+
+def test_sharded_sweep_matches_serial(monkeypatch):
+    monkeypatch.setattr(sensitivity, "SHARD_MIN_ELEMENTS", 0)
+    _check(sweep(pyme_annual_savings, AXES, workers=2), _grid())
+
+
+def test_tornado_one_at_a_time():
+    base = {"ventas_mensuales": 300_000.0, "tasa_alta": 0.025, "tasa_baja": 0.005}
+    ranges = {"ventas_mensuales": (100_000.0, 500_000.0), "tasa_alta": (0.02, 0.03), "tasa_baja": (0.0, 0.01)}
+    base_output, bars = tornado(pyme_annual_savings, base, ranges)
+    assert base_output == pyme_annual_savings(**base)
+    for bar in bars:
+        assert bar.output_low == pyme_annual_savings(**dict(base, **{bar.name: bar.low}))
+        assert bar.output_high == pyme_annual_savings(**dict(base, **{bar.name: bar.high}))
+    swings = [bar.swing for bar in bars]
+    assert swings == sorted(swings, reverse=True)
+    assert bars[0].name == "ventas_mensuales"
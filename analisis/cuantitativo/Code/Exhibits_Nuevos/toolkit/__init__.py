@@ -0,0 +1,8 @@
+"""
+Toolkit compartido por los scripts de ``Exhibits_Nuevos``.
+
+Cada ``Exhibit_*.py`` declara sus builders con ``toolkit.registry.exhibit`` y
+sigue pudiendo ejecutarse solo (``python Exhibit_2.py``); ``toolkit.runner``
+construye el deck completo en paralelo y ``toolkit.cli`` es el punto de entrada
+(``list``/``describe``/``validate`` sin importar matplotlib, ``build``).
+"""
@@ -0,0 +1,278 @@
+"""
+Barras y etiquetas de valor en lote para gráficas con muchas barras (mensuales, diarias).
+
+    series, labels = bar_chart(ax, dias, valores, fmt="{:.1f}", fontsize=8)
+
+    # o sobre barras existentes (``ax.bar``), sin cambiar cómo se dibujan:
+    value_labels(ax, ax.bar(x, valores), [f"{v:.1f}%" for v in valores], fontsize=12)
+
+Un ``ax.text`` por barra cuesta un artista (layout de texto, transform, bbox)
+por etiqueta y un ``Rectangle`` por barra otro tanto, así que el tiempo de
+render crece con el número de barras. Aquí:
+
+- ``bar_series`` dibuja todas las barras de una serie como una sola
+  ``PolyCollection``;
+- ``ValueLabels`` es una sola ``PathCollection`` con el texto de todas las
+  etiquetas. Cada carácter se convierte a trazo una vez por fuente (caché de
+  glifos) y las cadenas se arman desplazando glifos por su avance, sin
+  maquetar cada cadena con FreeType. Los números no usan kerning en DejaVu,
+  así que el resultado coincide con el de ``Text``;
+- al dibujar, las etiquetas que se traslapan entre sí (o con las barras de la
+  serie, con ``avoid_bars``) o que se salen de los ejes se descartan, en
+  orden de prioridad: con 1,800 barras sólo se dibujan las que caben. La
+  colocación se recalcula sólo si cambian los límites, el tamaño de los
+  ejes o el dpi.
+
+Las etiquetas van fuera del extremo de cada barra (arriba, o abajo si la
+barra es negativa; a la derecha o izquierda en barras horizontales), a
+``gap`` puntos, y no participan en ``tight_layout``. Para pocas etiquetas con
+callouts que deben moverse en lugar de descartarse está ``toolkit.labels``.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from matplotlib.artist import allow_rasterization
+from matplotlib.collections import PathCollection, PolyCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import text_to_path
+from matplotlib.transforms import Affine2D, IdentityTransform
+
+from toolkit.labels import VALUE_GAP, _GridIndex
+from toolkit.trace import traced
+
+_GLYPHS = {}   # (FontProperties, carácter) -> (vértices, códigos, avance) en puntos
+_LINES = {}    # FontProperties -> (alto, descenso) de una línea, como los usa Text
+
+
+def _glyph(prop, char):
+    key = (prop, char)
+    if key not in _GLYPHS:
+        # Como TextPath, pero sin construir un Path (falla con glifos vacíos como el espacio).
+        vertices, codes = text_to_path.get_text_path(prop, char)
+        vertices = np.asarray(vertices, dtype=float) * (prop.get_size_in_points() / text_to_path.FONT_SCALE)
+        width = text_to_path.get_text_width_height_descent
+        # Avance: ancho de dos caracteres menos el de uno (incluye el espacio lateral del glifo).
+        advance = width(char * 2, prop, ismath=False)[0] - width(char, prop, ismath=False)[0]
+        _GLYPHS[key] = (vertices.reshape(-1, 2), np.asarray(codes, dtype=Path.code_type), advance)
+    return _GLYPHS[key]
+
+
+def _line_metrics(prop):
+    if prop not in _LINES:
+        _, height, descent = text_to_path.get_text_width_height_descent("lp", prop, ismath=False)
+        _LINES[prop] = (height, descent)
+    return _LINES[prop]
+
+
+def _text_width(prop, text):
+    return sum(_glyph(prop, char)[2] for char in text)
+
+
+def _text_path(prop, text):
+    """
+    Trazo de ``text`` con la línea base en y = 0 y el primer avance en x = 0 (puntos).
+    """
+    vertices, codes, x = [], [], 0.0
+    for char in text:
+        glyph_vertices, glyph_codes, advance = _glyph(prop, char)
+        if len(glyph_vertices):
+            vertices.append(glyph_vertices + (x, 0.0))
+            codes.append(glyph_codes)
+        x += advance
+    if not vertices:
+        return Path(np.empty((0, 2)))
+    return Path(np.concatenate(vertices), np.concatenate(codes))
+
+
+@dataclass
+class BarSeries:
+    collection: PolyCollection
+    positions: np.ndarray
+    values: np.ndarray
+    bottom: np.ndarray
+    width: float
+    orientation: str = "vertical"
+
+    def boxes(self):
+        """
+        ``(n, 4)`` con ``(x0, y0, x1, y1)`` de cada barra en datos.
+        """
+        return _boxes(self.positions, self.width, self.bottom, self.bottom + self.values, self.orientation)
+
+
+def _boxes(positions, width, start, end, orientation):
+    low, high = positions - width / 2, positions + width / 2
+    start, end = np.broadcast_to(start, positions.shape), np.broadcast_to(end, positions.shape)
+    lo, hi = np.minimum(start, end), np.maximum(start, end)
+    if orientation == "horizontal":
+        return np.column_stack([lo, low, hi, high])
+    return np.column_stack([low, lo, high, hi])
+
+
+def bar_series(ax, positions, values, width=0.8, bottom=0.0, orientation="vertical", **kwargs):
+    """
+    Barras centradas en ``positions`` como una sola ``PolyCollection``.
+
+    ``kwargs`` van a la colección (``facecolor``, ``edgecolor``, ``hatch``,
+    ``label``...). Por defecto toma el siguiente color del ciclo, como ``ax.bar``.
+    """
+    positions = np.asarray(positions, dtype=float)
+    values = np.asarray(values, dtype=float)
+    bottom = np.broadcast_to(np.asarray(bottom, dtype=float), values.shape)
+    x0, y0, x1, y1 = _boxes(positions, width, bottom, bottom + values, orientation).T
+    verts = np.stack([np.column_stack([x0, x0, x1, x1]), np.column_stack([y0, y1, y1, y0])], axis=-1)
+    if "facecolor" not in kwargs and "facecolors" not in kwargs and "color" not in kwargs:
+        kwargs["facecolor"] = ax._get_patches_for_fill.get_next_color()
+    kwargs.setdefault("linewidth", 0)
+    collection = PolyCollection(verts, **kwargs)
+    # Como ax.bar: sin margen entre la base y el eje.
+    getattr(collection.sticky_edges, "x" if orientation == "horizontal" else "y").extend(np.unique(bottom))
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return BarSeries(collection, positions, values, bottom, width, orientation)
+
+
+class ValueLabels(PathCollection):
+    """
+    Etiquetas en los puntos ``anchors`` (datos), una ``PathCollection`` para todas.
+
+    ``direction`` (+1/-1 por etiqueta) dice si la etiqueta va después o antes
+    del ancla sobre el eje de la barra. Con ``thin`` se descartan las que no
+    caben o se salen de los ejes, en orden de ``priority`` (mayor primero; por defecto, de izquierda
+    a derecha, lo que deja un paso regular). ``obstacles`` son cajas ``(n,
+    4)`` en datos que las etiquetas tampoco pueden tapar.
+    """
+
+    def __init__(self, ax, anchors, texts, direction=None, orientation="vertical", gap=VALUE_GAP,
+                 fontsize=10, color="black", thin=True, priority=None, obstacles=None, **kwargs):
+        self.anchors = np.asarray(anchors, dtype=float).reshape(-1, 2)
+        self.texts = list(texts)
+        if len(self.texts) != len(self.anchors):
+            raise ValueError(f"{len(self.anchors)} anclas y {len(self.texts)} textos")
+        self.direction = np.ones(len(self.texts)) if direction is None else np.sign(np.asarray(direction, dtype=float))
+        self.direction[self.direction == 0] = 1
+        self.orientation, self.gap, self.thin = orientation, gap, thin
+        self.prop = FontProperties(size=fontsize)
+        order = np.arange(len(self.texts)) if priority is None else np.argsort(-np.asarray(priority), kind="stable")
+        self.order = order
+        self.obstacles = None if obstacles is None else np.asarray(obstacles, dtype=float).reshape(-1, 4)
+        self.widths = np.array([_text_width(self.prop, text) for text in self.texts])
+        self.visible_index = np.arange(0)
+        self._text_paths = {}
+        self._layout_key = None
+        super().__init__([], offsets=np.empty((0, 2)), offset_transform=IdentityTransform(),
+                         facecolors=color, edgecolors="none", **kwargs)
+        self.set_in_layout(False)
+        self.axes = ax
+
+    def _path(self, text):
+        if text not in self._text_paths:
+            self._text_paths[text] = _text_path(self.prop, text)
+        return self._text_paths[text]
+
+    def _boxes(self, scale):
+        """
+        Origen del trazo (línea base, izquierda) y caja de cada etiqueta, en píxeles.
+        """
+        anchor = self.axes.transData.transform(self.anchors)
+        height, descent = _line_metrics(self.prop)
+        w, h, d = self.widths * scale, height * scale, descent * scale
+        gap = self.gap * scale * self.direction
+        if self.orientation == "horizontal":
+            x0 = np.where(self.direction > 0, anchor[:, 0] + gap, anchor[:, 0] + gap - w)
+            y0 = anchor[:, 1] - h / 2
+        else:
+            x0 = anchor[:, 0] - w / 2
+            y0 = np.where(self.direction > 0, anchor[:, 1] + gap, anchor[:, 1] + gap - h)
+        boxes = np.column_stack([x0, y0, x0 + w, y0 + h])
+        return np.column_stack([x0, y0 + d]), boxes
+
+    def _keep(self, boxes, bounds):
+        if not self.thin:
+            return np.arange(len(boxes))
+        inside = ((boxes[:, 0] >= bounds[0] - 0.5) & (boxes[:, 2] <= bounds[2] + 0.5)
+                  & (boxes[:, 1] >= bounds[1] - 0.5) & (boxes[:, 3] <= bounds[3] + 0.5))
+        height = boxes[0, 3] - boxes[0, 1] if len(boxes) else 1.0
+        index = _GridIndex(max(height * 2, 8.0))
+        if self.obstacles is not None and len(self.obstacles):
+            corners = self.axes.transData.transform(np.concatenate([self.obstacles[:, :2], self.obstacles[:, 2:]]))
+            low, high = corners[:len(self.obstacles)], corners[len(self.obstacles):]
+            for rect in np.column_stack([np.minimum(low, high), np.maximum(low, high)]):
+                # Las barras se encogen medio píxel: la etiqueta de una barra toca su extremo.
+                index.insert((rect[0] + 0.5, rect[1] + 0.5, rect[2] - 0.5, rect[3] - 0.5))
+        kept = []
+        for i in self.order:
+            if not inside[i] or not self.texts[i]:
+                continue
+            rect = tuple(boxes[i])
+            if index.overlap(rect) == 0:
+                index.insert(rect)
+                kept.append(i)
+        return np.sort(np.array(kept, dtype=np.intp))
+
+    @traced("bars.value_labels")
+    def _update(self, renderer):
+        ax = self.axes
+        bounds = ax.bbox.extents
+        key = (ax.transData.get_matrix().tobytes(), tuple(bounds), self.figure.dpi)
+        if key == self._layout_key:
+            return
+        self._layout_key = key
+        scale = renderer.points_to_pixels(1.0)
+        origins, boxes = self._boxes(scale)
+        self.visible_index = self._keep(boxes, bounds)
+        self.set_paths([self._path(self.texts[i]) for i in self.visible_index])
+        self.set_offsets(origins[self.visible_index] if len(self.visible_index) else np.empty((0, 2)))
+        self.set_transform(Affine2D().scale(scale))
+
+    @allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        self._update(renderer)
+        super().draw(renderer)
+
+
+def _bar_geometry(bars):
+    # (anclas, dirección, cajas, orientación) de un BarSeries o de un BarContainer de ax.bar/ax.barh.
+    if isinstance(bars, BarSeries):
+        boxes, ends, signs = bars.boxes(), bars.bottom + bars.values, np.sign(bars.values)
+        if bars.orientation == "horizontal":
+            anchors = np.column_stack([ends, bars.positions])
+        else:
+            anchors = np.column_stack([bars.positions, ends])
+        return anchors, signs, boxes, bars.orientation
+    orientation = getattr(bars, "orientation", None) or "vertical"
+    geometry = np.array([(r.get_x(), r.get_y(), r.get_width(), r.get_height()) for r in bars], dtype=float)
+    x, y, w, h = geometry.T if len(geometry) else np.empty((4, 0))
+    boxes = np.column_stack([np.minimum(x, x + w), np.minimum(y, y + h), np.maximum(x, x + w), np.maximum(y, y + h)])
+    if orientation == "horizontal":
+        return np.column_stack([x + w, y + h / 2]), np.sign(w), boxes, orientation
+    return np.column_stack([x + w / 2, y + h]), np.sign(h), boxes, orientation
+
+
+def value_labels(ax, bars, texts, fontsize=10, color="black", gap=VALUE_GAP, thin=True, avoid_bars=False,
+                 priority=None, **kwargs):
+    """
+    Una etiqueta por barra de ``bars`` (``BarSeries`` o ``BarContainer``), en lote.
+    """
+    anchors, signs, boxes, orientation = _bar_geometry(bars)
+    labels = ValueLabels(ax, anchors, texts, direction=signs, orientation=orientation, gap=gap, fontsize=fontsize,
+                         color=color, thin=thin, priority=priority, obstacles=boxes if avoid_bars else None, **kwargs)
+    ax.add_artist(labels)
+    return labels
+
+
+def bar_chart(ax, positions, values, fmt="{:g}", width=0.8, orientation="vertical", fontsize=9,
+              label_color="black", priority=None, **kwargs):
+    """
+    Serie de barras con sus etiquetas de valor, pensada para cientos o miles de barras.
+
+    Las etiquetas se ralean solas: no se traslapan entre sí ni con las barras.
+    ``kwargs`` van a ``bar_series``. Devuelve ``(BarSeries, ValueLabels)``.
+    """
+    series = bar_series(ax, positions, values, width=width, orientation=orientation, **kwargs)
+    texts = [fmt.format(value) for value in series.values]
+    labels = value_labels(ax, series, texts, fontsize=fontsize, color=label_color, avoid_bars=True, priority=priority)
+    return series, labels
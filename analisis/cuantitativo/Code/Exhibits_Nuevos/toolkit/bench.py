@@ -0,0 +1,346 @@
+"""
+Benchmarks de render por exhibit, con línea base y detección de regresiones.
+
+Cada exhibit corre en un proceso nuevo (``spawn``, una tarea por proceso), de
+modo que el pico de RSS es sólo suyo. Primero corre ``--warmup`` veces sin
+medir (cachés de texto y fuentes, importaciones diferidas). Luego el builder
+se ejecuta ``--repeat`` veces y se reporta la mediana de cada métrica. El
+tiempo de pared se reparte en fases exclusivas (una fase anidada no cuenta en
+la que la contiene):
+
+- ``construction``: datos y artistas, es decir, todo lo que no entra en otra fase;
+- ``tight_layout``: ``Figure.tight_layout`` (incluye ``apply_board_style``/``export_fig``
+  de Exhibit_10, que lo llaman);
+- ``draw``: rasterizado Agg (``FigureCanvasAgg.draw``) y caja ajustada de ``export_figure``;
+- ``png``/``svg``: codificación de cada formato en ``savefig``, sin el rasterizado.
+
+También se registran el pico de RSS (sobre el RSS al empezar cada repetición)
+y los bytes de salida por formato. Las salidas se capturan en memoria
+(``export.capture()``), así que un benchmark no reescribe ``Results`` ni sus
+copias. Los resultados se guardan como línea base JSON (``--save``). Sin
+``--save``, se comparan contra ella y el proceso termina con 1 si alguna
+métrica empeora más que su umbral. Los tiempos por debajo de ``--min-seconds``
+de diferencia se consideran ruido.
+
+Uso:  python -m toolkit.bench [ids...] [--repeat N] [--warmup N] [--save] [--baseline RUTA]
+                              [--time-threshold 0.30] [--memory-threshold 0.15] [--size-threshold 0.10]
+"""
+import argparse
+import functools
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+from toolkit.index import load_index
+from toolkit.paths import BENCH_BASELINE_PATH
+from toolkit.trace import patched, savefig_format
+
+BASELINE_VERSION = 1
+PHASES = ("construction", "tight_layout", "draw", "png", "svg")
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    time: float = 0.30          # aumento relativo tolerado en tiempos
+    memory: float = 0.15        # en pico de RSS
+    size: float = 0.10          # en bytes de salida
+    min_seconds: float = 0.05   # diferencias de tiempo menores se ignoran (ruido)
+
+
+@dataclass
+class BenchResult:
+    exhibit_id: str
+    ok: bool
+    total: float = 0.0                                      # s (mediana)
+    phases: Dict[str, float] = field(default_factory=dict)  # s (mediana por fase)
+    peak_rss_mb: Optional[float] = None                     # máximo entre repeticiones
+    bytes: Dict[str, int] = field(default_factory=dict)     # por formato
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Regression:
+    exhibit_id: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self):
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+
+# ---------------------------
+# Medición por fases
+# ---------------------------
+class PhaseTimer:
+    """
+    Acumula tiempo exclusivo por fase; las fases pueden anidarse.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self._children = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = self._children.pop()
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed - inner
+            if self._children:
+                self._children[-1] += elapsed
+
+
+def _savefig_phase(args, kwargs):
+    fmt = savefig_format(args, kwargs)
+    return "png" if fmt == "rgba" else fmt
+
+
+@contextmanager
+def instrument(timer):
+    """
+    Envuelve, mientras dura el bloque, los puntos de medición de matplotlib y ``toolkit.export``.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from toolkit import export
+
+    def timed(func, phase):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer.phase(phase(args, kwargs) if callable(phase) else phase):
+                return func(*args, **kwargs)
+        return wrapper
+
+    # El PNG es el rasterizado a RGBA más la espera por la codificación en segundo plano.
+    hooks = [(Figure, "tight_layout", "tight_layout"), (Figure, "savefig", _savefig_phase),
+             (FigureCanvasAgg, "draw", "draw"), (export, "tight_bbox", "draw"), (export, "flush", "png")]
+    with patched(hooks, timed):
+        yield timer
+
+
+def _output_bytes(captured):
+    # {ruta: bytes} de export.capture(); un archivo por nombre (las copias son el mismo contenido).
+    sizes, seen = {}, set()
+    for path, data in captured.items():
+        name = os.path.basename(path)
+        if name in seen:
+            continue
+        seen.add(name)
+        fmt = os.path.splitext(name)[1].lstrip(".").lower()
+        sizes[fmt] = sizes.get(fmt, 0) + len(data)
+    return sizes
+
+
+def bench_one(exhibit_id, repeat=3, warmup=1):
+    """
+    Ejecuta el builder de ``exhibit_id`` ``warmup`` veces sin medir y ``repeat``
+    veces instrumentado (en este proceso), dentro de ``export.capture()``: las
+    salidas se codifican pero no se escriben, así que no pisan ``Results``.
+    """
+    from toolkit import export
+    from toolkit.figures import figure_scope
+    from toolkit.registry import get_exhibit
+
+    spec = get_exhibit(exhibit_id)
+    runs, peaks, outputs = [], [], {}
+    try:
+        for _ in range(warmup):
+            with figure_scope(), export.capture(), redirect_stdout(io.StringIO()):
+                spec.builder()
+                export.flush()
+        for _ in range(repeat):
+            timer = PhaseTimer()
+            with figure_scope() as memory, export.capture() as outputs, redirect_stdout(io.StringIO()), \
+                    instrument(timer):
+                start = time.perf_counter()
+                spec.builder()
+                export.flush()
+                total = time.perf_counter() - start
+            phases = dict(timer.totals)
+            phases["construction"] = total - sum(phases.values())
+            runs.append((total, phases))
+            peaks.append(memory.peak_mb)
+    except Exception:
+        return BenchResult(exhibit_id, False, error=traceback.format_exc())
+
+    names = list(PHASES) + sorted({name for _, phases in runs for name in phases} - set(PHASES))
+    phases = {name: statistics.median(p.get(name, 0.0) for _, p in runs) for name in names}
+    peak = max((mb for mb in peaks if mb is not None), default=None)
+    return BenchResult(exhibit_id, True, statistics.median(total for total, _ in runs), phases, peak,
+                       _output_bytes(outputs))
+
+
+def run_benchmarks(exhibit_ids, repeat=3, warmup=1):
+    """
+    ``BenchResult`` por exhibit, cada uno medido en un proceso nuevo, uno a la vez.
+    """
+    from toolkit import datasets
+    from toolkit.runner import _init_worker
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx, initializer=_init_worker,
+                             initargs=(datasets.load_all(),), max_tasks_per_child=1) as pool:
+        for exhibit_id in exhibit_ids:
+            try:
+                results.append(pool.submit(bench_one, exhibit_id, repeat, warmup).result())
+            except Exception:
+                results.append(BenchResult(exhibit_id, False, error=traceback.format_exc()))
+    return results
+
+
+# ---------------------------
+# Línea base
+# ---------------------------
+def environment():
+    import matplotlib
+    import numpy as np
+
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "cpus": os.cpu_count(), "matplotlib": matplotlib.__version__, "numpy": np.__version__}
+
+
+def load_baseline(path=BENCH_BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return data if data.get("version") == BASELINE_VERSION else None
+
+
+def save_baseline(results, repeat, path=BENCH_BASELINE_PATH):
+    """
+    Escribe los exhibits medidos con éxito; los demás de la línea base anterior se conservan.
+    """
+    previous = load_baseline(path) or {}
+    exhibits = dict(previous.get("exhibits", {}))
+    for result in results:
+        if result.ok:
+            exhibits[result.exhibit_id] = {key: value for key, value in asdict(result).items()
+                                           if key not in ("exhibit_id", "ok", "error")}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump({"version": BASELINE_VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "repeat": repeat, "environment": environment(), "exhibits": exhibits},
+                  fh, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _metrics(entry):
+    # (métrica, valor, tipo) de un resultado o de una entrada de la línea base.
+    yield "total", entry.get("total"), "time"
+    for name, value in entry.get("phases", {}).items():
+        yield f"{name}", value, "time"
+    yield "peak_rss_mb", entry.get("peak_rss_mb"), "memory"
+    for fmt, value in entry.get("bytes", {}).items():
+        yield f"bytes.{fmt}", value, "size"
+
+
+def compare(results, baseline, thresholds=Thresholds()):
+    """
+    Regresiones de ``results`` frente a ``baseline`` (métricas que superan su umbral).
+    """
+    limits = {"time": thresholds.time, "memory": thresholds.memory, "size": thresholds.size}
+    regressions = []
+    for result in results:
+        before = baseline.get("exhibits", {}).get(result.exhibit_id)
+        if not result.ok or before is None:
+            continue
+        current = dict((metric, value) for metric, value, _ in _metrics(asdict(result)))
+        for metric, old, kind in _metrics(before):
+            new = current.get(metric)
+            if old is None or new is None or new <= old * (1 + limits[kind]):
+                continue
+            if kind == "time" and new - old < thresholds.min_seconds:
+                continue
+            regressions.append(Regression(result.exhibit_id, metric, old, new))
+    return regressions
+
+
+# ---------------------------
+# Reporte
+# ---------------------------
+def print_report(results, stream=sys.stdout):
+    header = f"{'exhibit':<10} {'total':>7} " + " ".join(f"{phase:>12}" for phase in PHASES)
+    stream.write(header + f" {'+RSS MB':>8} {'PNG KB':>8} {'SVG KB':>8}\n")
+    for result in results:
+        if not result.ok:
+            stream.write(f"{result.exhibit_id:<10} ERROR\n{result.error}\n")
+            continue
+        phases = " ".join(f"{result.phases.get(phase, 0.0):12.3f}" for phase in PHASES)
+        rss = f"{result.peak_rss_mb:8.1f}" if result.peak_rss_mb is not None else f"{'':>8}"
+        sizes = " ".join(f"{result.bytes[fmt] / 1024:8.1f}" if fmt in result.bytes else f"{'-':>8}"
+                         for fmt in ("png", "svg"))
+        stream.write(f"{result.exhibit_id:<10} {result.total:7.3f} {phases} {rss} {sizes}\n")
+
+
+def print_regressions(regressions, stream=sys.stdout):
+    for reg in regressions:
+        stream.write(f"REGRESIÓN {reg.exhibit_id:<10} {reg.metric:<14} {reg.baseline:12.3f} → "
+                     f"{reg.current:12.3f} ({reg.change:+.0%})\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m toolkit.bench",
+                                     description="Mide el render de cada exhibit y lo compara con la línea base.")
+    parser.add_argument("ids", nargs="*", help="ids de exhibit (todos por defecto)")
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por exhibit (se usa la mediana)")
+    parser.add_argument("--warmup", type=int, default=1, help="corridas previas sin medir")
+    parser.add_argument("--baseline", default=BENCH_BASELINE_PATH, help="archivo JSON de la línea base")
+    parser.add_argument("--save", action="store_true", help="guarda los resultados como línea base")
+    parser.add_argument("--time-threshold", type=float, default=Thresholds.time)
+    parser.add_argument("--memory-threshold", type=float, default=Thresholds.memory)
+    parser.add_argument("--size-threshold", type=float, default=Thresholds.size)
+    parser.add_argument("--min-seconds", type=float, default=Thresholds.min_seconds)
+    args = parser.parse_args(argv)
+
+    index = load_index()
+    try:
+        ids = [index.get(exhibit_id).exhibit_id for exhibit_id in args.ids] or [e.exhibit_id for e in index.entries]
+    except KeyError as exc:
+        parser.error(exc.args[0])
+
+    from toolkit.cli import prepare_rendering
+    prepare_rendering()
+    results = run_benchmarks(ids, repeat=max(1, args.repeat), warmup=max(0, args.warmup))
+    print_report(results)
+    failed = [result.exhibit_id for result in results if not result.ok]
+
+    if args.save:
+        save_baseline(results, args.repeat, args.baseline)
+        sys.stdout.write(f"Línea base guardada en {args.baseline}\n")
+        return 1 if failed else 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        sys.stdout.write(f"Sin línea base en {args.baseline}; usa --save para crearla.\n")
+        return 1 if failed else 0
+    if baseline.get("environment", {}) != environment():
+        sys.stdout.write("Aviso: la línea base se midió en otro entorno (versiones o máquina).\n")
+    thresholds = Thresholds(args.time_threshold, args.memory_threshold, args.size_threshold, args.min_seconds)
+    regressions = compare(results, baseline, thresholds)
+    print_regressions(regressions)
+    sys.stdout.write(f"{len(results)} exhibits, {len(regressions)} regresión(es), {len(failed)} con error\n")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Intervalos de confianza bootstrap, ponderados por el factor de expansión, para el embudo de adopción.
+
+    ic = funnel_bootstrap(get_survey("enif_2024"), ENIF_FUNNEL, replicates=5000)
+    ic.interval("CoDi", "conversion")        # (estimación, inferior, superior)
+    ax.bar(x, ic.estimate("conocimiento"), yerr=ic.yerr("conocimiento"))
+
+Cada réplica remuestrea con reemplazo los ``n`` entrevistados de la encuesta,
+cada uno con su factor, y recalcula por sistema:
+
+- ``conocimiento``: % ponderado de adultos que conocen el sistema;
+- ``conversion``: % ponderado de uso entre quienes lo conocen;
+- ``uso``: % de adultos que lo usan (``conocimiento × conversion / 100``, la
+  definición del Exhibit 1);
+- ``usuarios_m``: usuarios expandidos (millones), la contraparte en la
+  encuesta de la activación administrativa, que no sale de una muestra.
+
+Todas son cocientes de sumas de factores, y esas sumas sólo dependen del
+perfil de cada entrevistado (conoce/usa/faltante en cada sistema: a lo más
+9 por sistema). Por eso los entrevistados se ordenan por perfil y una réplica
+es:
+
+1. cuántos de los ``n`` sorteos caen en cada perfil (una multinomial sobre
+   los perfiles, no sobre los ``n`` entrevistados);
+2. para cada perfil, los sorteos de todas las réplicas del lote en un solo
+   ``integers`` dentro de su tramo, los factores con un ``take`` y la suma
+   por réplica como diferencia de su suma acumulada.
+
+Equivale a remuestrear índices de 0 a ``n``, sin la matriz réplicas × ``n``
+de conteos ni un ``bincount`` bidimensional. Los lotes tienen
+``BATCH_DRAWS`` sorteos como máximo (memoria acotada) y cada uno usa su
+propia semilla (``SeedSequence.spawn``), así que el resultado es el mismo
+en serie o repartido en ``workers`` procesos. Los intervalos son percentiles
+de las réplicas.
+
+    python -m toolkit.bootstrap [encuesta] [--replicates 5000] [--workers N] [--level 0.95]
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from toolkit.microdata import ENIF_FUNNEL, MISSING, MicrodataError, get_survey
+from toolkit.trace import traced
+
+STATISTICS = ("conocimiento", "uso", "conversion", "usuarios_m")
+DEFAULT_REPLICATES = 5000
+DEFAULT_LEVEL = 0.95
+DEFAULT_SEED = 2024
+BATCH_DRAWS = 1 << 23
+# Sumas de factores por sistema de las que salen las estadísticas
+_SUMS = ("conoce_valido", "conoce", "usa_valido", "usa")
+
+
+@dataclass(frozen=True)
+class FunnelIntervals:
+    systems: Tuple[str, ...]
+    point: np.ndarray        # (sistemas, estadísticas) con la muestra completa
+    low: np.ndarray          # (sistemas, estadísticas)
+    high: np.ndarray
+    replicates: int
+    level: float
+    respondents: int
+
+    def _column(self, statistic):
+        try:
+            return STATISTICS.index(statistic)
+        except ValueError:
+            raise KeyError(f"Estadística desconocida: {statistic!r}. Disponibles: {', '.join(STATISTICS)}") from None
+
+    def estimate(self, statistic):
+        return self.point[:, self._column(statistic)]
+
+    def interval(self, system, statistic):
+        """
+        ``(estimación, inferior, superior)`` de ``statistic`` para ``system``.
+        """
+        i, j = self.systems.index(system), self._column(statistic)
+        return float(self.point[i, j]), float(self.low[i, j]), float(self.high[i, j])
+
+    def yerr(self, statistic):
+        """
+        Distancias ``(2, sistemas)`` de la estimación a cada extremo, como las pide ``yerr``.
+        """
+        j = self._column(statistic)
+        return np.vstack([self.point[:, j] - self.low[:, j], self.high[:, j] - self.point[:, j]])
+
+
+@dataclass(frozen=True)
+class _Profiles:
+    weights: np.ndarray      # factores ordenados por perfil
+    starts: np.ndarray       # inicio del tramo de cada perfil en ``weights``
+    sizes: np.ndarray        # entrevistados por perfil
+    active: np.ndarray       # perfiles que entran en alguna suma
+    design: np.ndarray       # (perfiles, sistemas × _SUMS) de 0/1
+
+
+def _profiles(table, systems):
+    # Código por sistema: (conoce + 1) * 3 + (usa + 1), con -1 faltante; perfil = dígitos en base 9.
+    weights = np.asarray(table.column(table.weight), dtype=np.float64)
+    valid = np.isfinite(weights)
+    code = np.zeros(len(weights), dtype=np.int64)
+    for aware, used in systems.values():
+        digit = (np.asarray(table.column(aware), dtype=np.int64) + 1) * 3 + np.asarray(table.column(used)) + 1
+        code = code * 9 + digit
+    uniques, inverse, sizes = np.unique(code[valid], return_inverse=True, return_counts=True)
+    order = np.argsort(inverse, kind="stable")
+
+    design = np.zeros((len(uniques), len(systems) * len(_SUMS)))
+    rest = uniques.copy()
+    for s in reversed(range(len(systems))):
+        rest, digit = np.divmod(rest, 9)
+        aware, used = digit // 3 - 1, digit % 3 - 1
+        known = aware != MISSING
+        columns = (known, aware == 1, (aware == 1) & (used != MISSING), (aware == 1) & (used == 1))
+        for k, column in enumerate(columns):
+            design[:, s * len(_SUMS) + k] = column
+    return _Profiles(weights[valid][order], np.concatenate(([0], np.cumsum(sizes)[:-1])), sizes,
+                     np.flatnonzero(design.any(axis=1)), design)
+
+
+def _statistics(sums, n_systems):
+    # sums: (..., sistemas × _SUMS) -> (..., sistemas, STATISTICS)
+    sums = sums.reshape(sums.shape[:-1] + (n_systems, len(_SUMS)))
+    known, aware, use_known, use = np.moveaxis(sums, -1, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        awareness = 100 * aware / known
+        conversion = 100 * use / use_known
+    return np.stack([awareness, awareness * conversion / 100, conversion, use / 1e6], axis=-1)
+
+
+def _batch_sums(profiles, size, seed):
+    # Sumas de factores por perfil de ``size`` réplicas: (size, perfiles).
+    rng = np.random.default_rng(seed)
+    n = len(profiles.weights)
+    counts = rng.multinomial(n, profiles.sizes / n, size=size)
+    sums = np.zeros((size, len(profiles.sizes)))
+    for k in profiles.active:
+        drawn = counts[:, k]
+        total = int(drawn.sum())
+        if not total:
+            continue
+        start = profiles.starts[k]
+        # Índices intp: con int32, ``take`` haría antes una copia convertida.
+        idx = rng.integers(start, start + profiles.sizes[k], size=total, dtype=np.intp)
+        # Suma por réplica como diferencia de la suma acumulada: las réplicas sin sorteos dan 0
+        # (``reduceat`` con tramos vacíos devolvería el valor del índice siguiente).
+        cumulative = np.concatenate(([0.0], np.cumsum(profiles.weights.take(idx))))
+        ends = np.cumsum(drawn)
+        sums[:, k] = cumulative[ends] - cumulative[ends - drawn]
+    return sums
+
+
+_WORKER_PROFILES = None
+
+
+def _init_worker(profiles):
+    global _WORKER_PROFILES
+    _WORKER_PROFILES = profiles
+
+
+def _worker_batch(size, seed):
+    return _batch_sums(_WORKER_PROFILES, size, seed)
+
+
+@traced("bootstrap.funnel")
+def funnel_bootstrap(table, systems: Dict[str, Tuple[str, str]] = ENIF_FUNNEL, replicates=DEFAULT_REPLICATES,
+                     level=DEFAULT_LEVEL, seed=DEFAULT_SEED, workers=None):
+    """
+    Intervalos de percentiles de las estadísticas del embudo (``STATISTICS``) por sistema.
+
+    ``systems`` da, por sistema, las columnas ``bool`` de conocimiento y de
+    uso, como en ``toolkit.microdata.funnel``. Con ``workers`` > 1 los lotes
+    se reparten en un pool de procesos; el resultado no cambia.
+    """
+    if not 0 < level < 1:
+        raise ValueError(f"level debe estar entre 0 y 1; es {level}")
+    profiles = _profiles(table, systems)
+    n = len(profiles.weights)
+    if not n:
+        raise MicrodataError(f"La encuesta '{table.name}' no tiene filas con factor de expansión")
+    batch = max(1, min(replicates, BATCH_DRAWS // n))
+    sizes = [min(batch, replicates - start) for start in range(0, replicates, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers and workers > 1 and len(sizes) > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes)), mp_context=ctx, initializer=_init_worker,
+                                 initargs=(profiles,)) as pool:
+            parts = list(pool.map(_worker_batch, sizes, seeds))
+    else:
+        parts = [_batch_sums(profiles, size, child) for size, child in zip(sizes, seeds)]
+
+    full = np.bincount(np.repeat(np.arange(len(profiles.sizes)), profiles.sizes), weights=profiles.weights,
+                       minlength=len(profiles.sizes))
+    point = _statistics(full @ profiles.design, len(systems))
+    stats = _statistics(np.concatenate(parts) @ profiles.design, len(systems))
+    alpha = (1 - level) / 2
+    low, high = np.nanquantile(stats, [alpha, 1 - alpha], axis=0)
+    return FunnelIntervals(tuple(systems), point, low, high, replicates, level, n)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m toolkit.bootstrap",
+                                     description="Intervalos bootstrap ponderados del embudo de adopción.")
+    parser.add_argument("survey", nargs="?", default="enif_2024", help="encuesta registrada (enif_2024)")
+    parser.add_argument("--replicates", type=int, default=DEFAULT_REPLICATES, help="réplicas bootstrap")
+    parser.add_argument("--workers", type=int, default=1, help="procesos para repartir los lotes")
+    parser.add_argument("--level", type=float, default=DEFAULT_LEVEL, help="nivel de confianza")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        table = get_survey(args.survey)
+    except KeyError as exc:
+        parser.error(exc.args[0])
+    except (MicrodataError, OSError) as exc:
+        parser.error(str(exc))
+    start = time.perf_counter()
+    ic = funnel_bootstrap(table, replicates=args.replicates, level=args.level, seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    sys.stdout.write(f"{args.survey}: {ic.respondents:,} entrevistados, {ic.replicates:,} réplicas, "
+                     f"{args.workers} proceso(s) — {elapsed:.2f} s\n")
+    for system in ic.systems:
+        for statistic in STATISTICS:
+            point, low, high = ic.interval(system, statistic)
+            sys.stdout.write(f"  {system:<6} {statistic:<13} {point:9.2f}  "
+                             f"[{low:9.2f}, {high:9.2f}] (IC {ic.level:.0%})\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
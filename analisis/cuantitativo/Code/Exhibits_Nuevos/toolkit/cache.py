@@ -0,0 +1,128 @@
+"""
+Caché incremental del deck.
+
+La llave de cada exhibit es un hash de su código (el script y los módulos
+locales que usa, p. ej. ``toolkit.*``), de sus archivos de datos declarados en
+``@exhibit(..., inputs=...)`` y de la versión de matplotlib/NumPy junto con el
+estilo activo (``rcParams``). Un manifiesto JSON registra, por exhibit, la llave
+y los archivos que produjo; si la llave no cambió y los archivos siguen ahí, el
+exhibit se omite. Cada perfil de render (``toolkit.profiles``) tiene su propia
+entrada (``"<id>@draft"``), de modo que alternar perfiles no invalida el otro.
+"""
+import hashlib
+import inspect
+import json
+import os
+import sys
+
+from toolkit.paths import CODE_DIR, MANIFEST_PATH, REPO_ROOT
+from toolkit.profiles import DEFAULT_PROFILE, active_profile
+
+MANIFEST_VERSION = 1
+# Llaves de rcParams que dependen del entorno y no del aspecto del gráfico.
+_VOLATILE_RCPARAMS = ("backend", "backend_fallback", "interactive", "webagg.", "savefig.directory")
+
+
+def _is_local(path):
+    return os.path.abspath(path).startswith(CODE_DIR + os.sep)
+
+
+def local_sources(module):
+    """
+    Archivos fuente locales de los que depende ``module`` (incluido el suyo), transitivamente.
+    """
+    seen = set()
+    stack = [module]
+    while stack:
+        mod = stack.pop()
+        path = getattr(mod, "__file__", None)
+        if not path or not _is_local(path):
+            continue
+        path = os.path.abspath(path)
+        if path in seen:
+            continue
+        seen.add(path)
+        for value in vars(mod).values():
+            dep = value if inspect.ismodule(value) else inspect.getmodule(value)
+            if dep is not None and dep is not mod:
+                stack.append(dep)
+    return sorted(seen)
+
+
+def _style_fingerprint():
+    import matplotlib
+    import numpy as np
+
+    items = sorted((key, repr(value)) for key, value in matplotlib.rcParams.items()
+                   if not key.startswith(_VOLATILE_RCPARAMS))
+    return json.dumps([matplotlib.__version__, np.__version__, items], ensure_ascii=False)
+
+
+def _update_file(digest, path):
+    digest.update(os.path.relpath(path, REPO_ROOT).encode())
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+
+
+def exhibit_key(spec):
+    """
+    Hash (hex) de código + datos + versión/estilo de matplotlib del exhibit ``spec``.
+    """
+    digest = hashlib.sha256()
+    digest.update(spec.exhibit_id.encode())
+    module = sys.modules[spec.builder.__module__]
+    for path in local_sources(module):
+        _update_file(digest, path)
+    for path in spec.inputs:
+        _update_file(digest, path)
+    digest.update(_style_fingerprint().encode())
+    digest.update(active_profile().name.encode())
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """
+    Manifiesto ``{exhibit_id: {"key": ..., "outputs": [...]}}`` persistido en JSON,
+    visto desde el perfil ``profile`` (el activo por defecto).
+    """
+
+    def __init__(self, manifest_path=MANIFEST_PATH, profile=None):
+        self.manifest_path = manifest_path
+        self.profile = profile or active_profile().name
+        self.entries = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("exhibits", {})
+
+    def _entry_id(self, exhibit_id):
+        return exhibit_id if self.profile == DEFAULT_PROFILE else f"{exhibit_id}@{self.profile}"
+
+    def outputs(self, exhibit_id):
+        entry = self.entries.get(self._entry_id(exhibit_id), {})
+        return [os.path.join(REPO_ROOT, path) for path in entry.get("outputs", [])]
+
+    def is_fresh(self, exhibit_id, key):
+        entry = self.entries.get(self._entry_id(exhibit_id))
+        if entry is None or entry.get("key") != key:
+            return False
+        return all(os.path.exists(path) for path in self.outputs(exhibit_id))
+
+    def record(self, exhibit_id, key, outputs):
+        self.entries[self._entry_id(exhibit_id)] = {
+            "key": key,
+            "outputs": [os.path.relpath(os.path.abspath(path), REPO_ROOT) for path in outputs],
+        }
+
+    def forget(self, exhibit_id):
+        self.entries.pop(self._entry_id(exhibit_id), None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"version": MANIFEST_VERSION, "exhibits": self.entries}, fh,
+                      ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,168 @@
+"""
+Punto de entrada único de los exhibits.
+
+    python -m toolkit.cli list [--json]
+    python -m toolkit.cli describe [ids...]
+    python -m toolkit.cli validate
+    python -m toolkit.cli build [ids...] [--force] [--jobs N] [--profile draft|web|thumb|print] [--trace traza.json]
+    python -m toolkit.cli bench [ids...] [--save] ...   (ver toolkit.bench)
+    python -m toolkit.cli watch [ids...] [--profile draft]   (ver toolkit.watch)
+    python -m toolkit.cli verify [ids...] [--update] ...   (ver toolkit.visual)
+    python -m toolkit.cli serve [--port 8765] ...   (ver toolkit.serve)
+    python -m toolkit.cli png [ids...]   (ahorro de la codificación PNG, ver toolkit.pngopt)
+    python -m toolkit.cli microdata [encuestas...] [--force]   (caché de microdatos, ver toolkit.microdata)
+    python -m toolkit.cli bootstrap [encuesta] [--replicates 5000] [--workers N]   (IC del embudo, ver toolkit.bootstrap)
+
+``list``, ``describe`` y ``validate`` trabajan sobre el índice estático
+(``toolkit.index``), sin importar matplotlib ni NumPy, así que responden en
+decenas de milisegundos. Sólo ``build`` (y ``bench``/``verify``/``serve``) prepara el render, una vez por
+invocación y antes de arrancar el pool:
+
+- fija el backend Agg (también en ``MPLBACKEND``, que heredan los workers
+  ``spawn``), así pyplot no busca un backend gráfico;
+- precalienta la caché de fuentes de matplotlib, para que los workers la
+  lean del disco en lugar de reconstruirla cada uno.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+
+from toolkit.index import load_index
+from toolkit.paths import REPO_ROOT
+from toolkit.profiles import PROFILES, set_profile
+
+HEADLESS_BACKEND = "Agg"
+FORWARDED = {"bench": "toolkit.bench", "watch": "toolkit.watch", "verify": "toolkit.visual",
+             "serve": "toolkit.serve", "png": "toolkit.pngopt", "microdata": "toolkit.microdata",
+             "bootstrap": "toolkit.bootstrap"}
+
+
+def prepare_rendering():
+    """
+    Importa matplotlib con backend Agg y carga la caché de fuentes (la crea si falta).
+    """
+    os.environ["MPLBACKEND"] = HEADLESS_BACKEND
+    import matplotlib
+    matplotlib.use(HEADLESS_BACKEND)
+    from matplotlib import font_manager
+    # findfont instancia fontManager (lee o escribe fontlist-*.json) y resuelve la fuente por defecto.
+    font_manager.findfont(font_manager.FontProperties())
+
+
+def _relpath(path):
+    return os.path.relpath(path, REPO_ROOT)
+
+
+def cmd_list(args, index):
+    if args.json:
+        json.dump([{"id": entry.exhibit_id, "title": entry.title, "script": _relpath(entry.script)}
+                   for entry in index.entries], sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    width = max((len(entry.exhibit_id) for entry in index.entries), default=0)
+    for entry in index.entries:
+        sys.stdout.write(f"{entry.exhibit_id:<{width}}  {entry.title}  [{os.path.basename(entry.script)}]\n")
+    return 0
+
+
+def cmd_describe(args, index):
+    from toolkit.cache import BuildCache
+
+    cache = BuildCache()
+    for entry in args.entries:
+        sys.stdout.write(f"{entry.exhibit_id} — {entry.title}\n")
+        sys.stdout.write(f"  builder:  {entry.builder} ({_relpath(entry.script)}:{entry.line})\n")
+        if entry.notes:
+            sys.stdout.write(f"  nota:     {entry.notes}\n")
+        for path in entry.inputs:
+            missing = "" if os.path.exists(path) else "  (no existe)"
+            sys.stdout.write(f"  entrada:  {_relpath(path)}{missing}\n")
+        for expr in entry.dynamic_inputs:
+            sys.stdout.write(f"  entrada:  {expr}  (dinámica)\n")
+        outputs = cache.outputs(entry.exhibit_id)
+        for path in outputs:
+            sys.stdout.write(f"  salida:   {_relpath(path)}\n")
+        if not outputs:
+            sys.stdout.write("  salida:   (sin construir)\n")
+        sys.stdout.write("\n")
+    return 0
+
+
+def cmd_validate(args, index):
+    problems = index.problems()
+    for where, message in problems:
+        sys.stdout.write(f"{where}: {message}\n")
+    sys.stdout.write(f"{len(index.entries)} exhibits, {len(problems)} problema(s)\n")
+    return 1 if problems else 0
+
+
+def cmd_build(args, index):
+    ids = [entry.exhibit_id for entry in args.entries]
+    start = time.perf_counter()
+    if args.profile:
+        set_profile(args.profile)
+    if args.trace:
+        from toolkit import trace
+        trace.enable(args.trace)
+    prepare_rendering()
+    from toolkit.runner import print_summary, run_exhibits
+
+    results = run_exhibits(ids, max_workers=args.jobs, force=args.force)
+    print_summary(results, time.perf_counter() - start)
+    if args.trace:
+        sys.stdout.write(f"Traza escrita en {trace.write_trace()} (ábrela en chrome://tracing o ui.perfetto.dev)\n")
+    return 0 if all(result.ok for result in results) else 1
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Tienen su propio parser: el resto de la línea pasa tal cual (``verify --update``, ``serve --port``).
+    if argv and argv[0] in FORWARDED:
+        return importlib.import_module(FORWARDED[argv[0]]).main(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="python -m toolkit.cli", description="Exhibits del análisis cuantitativo.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", help="lista los exhibits registrados")
+    listing.add_argument("--json", action="store_true", help="salida JSON (id, título, script)")
+    listing.set_defaults(func=cmd_list)
+
+    describe = commands.add_parser("describe", help="builder, entradas y salidas de cada exhibit")
+    describe.add_argument("ids", nargs="*", help="ids de exhibit (todos por defecto)")
+    describe.set_defaults(func=cmd_describe)
+
+    validate = commands.add_parser("validate", help="ids duplicados, entradas faltantes, errores de sintaxis")
+    validate.set_defaults(func=cmd_validate)
+
+    build = commands.add_parser("build", help="renderiza exhibits en paralelo (con caché incremental)")
+    build.add_argument("ids", nargs="*", help="ids de exhibit (todos por defecto)")
+    build.add_argument("--force", action="store_true", help="ignora la caché y re-renderiza todo")
+    build.add_argument("--jobs", type=int, default=None, help="procesos del pool (núcleos disponibles)")
+    build.add_argument("--profile", choices=PROFILES, help="perfil de render: draft, web, thumb o print (por defecto)")
+    build.add_argument("--trace", metavar="RUTA", help="escribe una traza Chrome trace-event del build")
+    build.set_defaults(func=cmd_build)
+
+    # Sólo para la ayuda: main() los despacha antes de llegar aquí (FORWARDED).
+    commands.add_parser("bench", add_help=False, help="benchmarks de render contra la línea base")
+    commands.add_parser("watch", add_help=False, help="re-renderiza los exhibits editados (proceso caliente)")
+    commands.add_parser("verify", add_help=False, help="regresión visual contra las salidas guardadas")
+    commands.add_parser("serve", add_help=False, help="servicio HTTP local que renderiza exhibits bajo pedido")
+    commands.add_parser("png", add_help=False, help="bytes y tiempo de la codificación PNG contra la de matplotlib")
+    commands.add_parser("microdata", add_help=False, help="ingesta los microdatos de encuestas a la caché columnar")
+    commands.add_parser("bootstrap", add_help=False, help="intervalos bootstrap ponderados del embudo de adopción")
+
+    args = parser.parse_args(argv)
+    index = load_index()
+    # Ids mal escritos fallan aquí, antes de pagar la importación de matplotlib.
+    try:
+        args.entries = [index.get(exhibit_id) for exhibit_id in getattr(args, "ids", None) or ()] or index.entries
+    except KeyError as exc:
+        parser.error(exc.args[0])
+    return args.func(args, index)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
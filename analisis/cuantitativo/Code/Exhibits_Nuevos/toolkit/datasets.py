@@ -0,0 +1,292 @@
+"""
+Registro central de datasets de entrada de los exhibits.
+
+Cada dataset es un CSV en ``DATA_DIR`` (``analisis/cuantitativo/Data``, o
+``EXHIBITS_DATA_DIR`` para probar cifras actualizadas de Banxico/ENIF sin
+tocar el código de las gráficas) y un tipo inmutable con sus métricas
+derivadas ya calculadas (p. ej. ``conv`` del embudo o ``ratio`` de la brecha).
+
+- ``get_dataset(nombre)`` lee y valida el archivo la primera vez y lo memoiza;
+  las llamadas siguientes devuelven el mismo objeto.
+- ``dataset_files(*nombres)`` da las rutas para declararlas como ``inputs`` en
+  ``@exhibit``, de modo que la caché incremental detecte cambios en los datos.
+- ``load_all``/``preload`` permiten que el runner lea cada fuente una sola vez
+  y la comparta con los workers.
+
+Formato CSV: líneas ``#`` de comentario (fuente, unidades), encabezado y filas.
+Los datasets clave/valor usan las columnas ``clave,valor,descripcion``.
+"""
+import csv
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from toolkit.paths import DATA_DIR
+from toolkit.trace import traced
+
+
+class DatasetError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    filename: str
+    columns: Dict[str, type]
+    builder: Callable
+    description: str = ""
+
+    @property
+    def path(self):
+        return os.path.join(DATA_DIR, self.filename)
+
+
+_REGISTRY: Dict[str, DatasetSpec] = {}
+_LOADED = {}
+_LOCK = threading.Lock()
+# Veces que se parseó cada fuente en este proceso (para verificar "una sola vez").
+PARSE_COUNTS = Counter()
+
+
+def dataset(name, filename, columns, description=""):
+    """
+    Registra ``builder(tabla) -> objeto`` como el dataset ``name``; ``tabla`` es
+    ``{columna: arreglo}`` con los tipos de ``columns`` (``str`` → tupla).
+    """
+    def decorator(builder):
+        _REGISTRY[name] = DatasetSpec(name, filename, dict(columns), builder, description)
+        return builder
+    return decorator
+
+
+@traced("datasets.read")
+def _read_table(spec):
+    path = spec.path
+    try:
+        with open(path, encoding="utf-8", newline="") as fh:
+            rows = list(csv.reader(line for line in fh if line.strip() and not line.startswith("#")))
+    except OSError as exc:
+        raise DatasetError(f"No se pudo leer el dataset '{spec.name}' ({path}): {exc}") from exc
+    PARSE_COUNTS[spec.name] += 1
+    if not rows:
+        raise DatasetError(f"Dataset '{spec.name}' vacío: {path}")
+    header = [name.strip() for name in rows[0]]
+    missing = [name for name in spec.columns if name not in header]
+    if missing:
+        raise DatasetError(f"Faltan columnas en '{spec.name}' ({path}): {', '.join(missing)}")
+
+    table = {}
+    for name, kind in spec.columns.items():
+        idx = header.index(name)
+        raw = [row[idx].strip() for row in rows[1:]]
+        if kind is str:
+            table[name] = tuple(raw)
+            continue
+        try:
+            table[name] = np.array([kind(value) for value in raw], dtype=np.float64 if kind is float else kind)
+        except ValueError as exc:
+            raise DatasetError(f"Valor inválido en '{spec.name}'.{name} ({path}): {exc}") from exc
+    return table
+
+
+def get_dataset(name):
+    """
+    Dataset ``name`` (leído y construido una sola vez por proceso).
+    """
+    try:
+        return _LOADED[name]
+    except KeyError:
+        pass
+    if name not in _REGISTRY:
+        known = ", ".join(sorted(_REGISTRY)) or "(ninguno)"
+        raise KeyError(f"Dataset desconocido: {name!r}. Disponibles: {known}")
+    with _LOCK:
+        if name not in _LOADED:
+            spec = _REGISTRY[name]
+            _LOADED[name] = spec.builder(_read_table(spec))
+        return _LOADED[name]
+
+
+def dataset_files(*names):
+    """
+    Rutas de los archivos de ``names`` (para ``@exhibit(..., inputs=...)``).
+    """
+    return tuple(_REGISTRY[name].path for name in names)
+
+
+def all_datasets():
+    return dict(_REGISTRY)
+
+
+def load_all():
+    """
+    Carga todos los datasets que se puedan leer y devuelve ``{nombre: objeto}``;
+    los que fallan se dejan para que el error aparezca en el exhibit que los usa.
+    """
+    loaded = {}
+    for name in _REGISTRY:
+        try:
+            loaded[name] = get_dataset(name)
+        except DatasetError:
+            continue
+    return loaded
+
+
+def preload(datasets):
+    """
+    Instala datasets ya construidos (p. ej. recibidos del proceso padre).
+    """
+    with _LOCK:
+        _LOADED.update(datasets)
+
+
+def clear():
+    with _LOCK:
+        _LOADED.clear()
+
+
+# ---------------------------
+# Tipos
+# ---------------------------
+def _key_values(table, dataset_name, keys):
+    values = dict(zip(table["clave"], table["valor"]))
+    missing = [key for key in keys if key not in values]
+    if missing:
+        raise DatasetError(f"Faltan claves en '{dataset_name}': {', '.join(missing)}")
+    return {key: float(values[key]) for key in keys}
+
+
+@dataclass(frozen=True)
+class EmbudoENIF:
+    sistemas: Tuple[str, ...]
+    conocimiento: np.ndarray          # % de adultos que conocen el sistema (ENIF)
+    uso: np.ndarray                   # % de adultos con uso activo (≥1 vez)
+    activacion_millones: np.ndarray   # proxy de activación (millones de usuarios/cuentas)
+    conv: np.ndarray = field(init=False)   # tasa de conversión uso/conocimiento (%)
+
+    def __post_init__(self):
+        object.__setattr__(self, "conv", np.round(self.uso / self.conocimiento * 100, 1))
+
+
+@dataset("embudo_enif", "embudo_enif.csv",
+         {"sistema": str, "conocimiento_pct": float, "uso_pct": float, "activacion_millones": float},
+         "Embudo conocimiento → activación → uso de CoDi/DiMo (ENIF 2024)")
+def _embudo_enif(table):
+    return EmbudoENIF(table["sistema"], table["conocimiento_pct"], table["uso_pct"], table["activacion_millones"])
+
+
+@dataclass(frozen=True)
+class BrechaTransacciones:
+    codi_total_m: float     # CoDi acumuladas (millones)
+    pix_day_m: float        # Pix en un día (millones)
+    ratio: float = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "ratio", self.pix_day_m / self.codi_total_m)
+
+
+@dataset("brecha_transacciones", "brecha_transacciones.csv", {"clave": str, "valor": float},
+         "Transacciones de Pix en un día vs CoDi acumuladas")
+def _brecha_transacciones(table):
+    return BrechaTransacciones(**_key_values(table, "brecha_transacciones", ("codi_total_m", "pix_day_m")))
+
+
+@dataclass(frozen=True)
+class EscenarioPYME:
+    ventas_mensuales: float
+    tasa_alta: float
+    tasa_baja: float
+    ahorro_mensual: float = field(init=False)
+    ahorro_anual: float = field(init=False)
+
+    def __post_init__(self):
+        mensual = self.ventas_mensuales * (self.tasa_alta - self.tasa_baja)
+        object.__setattr__(self, "ahorro_mensual", mensual)
+        object.__setattr__(self, "ahorro_anual", mensual * 12)
+
+    def as_params(self):
+        return {"ventas_mensuales": self.ventas_mensuales, "tasa_alta": self.tasa_alta, "tasa_baja": self.tasa_baja}
+
+
+@dataset("escenario_pyme", "escenario_pyme.csv", {"clave": str, "valor": float},
+         "Mini-escenario PYME de Exhibit 3")
+def _escenario_pyme(table):
+    return EscenarioPYME(**_key_values(table, "escenario_pyme", ("ventas_mensuales", "tasa_alta", "tasa_baja")))
+
+
+@dataclass(frozen=True)
+class CostosAceptacion:
+    metodos: Tuple[str, ...]
+    minimo: np.ndarray      # % por transacción
+    maximo: np.ndarray
+
+    @property
+    def ranges(self):
+        """
+        ``{método: (mínimo, máximo)}`` en %.
+        """
+        return {m: (float(lo), float(hi)) for m, lo, hi in zip(self.metodos, self.minimo, self.maximo)}
+
+
+@dataset("costos_aceptacion", "costos_aceptacion.csv",
+         {"metodo": str, "costo_min_pct": float, "costo_max_pct": float},
+         "Costo de aceptación por método de pago (rango %)")
+def _costos_aceptacion(table):
+    return CostosAceptacion(table["metodo"], table["costo_min_pct"], table["costo_max_pct"])
+
+
+@dataclass(frozen=True)
+class MDRComparado:
+    metodos: Tuple[str, ...]
+    mdr_pct: np.ndarray
+
+
+@dataset("mdr_comparado", "mdr_comparado.csv", {"metodo": str, "mdr_pct": float},
+         "MDR comparado por método (Exhibit 3)")
+def _mdr_comparado(table):
+    return MDRComparado(table["metodo"], table["mdr_pct"])
+
+
+@dataclass(frozen=True)
+class Tabla4:
+    years: np.ndarray
+    savings_usd_bn: np.ndarray              # ahorro anual (USD bn)
+    delta_gdp_pct: np.ndarray               # contribución al PIB (p.p.)
+    new_users_m: np.ndarray                 # nuevos individuos acumulados (M)
+    informality_reduction_pct: np.ndarray   # reducción de la economía informal (% del PIB)
+    cum_savings_usd_bn: float = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "cum_savings_usd_bn", float(self.savings_usd_bn.sum()))
+
+
+@dataset("tabla4", "tabla4.csv",
+         {"anio": int, "ahorro_usd_bn": float, "delta_pib_pct": float, "nuevos_usuarios_m": float,
+          "reduccion_informalidad_pct": float},
+         "Tabla 4 — caso de negocio México a 5 años")
+def _tabla4(table):
+    return Tabla4(table["anio"], table["ahorro_usd_bn"], table["delta_pib_pct"], table["nuevos_usuarios_m"],
+                  table["reduccion_informalidad_pct"])
+
+
+@dataclass(frozen=True)
+class SerieAdopcion:
+    months: np.ndarray
+    users_m: np.ndarray
+
+
+@dataset("adopcion", "adopcion.csv", {"serie": str, "mes": float, "usuarios_m": float},
+         "Usuarios activos por meses desde el lanzamiento (Pix, CoDi)")
+def _adopcion(table):
+    series = np.array(table["serie"])
+    out = {}
+    for name in dict.fromkeys(table["serie"]):
+        mask = series == name
+        order = np.argsort(table["mes"][mask], kind="stable")
+        out[name] = SerieAdopcion(table["mes"][mask][order], table["usuarios_m"][mask][order])
+    return out
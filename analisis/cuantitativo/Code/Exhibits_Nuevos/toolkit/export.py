@@ -0,0 +1,256 @@
+"""
+Etapa de exportación: "renderizar una vez, exportar muchas".
+
+``export_figure`` generaliza ``export_fig`` (Exhibit_10.py): calcula la caja
+``bbox_inches="tight"`` una sola vez, codifica cada formato una sola vez en
+memoria y escribe las copias adicionales (p. ej. ``/mnt/data``) enlazando o
+copiando esos bytes en vez de volver a llamar a ``savefig``.
+
+La resolución, los formatos, las copias y el subdirectorio de salida salen del
+perfil de render activo (``toolkit.profiles``). La caja se calcula siempre a
+``LAYOUT_DPI``, así que la geometría es la misma en draft, web y print.
+
+Las salidas son deterministas: el SVG se escribe sin fecha y con
+``svg.hashsalt`` fijo (ids estables), así que el mismo gráfico produce los
+mismos bytes y ``toolkit.visual`` puede compararlos sin decodificar. Dentro de
+``capture()`` los archivos no se escriben: sus bytes quedan en memoria.
+
+El PNG no pasa por el codificador de ``savefig``: la figura se rasteriza a un
+buffer RGBA en el hilo que dibuja y ``toolkit.pngopt`` lo codifica (paleta,
+zlib según el perfil) en un pool de hilos aparte, mientras el exhibit sigue con la
+siguiente figura. ``export_figure`` devuelve las rutas de inmediato; los
+archivos están completos tras ``flush()``, que llaman el runner, la salida
+de ``capture()`` y el ``__main__`` de cada script (para que un error de
+codificación o escritura termine el script con error). Al cerrar el proceso
+se vacía lo que quede y los errores se reportan en stderr.
+"""
+import atexit
+import io
+import os
+import shutil
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import matplotlib
+import numpy as np
+
+from toolkit.paths import RESULTS_DIR
+from toolkit.pngopt import encode_rgba
+from toolkit.profiles import LAYOUT_DPI, active_profile
+from toolkit.trace import traced
+
+DEFAULT_FORMATS = ("png", "svg")
+DEFAULT_DPI = LAYOUT_DPI
+SVG_HASHSALT = "exhibits-nuevos"
+
+_CAPTURED = None   # {ruta: bytes} mientras hay un capture() activo
+
+_ENCODER = None                        # ThreadPoolExecutor de codificación PNG (perezoso)
+_PENDING = []                          # futures de PNG aún sin escribir
+_PENDING_LOCK = threading.Lock()
+_PENDING_SLOTS = None                  # acota los buffers RGBA en espera (~30 MB cada uno a 300 dpi)
+
+
+def tight_bbox(fig, dpi=DEFAULT_DPI, pad_inches=None):
+    """
+    Caja ajustada (en pulgadas) equivalente a ``bbox_inches="tight"``, calculada
+    una vez a la resolución de salida (como hace ``savefig``).
+    """
+    if pad_inches is None:
+        pad_inches = matplotlib.rcParams["savefig.pad_inches"]
+    figure_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        renderer = fig.canvas.get_renderer()
+        bbox = fig.get_tightbbox(renderer)
+    finally:
+        fig.dpi = figure_dpi
+    return bbox.padded(pad_inches)
+
+
+class _BufferSink(io.RawIOBase):
+    # savefig(format="rgba") escribe el buffer del renderer de una vez; se guarda la vista sin copiar.
+    view = None
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.view = data
+        return len(data)
+
+
+def render_rgba(fig, dpi=DEFAULT_DPI, bbox_inches=None):
+    """
+    Rasteriza ``fig`` y devuelve el arreglo RGBA (alto × ancho × 4), propio de quien llama.
+    """
+    sink = _BufferSink()
+    fig.savefig(sink, format="rgba", dpi=dpi, bbox_inches=bbox_inches)
+    # Copia: el renderer del canvas se reutiliza en el siguiente dibujo de la figura.
+    return np.array(sink.view, dtype=np.uint8)
+
+
+def encode_figure(fig, fmt, dpi=DEFAULT_DPI, bbox_inches=None):
+    """
+    Codifica ``fig`` en ``fmt`` y devuelve los bytes (sin tocar disco).
+    """
+    if fmt == "png":
+        return encode_rgba(render_rgba(fig, dpi, bbox_inches), dpi)
+    buffer = io.BytesIO()
+    kwargs = {"format": fmt, "bbox_inches": bbox_inches}
+    if fmt == "svg":
+        kwargs["metadata"] = {"Date": None}
+        with matplotlib.rc_context({"svg.hashsalt": SVG_HASHSALT}):
+            fig.savefig(buffer, **kwargs)
+    else:
+        kwargs["dpi"] = dpi
+        fig.savefig(buffer, **kwargs)
+    return buffer.getvalue()
+
+
+@contextmanager
+def capture():
+    """
+    Dentro del bloque ``export_figure`` no toca el disco (ni las copias): devuelve
+    las rutas de siempre y deja ``{ruta: bytes}`` en el diccionario que entrega.
+    """
+    global _CAPTURED
+    previous, _CAPTURED = _CAPTURED, {}
+    try:
+        yield _CAPTURED
+        flush()
+    finally:
+        flush(raise_errors=False)
+        _CAPTURED = previous
+
+
+def _encoder():
+    global _ENCODER, _PENDING_SLOTS
+    if _ENCODER is None:
+        from toolkit.runner import available_cores
+
+        workers = available_cores()
+        _ENCODER = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="png")
+        _PENDING_SLOTS = threading.BoundedSemaphore(2 * workers)
+    return _ENCODER
+
+
+def flush(raise_errors=True):
+    """
+    Espera a que se escriban (o capturen) los PNG pendientes; con ``raise_errors``
+    propaga el primer error de codificación.
+    """
+    with _PENDING_LOCK:
+        pending = list(_PENDING)
+        _PENDING.clear()
+    error = None
+    for future in pending:
+        exc = future.exception()
+        if exc is not None and error is None:
+            error = exc
+    if error is not None and raise_errors:
+        raise error
+
+
+def _flush_at_exit():
+    # Al cerrar el proceso ya no hay a quién propagar el error: al menos que no pase en silencio.
+    try:
+        flush()
+    except Exception as exc:
+        sys.stderr.write("Error al escribir un PNG pendiente (el archivo puede no existir):\n")
+        traceback.print_exception(exc, file=sys.stderr)
+
+
+atexit.register(_flush_at_exit)
+
+
+def _write_bytes(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+def _link_or_copy(src, dst):
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Otro sistema de archivos o FS sin hard links.
+        shutil.copyfile(src, dst)
+
+
+def _finish_png(rgba, dpi, level, path, copy_dirs, captured):
+    try:
+        data = encode_rgba(rgba, dpi, os.path.basename(path), level)
+        if captured is not None:
+            captured[path] = data
+            return
+        _store(path, data, copy_dirs)
+    finally:
+        _PENDING_SLOTS.release()
+
+
+def _store(path, data, copy_dirs):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_bytes(path, data)
+    for copy_dir in copy_dirs:
+        os.makedirs(copy_dir, exist_ok=True)
+        _link_or_copy(path, os.path.join(copy_dir, os.path.basename(path)))
+
+
+def _submit_png(rgba, dpi, level, path, copy_dirs):
+    encoder = _encoder()
+    _PENDING_SLOTS.acquire()
+    future = encoder.submit(_finish_png, rgba, dpi, level, path, copy_dirs, _CAPTURED)
+    with _PENDING_LOCK:
+        _PENDING.append(future)
+
+
+@traced()
+def export_figure(fig, filename_base, output_dir=RESULTS_DIR, formats=DEFAULT_FORMATS,
+                  dpi=None, copy_dirs=(), tight=True, profile=None):
+    """
+    Exporta ``fig`` como ``<output_dir>/<filename_base>.<fmt>`` para cada formato
+    y replica cada archivo en ``copy_dirs``. Devuelve las rutas escritas.
+
+    ``tight=True`` equivale a ``bbox_inches="tight"`` en cada ``savefig``, pero
+    la caja se calcula una sola vez para todos los formatos.
+
+    ``profile`` (el activo por defecto) fija la resolución; un ``dpi``
+    explícito se toma como el de imprenta y se escala con el perfil. En
+    ``draft`` sólo se escribe PNG y se omiten ``copy_dirs``.
+
+    El PNG se termina de escribir en segundo plano (ver ``flush``).
+    """
+    profile = profile or active_profile()
+    dpi = profile.dpi if dpi is None else round(dpi * profile.scale)
+    if profile.formats is not None:
+        formats = [fmt for fmt in formats if fmt in profile.formats] or list(profile.formats[:1])
+    if profile.subdir:
+        output_dir = os.path.join(output_dir, profile.subdir)
+    if not profile.copies:
+        copy_dirs = ()
+    bbox = tight_bbox(fig, dpi=LAYOUT_DPI) if tight else None
+    written = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{filename_base}.{fmt}")
+        written.append(path)
+        if _CAPTURED is None:
+            written += [os.path.join(copy_dir, f"{filename_base}.{fmt}") for copy_dir in copy_dirs]
+        if fmt == "png":
+            # Se rasteriza aquí; la codificación y la escritura siguen en el pool de hilos.
+            _submit_png(render_rgba(fig, dpi, bbox), dpi, profile.png_level, path, copy_dirs)
+            continue
+        data = encode_figure(fig, fmt, dpi=dpi, bbox_inches=bbox)
+        if _CAPTURED is not None:
+            _CAPTURED[path] = data
+        else:
+            _store(path, data, copy_dirs)
+    return written
@@ -0,0 +1,212 @@
+"""
+Ciclo de vida de figuras con memoria acotada.
+
+- ``subplots`` sustituye a ``plt.subplots`` en los exhibits: registra la figura
+  y respeta un tope de figuras vivas simultáneamente en el proceso
+  (``EXHIBITS_MAX_LIVE_FIGURES``, 8 por defecto).
+- ``release_figure`` cierra la figura y suelta el buffer RGBA del canvas Agg.
+- ``figure_scope`` libera al salir todas las figuras creadas dentro y mide el
+  pico de memoria (RSS) del bloque; ``managed_figure`` hace lo mismo para una
+  sola figura (útil en notebooks o lotes de variantes).
+"""
+import gc
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+import matplotlib.pyplot as plt
+
+from toolkit import trace
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_MAX_LIVE_FIGURES = int(os.environ.get("EXHIBITS_MAX_LIVE_FIGURES", "8"))
+
+# Con EXHIBITS_TRACE activo, annotate/tight_layout/savefig... quedan como spans (toolkit/trace.py).
+trace.install_matplotlib_hooks()
+
+
+class FigureLimitError(RuntimeError):
+    pass
+
+
+class FigureLimiter:
+    """
+    Tope de figuras vivas. Si no hay cupo se espera ``timeout`` segundos (útil
+    con hilos) y después se lanza ``FigureLimitError``.
+    """
+
+    def __init__(self, max_live=DEFAULT_MAX_LIVE_FIGURES, timeout=0.0):
+        self.max_live = max_live
+        self.timeout = timeout
+        self._live = {}
+        self._cond = threading.Condition()
+
+    @property
+    def live(self):
+        return len(self._live)
+
+    def acquire(self, fig):
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._live) < self.max_live, timeout=self.timeout):
+                raise FigureLimitError(
+                    f"Tope de {self.max_live} figuras vivas alcanzado; libera figuras con "
+                    f"release_figure/figure_scope o sube EXHIBITS_MAX_LIVE_FIGURES")
+            self._live[id(fig)] = fig
+
+    def release(self, fig):
+        with self._cond:
+            if self._live.pop(id(fig), None) is not None:
+                self._cond.notify()
+
+    def figures(self):
+        with self._cond:
+            return list(self._live.values())
+
+
+_LIMITER = FigureLimiter()
+
+
+def set_figure_limit(max_live, timeout=None):
+    _LIMITER.max_live = max_live
+    if timeout is not None:
+        _LIMITER.timeout = timeout
+
+
+def live_figures():
+    return _LIMITER.live
+
+
+def subplots(*args, **kwargs):
+    """
+    ``plt.subplots`` con registro en el limitador de figuras vivas.
+    """
+    fig, axes = plt.subplots(*args, **kwargs)
+    try:
+        _LIMITER.acquire(fig)
+    except FigureLimitError:
+        plt.close(fig)
+        raise
+    return fig, axes
+
+
+def release_figure(fig):
+    """
+    Cierra ``fig`` en pyplot, vacía sus artistas y suelta el buffer del renderer Agg.
+    """
+    plt.close(fig)
+    canvas = fig.canvas
+    if "renderer" in vars(canvas):
+        # FigureCanvasAgg cachea el renderer (buffer RGBA de ancho×alto×4 bytes).
+        del canvas.renderer
+        canvas._lastKey = None
+    fig.clf()
+    _LIMITER.release(fig)
+
+
+# ---------------------------
+# Medición de memoria
+# ---------------------------
+_CLEAR_REFS = "/proc/self/clear_refs"
+_STATUS = "/proc/self/status"
+
+
+def _proc_status_kb(field):
+    try:
+        with open(_STATUS) as fh:
+            for line in fh:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _ru_maxrss_kb():
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 1024 if sys.platform == "darwin" else maxrss  # macOS reporta bytes
+
+
+def reset_peak_rss():
+    """
+    Reinicia el pico de RSS del proceso (Linux ≥ 4.0). Devuelve False si no es posible.
+    """
+    try:
+        with open(_CLEAR_REFS, "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    kb = _proc_status_kb("VmHWM")
+    if kb is None:
+        kb = _ru_maxrss_kb()
+    return None if kb is None else kb / 1024
+
+
+def current_rss_mb():
+    kb = _proc_status_kb("VmRSS")
+    return None if kb is None else kb / 1024
+
+
+class PeakMemory:
+    """
+    Memoria del bloque: ``peak_mb`` es el pico de RSS por encima del RSS de
+    entrada (MB), así que no incluye lo que dejaron bloques anteriores en el
+    mismo proceso. ``process_peak_mb`` es el máximo del proceso (VmHWM). Donde
+    el pico no se puede reiniciar, ``peak_mb`` queda en None.
+    """
+
+    def __enter__(self):
+        self.resettable = reset_peak_rss()
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.process_peak_mb = None
+        return self
+
+    def __exit__(self, *exc):
+        self.process_peak_mb = peak_rss_mb()
+        if self.resettable and self.start_mb is not None and self.process_peak_mb is not None:
+            self.peak_mb = max(0.0, self.process_peak_mb - self.start_mb)
+        return False
+
+
+@contextmanager
+def figure_scope():
+    """
+    Libera al salir las figuras creadas dentro del bloque (registradas o no) y
+    mide el pico de memoria; el ``PeakMemory`` resultante se entrega al ``with``.
+    """
+    before = set(plt.get_fignums())
+    tracked_before = {id(fig) for fig in _LIMITER.figures()}
+    with PeakMemory() as memory:
+        try:
+            yield memory
+        finally:
+            for fig in _LIMITER.figures():
+                if id(fig) not in tracked_before:
+                    release_figure(fig)
+            for num in set(plt.get_fignums()) - before:
+                release_figure(plt.figure(num))
+            # Las figuras tienen ciclos de referencias: sin esto el buffer espera al GC.
+            gc.collect()
+
+
+@contextmanager
+def managed_figure(*args, **kwargs):
+    """
+    ``with managed_figure(figsize=(10, 6)) as (fig, ax): ...`` — la figura se
+    libera al salir aunque el bloque falle.
+    """
+    fig, axes = subplots(*args, **kwargs)
+    try:
+        yield fig, axes
+    finally:
+        release_figure(fig)
@@ -0,0 +1,67 @@
+"""
+Histogramas acumulables por lotes (memoria fija) con cuantiles aproximados.
+
+Se usan cuando los datos no caben (o no conviene cargarlos) en memoria: cada
+lote suma sus conteos con un solo ``np.bincount`` y los cuantiles se
+interpolan dentro del bin al final.
+"""
+import numpy as np
+
+
+class StreamingHistogram:
+    """
+    Histograma de ``rows`` series con los mismos bordes (lineales o logarítmicos).
+
+    ``add(values)`` acepta un arreglo ``(n,)`` o ``(n, rows)``; los valores
+    fuera de rango se acumulan en el primer/último bin.
+    """
+
+    def __init__(self, low, high, bins=1024, rows=1, log=False):
+        if log and low <= 0:
+            raise ValueError("Un histograma logarítmico requiere low > 0")
+        self.low, self.high, self.bins, self.rows, self.log = low, high, bins, rows, log
+        self.counts = np.zeros((rows, bins), dtype=np.int64)
+        self.edges = (np.geomspace(low, high, bins + 1) if log else np.linspace(low, high, bins + 1))
+        self._a = np.log(low) if log else low
+        self._scale = bins / ((np.log(high) - np.log(low)) if log else (high - low))
+        self._offsets = (np.arange(rows) * bins)[None, :]
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.rows)
+        if self.log:
+            with np.errstate(divide="ignore"):
+                scaled = np.log(np.maximum(values, self.low))
+        else:
+            scaled = values
+        idx = ((scaled - self._a) * self._scale).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        idx += self._offsets
+        self.counts += np.bincount(idx.ravel(), minlength=self.rows * self.bins).reshape(self.rows, self.bins)
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    @property
+    def total(self):
+        return self.counts.sum(axis=1)
+
+    def quantiles(self, qs):
+        """
+        Cuantiles (``qs`` en [0, 1]) por fila: arreglo ``(len(qs), rows)``.
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        cdf = np.cumsum(self.counts, axis=1)
+        rows = np.arange(self.rows)
+        out = np.empty((len(qs), self.rows))
+        for i, q in enumerate(qs):
+            target = cdf[:, -1] * q
+            idx = np.minimum((cdf < target[:, None]).sum(axis=1), self.bins - 1)
+            below = np.where(idx > 0, cdf[rows, np.maximum(idx - 1, 0)], 0)
+            in_bin = self.counts[rows, idx]
+            frac = np.divide(target - below, in_bin, out=np.zeros(self.rows), where=in_bin > 0)
+            left, right = self.edges[idx], self.edges[idx + 1]
+            if self.log:
+                out[i] = np.exp(np.log(left) + frac * (np.log(right) - np.log(left)))
+            else:
+                out[i] = left + frac * (right - left)
+        return out
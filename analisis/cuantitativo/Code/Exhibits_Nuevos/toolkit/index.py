@@ -0,0 +1,273 @@
+"""
+Índice estático de exhibits, sin importar matplotlib ni NumPy.
+
+``toolkit.registry`` se puebla importando los scripts, y eso carga pyplot,
+NumPy y la caché de fuentes. Para listar, describir o validar basta con leer
+los decoradores ``@exhibit`` con ``ast``: id, título, builder, línea y entradas
+declaradas. Las entradas se resuelven si son ``dataset_files(...)``, rutas
+literales o constantes de módulo. Lo que depende del entorno (p. ej.
+``os.environ.get``) se reporta como entrada dinámica.
+
+El análisis de cada script se guarda en ``INDEX_PATH`` con su tamaño y fecha
+de modificación; sólo se vuelven a leer los scripts que cambiaron.
+"""
+import ast
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from glob import glob
+from typing import Dict, List, Tuple
+
+from toolkit.paths import CODE_DIR, DATA_DIR, INDEX_PATH
+
+SCRIPT_PATTERNS = ("Exhibit_*.py", "Exhibits_*.py")
+DATASETS_SOURCE = os.path.join(CODE_DIR, "toolkit", "datasets.py")
+INDEX_VERSION = 1
+
+
+def exhibit_scripts(code_dir=CODE_DIR):
+    paths = set()
+    for pattern in SCRIPT_PATTERNS:
+        paths.update(glob(os.path.join(code_dir, pattern)))
+    return sorted(paths)
+
+
+def natural_key(exhibit_id):
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part)
+            for part in re.split(r"[.\-_]", exhibit_id)]
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    exhibit_id: str
+    title: str
+    script: str
+    builder: str
+    line: int
+    inputs: Tuple[str, ...] = ()            # rutas resueltas
+    dynamic_inputs: Tuple[str, ...] = ()    # expresiones que dependen del entorno
+    notes: str = ""                         # comentario sobre el decorador
+    problems: Tuple[str, ...] = ()
+
+
+@dataclass
+class ExhibitIndex:
+    entries: List[IndexEntry] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)    # script -> error de sintaxis
+
+    def get(self, exhibit_id):
+        for entry in self.entries:
+            if entry.exhibit_id == exhibit_id:
+                return entry
+        known = ", ".join(entry.exhibit_id for entry in self.entries)
+        raise KeyError(f"Exhibit desconocido '{exhibit_id}'. Disponibles: {known}")
+
+    def problems(self):
+        """
+        ``[(id o script, mensaje)]``: ids duplicados, entradas inexistentes y scripts que no compilan.
+        """
+        found = [(os.path.basename(script), message) for script, message in sorted(self.errors.items())]
+        seen = {}
+        for entry in self.entries:
+            if entry.exhibit_id in seen:
+                found.append((entry.exhibit_id, f"id duplicado en {os.path.basename(entry.script)} "
+                                                f"y {os.path.basename(seen[entry.exhibit_id])}"))
+            seen[entry.exhibit_id] = entry.script
+            found.extend((entry.exhibit_id, message) for message in entry.problems)
+            found.extend((entry.exhibit_id, f"no existe la entrada {path}")
+                         for path in entry.inputs if not os.path.exists(path))
+        return found
+
+
+# ---------------------------
+# Análisis de fuentes
+# ---------------------------
+def _call_name(node):
+    func = node.func
+    return func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+
+
+def _literal(node):
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def _inputs_spec(node, constants, depth=0):
+    # Lista de {"dataset": nombre} | {"path": ruta} | {"expr": código}; JSON-serializable.
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [{"path": node.value}]
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return [item for elt in node.elts for item in _inputs_spec(elt, constants, depth)]
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return _inputs_spec(node.left, constants, depth) + _inputs_spec(node.right, constants, depth)
+    if (isinstance(node, ast.Call) and _call_name(node) == "dataset_files" and not node.keywords
+            and all(isinstance(arg, ast.Constant) and isinstance(arg.value, str) for arg in node.args)):
+        return [{"dataset": arg.value} for arg in node.args]
+    if isinstance(node, ast.Name) and node.id in constants and depth < 8:
+        return _inputs_spec(constants[node.id], constants, depth + 1)
+    return [{"expr": ast.unparse(node)}]
+
+
+def _leading_comment(lines, line):
+    # Comentario contiguo justo encima del decorador, sin las líneas de adorno (----, ====).
+    notes = []
+    for text in reversed(lines[:line - 1]):
+        text = text.strip()
+        if not text.startswith("#"):
+            break
+        text = text.lstrip("#").strip()
+        if text.strip("-=~ "):
+            notes.append(text)
+    return " ".join(reversed(notes))
+
+
+def _parse_script(path):
+    with open(path, encoding="utf-8") as fh:
+        source = fh.read()
+    tree = ast.parse(source, filename=path)
+    lines = source.splitlines()
+    constants = {}
+    entries = []
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)):
+            constants[node.targets[0].id] = node.value
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        for deco in node.decorator_list:
+            if not (isinstance(deco, ast.Call) and _call_name(deco) == "exhibit"):
+                continue
+            args = list(deco.args) + [None] * 3
+            keywords = {kw.arg: kw.value for kw in deco.keywords}
+            id_node, title_node = keywords.get("exhibit_id", args[0]), keywords.get("title", args[1])
+            inputs_node = keywords.get("inputs", args[2])
+            entries.append({
+                "exhibit_id": _literal(id_node) or ast.unparse(id_node),
+                "title": _literal(title_node) or (ast.unparse(title_node) if title_node else ""),
+                "builder": node.name,
+                "line": deco.lineno,
+                "inputs": _inputs_spec(inputs_node, constants) if inputs_node is not None else [],
+                "notes": _leading_comment(lines, min(d.lineno for d in node.decorator_list)),
+                "literal": _literal(id_node) is not None,
+            })
+    return entries
+
+
+def builder_fingerprints(path):
+    """
+    ``(módulo, {exhibit_id: huella})`` del script ``path``. La huella de cada builder
+    cubre sus decoradores y su cuerpo; la del módulo, todo lo demás (imports,
+    constantes, funciones auxiliares). Sirve para saber qué exhibits cambiaron
+    al editar un script (``toolkit.watch``).
+    """
+    with open(path, encoding="utf-8") as fh:
+        source = fh.read()
+    lines = source.splitlines(keepends=True)
+    builders, taken = {}, set()
+    for node in ast.parse(source, filename=path).body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        ids = [_literal(deco.args[0]) for deco in node.decorator_list
+               if isinstance(deco, ast.Call) and _call_name(deco) == "exhibit" and deco.args]
+        if not ids:
+            continue
+        first = min(deco.lineno for deco in node.decorator_list)
+        rows = range(first - 1, node.end_lineno)
+        taken.update(rows)
+        digest = hashlib.sha256("".join(lines[row] for row in rows).encode()).hexdigest()
+        builders.update((exhibit_id, digest) for exhibit_id in ids if exhibit_id)
+    rest = "".join(line for row, line in enumerate(lines) if row not in taken)
+    return hashlib.sha256(rest.encode()).hexdigest(), builders
+
+
+def _parse_datasets(path):
+    # {nombre: archivo} de los ``@dataset("nombre", "archivo.csv", ...)`` de toolkit/datasets.py.
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read(), filename=path)
+    found = {}
+    for node in tree.body:
+        for deco in getattr(node, "decorator_list", ()):
+            if (isinstance(deco, ast.Call) and _call_name(deco) == "dataset" and len(deco.args) >= 2
+                    and all(isinstance(arg, ast.Constant) for arg in deco.args[:2])):
+                found[deco.args[0].value] = deco.args[1].value
+    return found
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _read_cache(index_path):
+    try:
+        with open(index_path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return data.get("files", {}) if data.get("version") == INDEX_VERSION else {}
+
+
+def _write_cache(index_path, files):
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"version": INDEX_VERSION, "files": files}, fh, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass   # el índice es sólo una caché: sin permiso de escritura se recalcula cada vez
+
+
+def _cached(cache, fresh, path, parse):
+    stamp = _stamp(path)
+    entry = cache.get(path)
+    if entry is not None and entry.get("stamp") == stamp:
+        fresh[path] = entry
+        return entry["data"], False
+    try:
+        data = {"ok": parse(path)}
+    except SyntaxError as exc:
+        data = {"error": f"error de sintaxis en la línea {exc.lineno}: {exc.msg}"}
+    fresh[path] = {"stamp": stamp, "data": data}
+    return data, True
+
+
+def load_index(code_dir=CODE_DIR, index_path=INDEX_PATH, datasets_source=DATASETS_SOURCE):
+    """
+    ``ExhibitIndex`` de los scripts de ``code_dir``, ordenado por id.
+    """
+    cache, fresh = _read_cache(index_path), {}
+    dirty = False
+    dataset_files, changed = _cached(cache, fresh, datasets_source, _parse_datasets)
+    dataset_files = dataset_files.get("ok", {})
+    dirty |= changed
+
+    index = ExhibitIndex()
+    for script in exhibit_scripts(code_dir):
+        data, changed = _cached(cache, fresh, script, _parse_script)
+        dirty |= changed
+        if "error" in data:
+            index.errors[script] = data["error"]
+            continue
+        for raw in data["ok"]:
+            inputs, dynamic, problems = [], [], []
+            for item in raw["inputs"]:
+                if "dataset" in item:
+                    if item["dataset"] in dataset_files:
+                        inputs.append(os.path.join(DATA_DIR, dataset_files[item["dataset"]]))
+                    else:
+                        problems.append(f"dataset desconocido '{item['dataset']}'")
+                elif "path" in item:
+                    inputs.append(os.path.abspath(item["path"]))   # igual que ``@exhibit``
+                else:
+                    dynamic.append(item["expr"])
+            if not raw["literal"]:
+                problems.append(f"id no literal ({raw['exhibit_id']}); no se puede indexar sin importar")
+            index.entries.append(IndexEntry(raw["exhibit_id"], raw["title"], script, raw["builder"], raw["line"],
+                                            tuple(inputs), tuple(dynamic), raw["notes"], tuple(problems)))
+
+    if dirty or set(fresh) != set(cache):
+        _write_cache(index_path, fresh)
+    index.entries.sort(key=lambda entry: natural_key(entry.exhibit_id))
+    return index
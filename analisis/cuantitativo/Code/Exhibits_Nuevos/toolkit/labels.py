@@ -0,0 +1,351 @@
+"""
+Colocación de etiquetas de valor y callouts sin traslapes.
+
+    layout = LabelLayout(ax)
+    layout.value_labels(bars, [f"{v:.2f}%" for v in values], fontsize=12)
+    layout.callout(texto, xy=(x, y), fontsize=12, arrowprops=..., bbox=...)
+    layout.place()
+
+Sustituye el ajuste manual de ``xytext`` (un render completo por intento).
+``place`` se llama al final, con los límites de los ejes fijos y después de
+``tight_layout``, porque trabaja con la geometría en pantalla de ese momento:
+
+1. cada texto se mide una sola vez con el renderer de la figura, sin
+   dibujarla (textos idénticos comparten la medida);
+2. los obstáculos (barras y demás parches, líneas, título, leyenda y textos
+   ya presentes) y las cajas que se van colocando viven en una rejilla
+   uniforme, así que cada candidato sólo se compara con lo que tiene cerca;
+3. cada etiqueta prueba sus posiciones candidatas en orden de preferencia
+   (alrededor del extremo de la barra para las de valor; anillos de distancia
+   creciente alrededor del punto señalado para los callouts). Gana la primera
+   que no traslapa nada ni se sale de los ejes; si ninguna, la de menor
+   traslape.
+
+Las etiquetas se crean como ``annotate`` con ``textcoords="offset points"``
+respecto al ancla en datos: el desplazamiento no depende del dpi, así que la
+misma colocación vale para todos los perfiles de render. La flecha de un
+callout sale del lado (o la esquina) de su caja que da al punto señalado y
+matplotlib la recorta contra la caja, así que empieza en su borde.
+
+Cada etiqueta es un artista; para cientos o miles de barras (series mensuales
+o diarias) ver ``toolkit.bars``, que las dibuja en lote y descarta las que no
+caben.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.patches import Rectangle
+from matplotlib.text import Text
+
+from toolkit.trace import traced
+
+_ALIGN_X = {"left": 0.0, "center": 0.5, "right": 1.0}
+_ALIGN_Y = {"bottom": 0.0, "center": 0.5, "top": 1.0}
+
+# Candidatos de una etiqueta de valor: dirección respecto al extremo de la barra, ha, va.
+VALUE_CANDIDATES = {
+    "vertical": (((0, 1), "center", "bottom"),     # sobre la barra
+                 ((0, -1), "center", "top"),       # dentro, bajo el extremo
+                 ((1, 1), "left", "bottom"),
+                 ((-1, 1), "right", "bottom")),
+    "horizontal": (((1, 0), "left", "center"),     # a la derecha del extremo
+                   ((-1, 0), "right", "center"),   # dentro
+                   ((1, 1), "left", "bottom"),
+                   ((1, -1), "left", "top")),
+}
+# Callouts: ángulos (grados) en orden de preferencia y radios crecientes (puntos).
+CALLOUT_ANGLES = (45, 135, 0, 180, 90, 315, 225, 270, 20, 160, 70, 110, 340, 200)
+CALLOUT_RADII = (30, 50, 80, 120, 170, 230)
+VALUE_GAP = 3.0          # puntos entre el extremo de la barra y la etiqueta
+OUTSIDE_PENALTY = 4.0    # el área fuera de los ejes cuenta como 4 veces un traslape
+MIN_CELL = 16.0          # píxeles
+
+
+def _intersection(a, b):
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    return w * h if w > 0 and h > 0 else 0.0
+
+
+class _GridIndex:
+    """
+    Rejilla uniforme de rectángulos ``(x0, y0, x1, y1)`` en píxeles.
+    """
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.rects = []
+        self.cells = {}
+
+    def _keys(self, rect):
+        c = self.cell
+        for i in range(math.floor(rect[0] / c), math.floor(rect[2] / c) + 1):
+            for j in range(math.floor(rect[1] / c), math.floor(rect[3] / c) + 1):
+                yield i, j
+
+    def insert(self, rect):
+        idx = len(self.rects)
+        self.rects.append(rect)
+        for key in self._keys(rect):
+            self.cells.setdefault(key, []).append(idx)
+
+    def overlap(self, rect):
+        """
+        Área total de ``rect`` que traslapa con los rectángulos indexados.
+        """
+        seen, total = set(), 0.0
+        for key in self._keys(rect):
+            for idx in self.cells.get(key, ()):
+                if idx not in seen:
+                    seen.add(idx)
+                    total += _intersection(rect, self.rects[idx])
+        return total
+
+
+@dataclass
+class _Label:
+    text: str
+    xy: Tuple[float, float]
+    candidates: tuple              # ((dx, dy) en puntos sin contar el relleno, ha, va)
+    kwargs: dict
+    arrowprops: Optional[dict] = None
+    size: Tuple[float, float] = (0.0, 0.0)   # ancho, alto en píxeles (caja incluida)
+    pad: float = 0.0                          # relleno de la caja en píxeles
+    artist: object = field(default=None, repr=False)
+
+
+def _segment_boxes(points, step, halfwidth):
+    # Cada segmento de la polilínea se parte en tramos de largo <= step; una caja por tramo.
+    points = points[np.isfinite(points).all(axis=1)]
+    if len(points) == 0:
+        return np.empty((0, 4))
+    if len(points) == 1:
+        x, y = points[0]
+        return np.array([[x - halfwidth, y - halfwidth, x + halfwidth, y + halfwidth]])
+    start, end = points[:-1], points[1:]
+    pieces = np.maximum(np.ceil(np.hypot(*(end - start).T) / step), 1).astype(int)
+    seg = np.repeat(np.arange(len(start)), pieces)
+    k = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    t0, t1 = (k / pieces[seg])[:, None], ((k + 1) / pieces[seg])[:, None]
+    delta = end[seg] - start[seg]
+    a, b = start[seg] + t0 * delta, start[seg] + t1 * delta
+    return np.column_stack([np.minimum(a[:, 0], b[:, 0]) - halfwidth, np.minimum(a[:, 1], b[:, 1]) - halfwidth,
+                            np.maximum(a[:, 0], b[:, 0]) + halfwidth, np.maximum(a[:, 1], b[:, 1]) + halfwidth])
+
+
+class LabelLayout:
+    """
+    Coloca las etiquetas de ``ax`` evitando barras, líneas, textos y entre sí.
+
+    ``add_obstacles`` suma artistas o ejes adicionales (p. ej. el ``twinx``).
+    Las etiquetas de valor se colocan antes que los callouts, que tienen más
+    libertad para moverse.
+    """
+
+    def __init__(self, ax, gap=VALUE_GAP):
+        self.ax = ax
+        self.fig = ax.figure
+        self.gap = gap
+        self.labels = []
+        self._extra = []
+
+    # ---- declaración ----
+    def add_obstacles(self, *artists):
+        self._extra.extend(artists)
+        return self
+
+    def value_label(self, xy, text, orientation="vertical", **kwargs):
+        """
+        Etiqueta junto al punto ``xy`` (datos), p. ej. el extremo de una barra.
+        """
+        candidates = tuple(((dx * self.gap, dy * self.gap), ha, va)
+                           for (dx, dy), ha, va in VALUE_CANDIDATES[orientation])
+        self.labels.append(_Label(text, tuple(xy), candidates, kwargs))
+
+    def value_labels(self, bars, texts, **kwargs):
+        """
+        Una etiqueta por barra de un ``BarContainer`` (``ax.bar``/``ax.barh``), en el extremo de cada una.
+        """
+        orientation = getattr(bars, "orientation", None) or "vertical"
+        for rect, text in zip(bars, texts):
+            x, y, w, h = rect.get_x(), rect.get_y(), rect.get_width(), rect.get_height()
+            if orientation == "horizontal":
+                self.value_label((x + w, y + h / 2), text, "horizontal", **kwargs)
+            else:
+                self.value_label((x + w / 2, y + h), text, "vertical", **kwargs)
+
+    def callout(self, text, xy, arrowprops=None, offsets=None, **kwargs):
+        """
+        Texto con flecha hacia ``xy`` (datos). ``offsets`` fija los
+        desplazamientos candidatos ``(dx, dy)`` en puntos, en orden de preferencia.
+        """
+        if offsets is None:
+            offsets = [(r * math.cos(math.radians(a)), r * math.sin(math.radians(a)))
+                       for r in CALLOUT_RADII for a in CALLOUT_ANGLES]
+        if "ma" not in kwargs:
+            kwargs.setdefault("multialignment", "left")   # las líneas no cambian de alineación según el lado
+        candidates = []
+        for dx, dy in offsets:
+            length = math.hypot(dx, dy) or 1.0
+            candidates.append(((dx, dy), _align(dx / length, "left", "right"), _align(dy / length, "bottom", "top")))
+        self.labels.append(_Label(text, tuple(xy), tuple(candidates), kwargs,
+                                  arrowprops=dict(arrowprops or {"arrowstyle": "->"})))
+
+    # ---- colocación ----
+    def _measure(self, renderer):
+        # Un Text de sondeo por estilo; sólo cambia la cadena entre medidas.
+        probes, sizes = {}, {}
+        for label in self.labels:
+            style = tuple(sorted((k, repr(v)) for k, v in label.kwargs.items()))
+            if (label.text, style) not in sizes:
+                if style not in probes:
+                    probe = Text(0, 0, "", **label.kwargs)
+                    probe.set_figure(self.fig)
+                    patch = probe.get_bbox_patch()
+                    pad = 0.0
+                    if patch is not None:
+                        pad = getattr(patch.get_boxstyle(), "pad", 0.0) * renderer.points_to_pixels(probe.get_size())
+                    probes[style] = (probe, pad)
+                probe, pad = probes[style]
+                probe.set_text(label.text)
+                extent = probe.get_window_extent(renderer)
+                sizes[label.text, style] = ((extent.width + 2 * pad, extent.height + 2 * pad), pad)
+            label.size, label.pad = sizes[label.text, style]
+
+    def _obstacles(self, renderer, cell):
+        # Devuelve (formas, textos): las flechas sólo deben evitar los textos.
+        rects, text_rects = [], []
+        for ax in [self.ax] + [a for a in self._extra if isinstance(a, Axes)]:
+            # Las barras se transforman todas juntas; el resto de parches, uno por uno.
+            visible = [p for p in ax.patches if p.get_visible()]
+            bars = [p for p in visible if type(p) is Rectangle and p.get_data_transform() is ax.transData]
+            others = [p for p in visible if not (type(p) is Rectangle and p.get_data_transform() is ax.transData)]
+            if bars:
+                corners = ax.transData.transform(
+                    [(b.get_x(), b.get_y()) for b in bars] + [(b.get_x() + b.get_width(), b.get_y() + b.get_height()) for b in bars])
+                low, high = corners[:len(bars)], corners[len(bars):]
+                rects += list(np.column_stack([np.minimum(low, high), np.maximum(low, high)]))
+            rects += [p.get_window_extent(renderer).extents for p in others]
+            for line in ax.lines:
+                if line.get_visible():
+                    points = line.get_transform().transform(np.asarray(line.get_xydata(), dtype=float))
+                    marker = line.get_markersize() if line.get_marker() not in (None, "", "None", "none") else 0
+                    halfwidth = renderer.points_to_pixels(max(line.get_linewidth(), marker) / 2)
+                    rects += list(_segment_boxes(points, cell, halfwidth))
+            texts = [t for t in ax.texts if t.get_visible() and t.get_text()]
+            texts += [t for t in (ax.title, ax.get_legend()) if t is not None and t.get_visible()
+                      and (not isinstance(t, Text) or t.get_text())]
+            text_rects += [t.get_window_extent(renderer).extents for t in texts]
+        rects += [a.get_window_extent(renderer).extents for a in self._extra if not isinstance(a, Axes)]
+        return rects, text_rects
+
+    def _rect(self, anchor, label, candidate):
+        (dx, dy), ha, va = candidate
+        scale = self.fig.dpi / 72.0
+        w, h = label.size
+        # El relleno de la caja se suma en la dirección de alejamiento para que el borde quede donde se pidió.
+        sx = {"left": 1, "right": -1}.get(ha, 0)
+        sy = {"bottom": 1, "top": -1}.get(va, 0)
+        x = anchor[0] + dx * scale + sx * label.pad
+        y = anchor[1] + dy * scale + sy * label.pad
+        x0 = x - label.pad - _ALIGN_X[ha] * (w - 2 * label.pad)
+        y0 = y - label.pad - _ALIGN_Y[va] * (h - 2 * label.pad)
+        return (x0, y0, x0 + w, y0 + h), ((x - anchor[0]) / scale, (y - anchor[1]) / scale)
+
+    @staticmethod
+    def _arrow(anchor, start, cell):
+        # Aproximación recta de la flecha: del ancla al punto de la caja del que sale.
+        return _segment_boxes(np.array([anchor, start]), cell, 1.0)
+
+    @traced("labels.place")
+    def place(self):
+        """
+        Coloca todas las etiquetas declaradas y devuelve los ``Annotation`` creados.
+        """
+        if not self.labels:
+            return []
+        renderer = self.fig.canvas.get_renderer()
+        for ax in [self.ax] + [a for a in self._extra if isinstance(a, Axes)]:
+            ax.get_xlim(), ax.get_ylim()   # aplica el autoescalado pendiente antes de usar transData
+        self._measure(renderer)
+        cell = max(MIN_CELL, float(np.median([label.size[1] for label in self.labels])) * 2)
+        index, texts = _GridIndex(cell), _GridIndex(cell)
+        shapes, text_rects = self._obstacles(renderer, cell)
+        for rect in shapes:
+            index.insert(tuple(rect))
+        for rect in text_rects:
+            index.insert(tuple(rect))
+            texts.insert(tuple(rect))
+        bounds = tuple(self.ax.get_window_extent(renderer).extents)
+        to_display = self.ax.transData.transform
+        tolerance = renderer.points_to_pixels(self.gap) + 1
+
+        ordered = sorted(self.labels, key=lambda label: label.arrowprops is not None)
+        for label in ordered:
+            anchor = to_display(label.xy)
+            # Textos pegados al punto señalado (su etiqueta de valor): la flecha se recorta al salir de ellos.
+            near = {idx for idx, r in enumerate(texts.rects) if r[0] - tolerance <= anchor[0] <= r[2] + tolerance
+                    and r[1] - tolerance <= anchor[1] <= r[3] + tolerance} if label.arrowprops is not None else set()
+            best = None
+            for candidate in label.candidates:
+                rect, offset = self._rect(anchor, label, candidate)
+                area = (rect[2] - rect[0]) * (rect[3] - rect[1])
+                outside = area - _intersection(rect, bounds)
+                cost = index.overlap(rect) + OUTSIDE_PENALTY * outside
+                if label.arrowprops is not None:
+                    start = _arrow_start(rect, candidate[1], candidate[2])
+                    cost += sum(texts.overlap(tuple(box)) for box in self._arrow(anchor, start, cell))
+                if best is None or cost < best[0]:
+                    best = (cost, rect, offset, candidate)
+                if cost == 0:
+                    break
+            _, rect, offset, (_, ha, va) = best
+            index.insert(rect)
+            texts.insert(rect)
+            arrowprops = label.arrowprops
+            if arrowprops is not None:
+                start = _arrow_start(rect, ha, va)
+                # La flecha también estorba a las cajas siguientes.
+                for box in self._arrow(anchor, start, cell):
+                    index.insert(tuple(box))
+                if "arrowstyle" in arrowprops:
+                    # Sale del lado (o esquina) de la caja que da al ancla; matplotlib la recorta
+                    # contra la caja (patchA), así que empieza en su borde y no por debajo.
+                    arrowprops = dict(arrowprops)
+                    arrowprops.setdefault("relpos", (_ALIGN_X[ha], _ALIGN_Y[va]))
+                    if near and "shrinkB" not in arrowprops:
+                        exit_px = max(_ray_exit(anchor, start, texts.rects[idx]) for idx in near)
+                        arrowprops["shrinkB"] = exit_px * 72.0 / self.fig.dpi + 2
+            label.artist = self.ax.annotate(label.text, xy=label.xy, xytext=offset, textcoords="offset points",
+                                            ha=ha, va=va, arrowprops=arrowprops, **label.kwargs)
+        return [label.artist for label in self.labels]
+
+
+def _arrow_start(rect, ha, va):
+    # Punto de la caja (px) del que sale la flecha: el lado o la esquina alineada con el ancla.
+    return (rect[0] + _ALIGN_X[ha] * (rect[2] - rect[0]), rect[1] + _ALIGN_Y[va] * (rect[3] - rect[1]))
+
+
+def _ray_exit(anchor, start, rect):
+    # Distancia (px) desde el ancla, en dirección a ``start``, hasta salir de rect.
+    dx = start[0] - anchor[0]
+    dy = start[1] - anchor[1]
+    t = math.inf
+    for d, a, lo, hi in ((dx, anchor[0], rect[0], rect[2]), (dy, anchor[1], rect[1], rect[3])):
+        if d > 0:
+            t = min(t, (hi - a) / d)
+        elif d < 0:
+            t = min(t, (lo - a) / d)
+    return max(t, 0.0) * math.hypot(dx, dy) if math.isfinite(t) else 0.0
+
+
+def _align(direction, positive, negative, tolerance=0.3):
+    # direction: componente del vector unitario hacia la etiqueta.
+    if direction > tolerance:
+        return positive
+    if direction < -tolerance:
+        return negative
+    return "center"
@@ -0,0 +1,175 @@
+"""
+Simulador de ahorro por MDR a escala de población de comercios.
+
+Generaliza el mini-escenario PYME de Exhibit_3.py ($200,000 MXN/mes, 2.5% →
+0.22%) a millones de comercios. Cada comercio tiene ventas mensuales y una
+mezcla de aceptación por método (dataset ``costos_aceptacion``, la tabla
+``ranges`` del Exhibit 3 del prototipo); el ahorro por método es ``ventas × participación × (tasa − tasa Pix)``.
+
+Las fuentes se leen por lotes —CSV, Parquet (requiere ``pyarrow``) o una
+población sintética— y los totales, histogramas y deciles se acumulan en una
+sola pasada vectorizada por lote, sin cargar el archivo completo.
+
+Formato de archivo: columna ``ventas_mensuales`` (MXN) y una columna de
+participación (0–1) por cada llave de ``METHOD_KEYS``.
+"""
+import os
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict
+
+import numpy as np
+
+from toolkit.datasets import get_dataset
+from toolkit.histograms import StreamingHistogram
+from toolkit.trace import traced
+
+# Columna del archivo de comercios -> método en Data/costos_aceptacion.csv
+METHOD_KEYS = {
+    "efectivo": "Efectivo (costos operativos)",
+    "tpv_debito": "Tarjeta (TPV) Débito",
+    "tpv_credito": "Tarjeta (TPV) Crédito",
+    "agregador": "Tarjeta (Agregador)",
+    "pix": "Modelo Pix (Comercio)",
+}
+SALES_COLUMN = "ventas_mensuales"
+PIX_RATE_PCT = 0.22
+DEFAULT_CHUNK = 500_000
+
+# Población sintética: ventas log-normales (mediana ≈ $45,000 MXN/mes) y mezcla Dirichlet
+SYNTHETIC_SALES_MEDIAN = 45_000.0
+SYNTHETIC_SALES_SIGMA = 1.1
+SYNTHETIC_MIX_ALPHA = (6.0, 1.5, 1.0, 0.8, 0.4)
+
+
+def method_rates(midpoint=True):
+    """
+    Tasas por método (fracción) en el orden de ``METHOD_KEYS``: punto medio del rango o (mín, máx).
+    """
+    costs = get_dataset("costos_aceptacion").ranges
+    ranges = np.array([costs[label] for label in METHOD_KEYS.values()]) / 100.0
+    return ranges.mean(axis=1) if midpoint else (ranges[:, 0], ranges[:, 1])
+
+
+# ---------------------------
+# Fuentes por lotes: dict(ventas=(n,), mix=(n, métodos))
+# ---------------------------
+def _columns_index(header):
+    names = [name.strip() for name in header]
+    missing = [col for col in (SALES_COLUMN, *METHOD_KEYS) if col not in names]
+    if missing:
+        raise ValueError(f"Faltan columnas en el archivo de comercios: {', '.join(missing)}")
+    return names.index(SALES_COLUMN), [names.index(key) for key in METHOD_KEYS]
+
+
+def iter_csv_chunks(path, chunk_size=DEFAULT_CHUNK, delimiter=","):
+    with open(path, encoding="utf-8") as fh:
+        sales_col, mix_cols = _columns_index(fh.readline().rstrip("\n").split(delimiter))
+        usecols = [sales_col, *mix_cols]
+        while True:
+            lines = list(islice(fh, chunk_size))
+            if not lines:
+                return
+            block = np.loadtxt(lines, delimiter=delimiter, usecols=usecols, ndmin=2, dtype=np.float64)
+            yield {"ventas": block[:, 0], "mix": block[:, 1:]}
+
+
+def iter_parquet_chunks(path, chunk_size=DEFAULT_CHUNK):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Leer Parquet requiere pyarrow (pip install pyarrow)") from exc
+    columns = [SALES_COLUMN, *METHOD_KEYS]
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+        arrays = [batch.column(i).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+                  for i in range(len(columns))]
+        yield {"ventas": arrays[0], "mix": np.column_stack(arrays[1:])}
+
+
+def iter_synthetic_chunks(n_merchants, chunk_size=DEFAULT_CHUNK, seed=2025,
+                          sales_median=SYNTHETIC_SALES_MEDIAN, sales_sigma=SYNTHETIC_SALES_SIGMA,
+                          mix_alpha=SYNTHETIC_MIX_ALPHA):
+    rng = np.random.default_rng(seed)
+    done = 0
+    while done < n_merchants:
+        size = min(chunk_size, n_merchants - done)
+        yield {
+            "ventas": rng.lognormal(np.log(sales_median), sales_sigma, size),
+            "mix": rng.dirichlet(mix_alpha, size),
+        }
+        done += size
+
+
+def iter_merchant_chunks(source, chunk_size=DEFAULT_CHUNK):
+    """
+    ``source``: ruta .csv/.parquet o un número de comercios sintéticos.
+    """
+    if isinstance(source, (int, np.integer)):
+        return iter_synthetic_chunks(int(source), chunk_size)
+    ext = os.path.splitext(str(source))[1].lower()
+    if ext == ".parquet":
+        return iter_parquet_chunks(source, chunk_size)
+    if ext in (".csv", ".txt"):
+        return iter_csv_chunks(source, chunk_size)
+    raise ValueError(f"Formato de comercios no soportado: {source}")
+
+
+# ---------------------------
+# Ahorro y agregación
+# ---------------------------
+def merchant_savings(chunk, rates=None):
+    """
+    Ahorro mensual (MXN) por comercio y método al migrar al modelo Pix: arreglo ``(n, métodos)``.
+    """
+    rates = method_rates() if rates is None else rates
+    return chunk["ventas"][:, None] * chunk["mix"] * (rates - PIX_RATE_PCT / 100.0)[None, :]
+
+
+@dataclass
+class PopulationSummary:
+    n_merchants: int
+    total_sales: float                      # MXN/mes
+    savings_by_method: Dict[str, float]     # MXN/mes por método
+    histogram: StreamingHistogram           # fila 0: total; filas 1..: por método (ahorro anual)
+    deciles: np.ndarray                     # (9, 1 + métodos) ahorro anual por comercio
+
+    @property
+    def total_savings(self):
+        return sum(self.savings_by_method.values())
+
+
+@traced()
+def summarize_population(source, chunk_size=DEFAULT_CHUNK, rates=None,
+                         hist_low=1.0, hist_high=1e8, bins=2048):
+    """
+    Recorre ``source`` por lotes y acumula totales, histograma logarítmico del
+    ahorro anual por comercio (total y por método) y sus deciles.
+    """
+    rates = method_rates() if rates is None else rates
+    methods = list(METHOD_KEYS.values())
+    hist = StreamingHistogram(hist_low, hist_high, bins=bins, rows=1 + len(methods), log=True)
+    totals = np.zeros(len(methods))
+    n_merchants, total_sales = 0, 0.0
+    for chunk in iter_merchant_chunks(source, chunk_size):
+        monthly = merchant_savings(chunk, rates)
+        totals += monthly.sum(axis=0)
+        annual = np.empty((monthly.shape[0], 1 + len(methods)))
+        annual[:, 0] = monthly.sum(axis=1)
+        annual[:, 1:] = monthly
+        annual *= 12
+        hist.add(annual)
+        n_merchants += monthly.shape[0]
+        total_sales += float(chunk["ventas"].sum())
+    deciles = hist.quantiles(np.arange(1, 10) / 10.0)
+    return PopulationSummary(n_merchants, total_sales, dict(zip(methods, totals)), hist, deciles)
+
+
+def write_synthetic_csv(path, n_merchants, chunk_size=DEFAULT_CHUNK, seed=2025):
+    """
+    Escribe una población sintética en el formato de archivo esperado (útil para pruebas de escala).
+    """
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(",".join([SALES_COLUMN, *METHOD_KEYS]) + "\n")
+        for chunk in iter_synthetic_chunks(n_merchants, chunk_size, seed):
+            np.savetxt(fh, np.column_stack([chunk["ventas"], chunk["mix"]]), delimiter=",", fmt="%.6g")
+    return path
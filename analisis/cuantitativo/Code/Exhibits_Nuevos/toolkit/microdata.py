@@ -0,0 +1,477 @@
+"""
+Microdatos de encuestas (ENIF y olas futuras): ingesta por bloques, caché columnar y consultas ponderadas.
+
+    enif = get_survey("enif_2024")
+    enif.share("conoce_codi")                                   # % ponderado de adultos
+    enif.share("usa_codi", where="conoce_codi", by="entidad")    # uso entre quienes conocen, por estado
+    enif.share("conoce_dimo", by=Bands("edad", (18, 30, 45, 60), ("18-29", "30-44", "45-59", "60+")))
+
+Cada encuesta se registra con ``survey(...)``: archivo CSV crudo en
+``MICRODATA_DIR`` (``Data/microdatos``; no se versiona), columnas tipadas y
+la columna del factor de expansión. La primera vez que se pide:
+
+1. el CSV se lee en bloques de ``CHUNK_ROWS`` filas (memoria acotada por el
+   bloque, no por el archivo) con ``np.loadtxt``, que sólo conserva las
+   columnas del esquema; cada columna del bloque se convierte de una vez:
+   ``float``/``int`` con ``astype``, ``bool`` contra los valores verdaderos
+   de la encuesta, y ``category`` con ``np.unique`` por bloque y un
+   diccionario global de códigos;
+2. cada columna se agrega a un archivo binario en ``MICRODATA_CACHE_DIR``
+   (``Results/.microdata/<encuesta>``) junto con ``meta.json`` (tipos,
+   categorías, filas y la llave de la fuente).
+
+Las siguientes ejecuciones abren las columnas con ``np.memmap`` sin parsear
+nada, mientras la llave coincida: tamaño y fecha del CSV, esquema y versión
+del formato. Las consultas son ``np.bincount`` ponderados sobre los códigos
+de grupo, así que un corte por estado × banda de edad recorre cada columna
+una vez.
+
+Faltantes: ``float`` → NaN; ``int``, ``bool`` y ``category`` → -1. Se
+excluyen de cada consulta las filas con el valor, el filtro, algún grupo o
+el factor faltante.
+
+    python -m toolkit.microdata [encuestas...] [--force]
+
+ingesta (o refresca) las cachés e imprime filas, columnas y tiempos.
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from toolkit.paths import ANALYSIS_ROOT, DATA_DIR
+from toolkit.trace import traced
+
+MICRODATA_DIR = os.path.join(DATA_DIR, "microdatos")
+MICRODATA_CACHE_DIR = os.path.join(ANALYSIS_ROOT, "Results", ".microdata")
+CACHE_VERSION = 1
+CHUNK_ROWS = 100_000
+KINDS = {"float": np.float64, "int": np.int64, "bool": np.int8, "category": np.int32}
+MISSING = -1
+NA_VALUES = ("", "NA", "N/A", "nan", "NaN", "NULL")
+TRUE_VALUES = ("1", "si", "sí", "true", "verdadero")
+
+
+class MicrodataError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SurveySpec:
+    name: str
+    filename: str
+    columns: Dict[str, str]                    # columna -> "float" | "int" | "bool" | "category"
+    weight: str
+    description: str = ""
+    sources: Dict[str, str] = field(default_factory=dict)   # columna -> encabezado en el CSV, si difiere
+    true_values: Tuple[str, ...] = TRUE_VALUES
+    na_values: Tuple[str, ...] = NA_VALUES
+    delimiter: str = ","
+    encoding: str = "utf-8"
+
+    @property
+    def path(self):
+        return os.path.join(MICRODATA_DIR, self.filename)
+
+    @property
+    def cache_dir(self):
+        return os.path.join(MICRODATA_CACHE_DIR, self.name)
+
+    def schema(self):
+        columns = dict(self.columns)
+        columns.setdefault(self.weight, "float")
+        return columns
+
+
+_REGISTRY: Dict[str, SurveySpec] = {}
+_LOADED = {}
+_LOCK = threading.Lock()
+
+
+def survey(name, filename, columns, weight, description="", **options):
+    """
+    Registra la encuesta ``name`` (``options``: ``sources``, ``true_values``, ``na_values``...).
+    """
+    unknown = {kind for kind in columns.values()} - set(KINDS)
+    if unknown:
+        raise ValueError(f"Tipos de columna desconocidos en '{name}': {', '.join(sorted(unknown))}")
+    _REGISTRY[name] = SurveySpec(name, filename, dict(columns), weight, description, **options)
+
+
+def survey_files(*names):
+    """
+    Rutas de los CSV crudos de ``names`` que existen (para ``@exhibit(..., inputs=...)``).
+    """
+    return tuple(path for path in (_REGISTRY[name].path for name in names) if os.path.exists(path))
+
+
+def all_surveys():
+    return dict(_REGISTRY)
+
+
+# ---------------------------
+# Ingesta
+# ---------------------------
+
+def _source_key(spec):
+    stat = os.stat(spec.path)
+    payload = json.dumps([CACHE_VERSION, spec.schema(), spec.sources, spec.true_values, spec.na_values,
+                          spec.delimiter, spec.encoding, stat.st_size, stat.st_mtime_ns], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _read_chunks(spec, chunk_rows):
+    # Bloques {columna: arreglo de cadenas}. Como en Data/*.csv, puede haber líneas "#" antes del encabezado.
+    with open(spec.path, encoding=spec.encoding, newline="") as fh:
+        line = fh.readline()
+        while line.startswith("#") or (line and not line.strip()):
+            line = fh.readline()
+        if not line:
+            raise MicrodataError(f"Encuesta '{spec.name}' vacía: {spec.path}")
+        header = [name.strip() for name in next(csv.reader([line], delimiter=spec.delimiter))]
+        positions = {}
+        for name in spec.schema():
+            source = spec.sources.get(name, name)
+            if source not in header:
+                raise MicrodataError(f"Falta la columna '{source}' en '{spec.name}' ({spec.path})")
+            positions[name] = header.index(source)
+        usecols = sorted(set(positions.values()))
+        start = 1
+        while True:
+            # loadtxt parsea en C y sólo guarda las columnas del esquema; los bloques se
+            # cortan por líneas (un campo entre comillas no puede partirse en dos líneas).
+            lines = [line for line in itertools.islice(fh, chunk_rows) if line.strip()]
+            if not lines:
+                return
+            try:
+                block = np.loadtxt(lines, dtype=str, delimiter=spec.delimiter, quotechar='"', comments=None,
+                                   usecols=usecols, ndmin=2)
+            except ValueError as exc:
+                raise MicrodataError(f"Bloque ilegible en '{spec.name}' (desde la fila {start} de {spec.path}): "
+                                     f"{exc}") from exc
+            start += len(lines)
+            yield {name: np.char.strip(block[:, usecols.index(idx)]) for name, idx in positions.items()}
+
+
+class _CategoryCodes:
+    def __init__(self):
+        self.codes = {}
+
+    def encode(self, raw, missing):
+        uniques, inverse = np.unique(raw, return_inverse=True)
+        lut = np.array([MISSING if value in missing else self.codes.setdefault(value, len(self.codes))
+                        for value in uniques.tolist()], dtype=np.int32)
+        return lut[inverse]
+
+    @property
+    def labels(self):
+        return tuple(self.codes)
+
+
+def _convert(spec, name, kind, raw, categories):
+    missing = np.isin(raw, spec.na_values)
+    if kind == "category":
+        return categories[name].encode(raw, set(spec.na_values))
+    if kind == "bool":
+        truthy = {variant for value in spec.true_values for variant in (value, value.lower(), value.upper(), value.title())}
+        out = np.isin(raw, list(truthy)).astype(np.int8)
+        out[missing] = MISSING
+        return out
+    try:
+        # float() por elemento es más rápido que astype sobre cadenas Unicode.
+        values = np.fromiter(map(float, np.where(missing, "nan", raw).tolist()), np.float64, len(raw))
+    except ValueError as exc:
+        raise MicrodataError(f"Valor inválido en '{spec.name}'.{name} ({spec.path}): {exc}") from exc
+    if kind == "float":
+        return values
+    out = np.full(len(values), MISSING, dtype=np.int64)
+    out[~missing] = values[~missing]
+    return out
+
+
+@traced("microdata.ingest")
+def ingest(spec, chunk_rows=CHUNK_ROWS):
+    """
+    Convierte el CSV de ``spec`` a la caché columnar (en un directorio temporal
+    que reemplaza al anterior al terminar) y devuelve su ``meta``.
+    """
+    if not os.path.exists(spec.path):
+        raise MicrodataError(f"No existe el archivo de la encuesta '{spec.name}': {spec.path}")
+    key = _source_key(spec)
+    schema = spec.schema()
+    tmp_dir = spec.cache_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    categories = {name: _CategoryCodes() for name, kind in schema.items() if kind == "category"}
+    files = {name: open(os.path.join(tmp_dir, f"{name}.bin"), "wb") for name in schema}
+    rows = 0
+    try:
+        for chunk in _read_chunks(spec, chunk_rows):
+            for name, kind in schema.items():
+                _convert(spec, name, kind, chunk[name], categories).astype(KINDS[kind], copy=False).tofile(files[name])
+            rows += len(next(iter(chunk.values())))
+    finally:
+        for fh in files.values():
+            fh.close()
+    meta = {"version": CACHE_VERSION, "key": key, "rows": rows, "weight": spec.weight,
+            "columns": {name: {"kind": kind, "dtype": np.dtype(KINDS[kind]).str,
+                               "categories": list(categories[name].labels) if name in categories else None}
+                        for name, kind in schema.items()}}
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, ensure_ascii=False)
+    shutil.rmtree(spec.cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, spec.cache_dir)
+    return meta
+
+
+def _cached_meta(spec):
+    try:
+        with open(os.path.join(spec.cache_dir, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION and meta.get("key") == _source_key(spec) else None
+
+
+def open_survey(spec, force=False):
+    """
+    ``SurveyTable`` de ``spec``: abre la caché si está al día o la reconstruye.
+    """
+    meta = None if force else _cached_meta(spec)
+    if meta is None:
+        meta = ingest(spec)
+    columns = {}
+    for name, info in meta["columns"].items():
+        path = os.path.join(spec.cache_dir, f"{name}.bin")
+        dtype = np.dtype(info["dtype"])
+        columns[name] = (np.memmap(path, dtype=dtype, mode="r", shape=(meta["rows"],)) if meta["rows"]
+                         else np.empty(0, dtype=dtype))
+    categories = {name: tuple(info["categories"]) for name, info in meta["columns"].items()
+                  if info["categories"] is not None}
+    kinds = {name: info["kind"] for name, info in meta["columns"].items()}
+    return SurveyTable(spec.name, columns, kinds, categories, meta["weight"])
+
+
+def get_survey(name):
+    """
+    Encuesta ``name`` (abierta una sola vez por proceso).
+    """
+    try:
+        return _LOADED[name]
+    except KeyError:
+        pass
+    if name not in _REGISTRY:
+        known = ", ".join(sorted(_REGISTRY)) or "(ninguna)"
+        raise KeyError(f"Encuesta desconocida: {name!r}. Disponibles: {known}")
+    with _LOCK:
+        if name not in _LOADED:
+            _LOADED[name] = open_survey(_REGISTRY[name])
+        return _LOADED[name]
+
+
+def clear():
+    with _LOCK:
+        _LOADED.clear()
+
+
+# ---------------------------
+# Consultas
+# ---------------------------
+
+@dataclass(frozen=True)
+class Bands:
+    """
+    Agrupa la columna numérica ``column`` en bandas ``[edges[i], edges[i + 1])``; la última queda abierta.
+    """
+    column: str
+    edges: Tuple[float, ...]
+    labels: Optional[Tuple[str, ...]] = None
+
+    def __post_init__(self):
+        if self.labels is not None and len(self.labels) != len(self.edges):
+            raise ValueError(f"{len(self.edges)} bordes requieren {len(self.edges)} etiquetas (la última banda es abierta)")
+
+    def names(self):
+        if self.labels is not None:
+            return tuple(self.labels)
+        edges = [f"{edge:g}" for edge in self.edges]
+        return tuple(f"{lo}-{hi}" for lo, hi in zip(edges, edges[1:])) + (f"{edges[-1]}+",)
+
+
+@dataclass(frozen=True)
+class GroupedShares:
+    by: Tuple[str, ...]
+    keys: Tuple[Tuple[str, ...], ...]   # una tupla de etiquetas por grupo (en el orden de ``by``)
+    values: np.ndarray                  # media ponderada (o %, con ``share``) por grupo
+    weight: np.ndarray                  # suma de factores por grupo (población expandida)
+    count: np.ndarray                   # filas de la muestra por grupo
+
+    def as_dict(self):
+        return {key if len(key) != 1 else key[0]: float(value) for key, value in zip(self.keys, self.values)}
+
+
+class SurveyTable:
+    """
+    Columnas de una encuesta (``np.memmap`` de la caché) con consultas ponderadas.
+    """
+
+    def __init__(self, name, columns, kinds, categories, weight):
+        self.name, self.columns, self.kinds, self.categories, self.weight = name, columns, kinds, categories, weight
+
+    def __len__(self):
+        return len(self.columns[self.weight])
+
+    def column(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise KeyError(f"La encuesta '{self.name}' no tiene la columna {name!r}") from None
+
+    def _group(self, by):
+        # (códigos 0..k-1 con -1 faltante, etiquetas) de una columna o de unas Bands.
+        if isinstance(by, Bands):
+            values = np.asarray(self.column(by.column), dtype=np.float64)
+            codes = np.digitize(values, by.edges) - 1
+            missing = ~np.isfinite(values)
+            if self.kinds[by.column] == "int":
+                missing |= values == MISSING
+            codes[missing] = MISSING
+            return codes, by.names()
+        kind = self.kinds.get(by)
+        column = self.column(by)
+        if kind == "category":
+            return column, self.categories[by]
+        if kind == "bool":
+            return column, ("no", "sí")
+        valid = column != MISSING if kind == "int" else np.isfinite(column)
+        uniques, inverse = np.unique(np.asarray(column)[valid], return_inverse=True)
+        codes = np.full(len(column), MISSING, dtype=np.int64)
+        codes[valid] = inverse
+        return codes, tuple(f"{value:g}" for value in uniques.tolist())
+
+    def _mask(self, where):
+        if where is None:
+            return None
+        if isinstance(where, str):
+            return np.asarray(self.column(where)) == 1
+        return np.asarray(where, dtype=bool)
+
+    @traced("microdata.query")
+    def weighted_mean(self, value, by=(), where=None):
+        """
+        Media de ``value`` ponderada por el factor, por grupo de ``by`` (columnas o ``Bands``).
+
+        ``where`` filtra filas: una columna ``bool`` (las verdaderas) o una máscara.
+        """
+        by = (by,) if isinstance(by, (str, Bands)) else tuple(by)
+        values = np.asarray(self.column(value))
+        weights = np.asarray(self.column(self.weight))
+        valid = np.isfinite(weights)
+        if self.kinds[value] == "float":
+            valid &= np.isfinite(values)
+        else:
+            valid &= values != MISSING
+        mask = self._mask(where)
+        if mask is not None:
+            valid &= mask
+        group = np.zeros(len(values), dtype=np.int64)
+        labels, size = [], 1
+        for item in by:
+            codes, names = self._group(item)
+            valid &= codes != MISSING
+            group = group * len(names) + np.where(codes == MISSING, 0, codes)
+            labels.append(names)
+            size *= len(names)
+        group, w, x = group[valid], weights[valid], values[valid].astype(np.float64)
+        total = np.bincount(group, weights=w, minlength=size)
+        weighted = np.bincount(group, weights=w * x, minlength=size)
+        count = np.bincount(group, minlength=size)
+        present = np.flatnonzero(count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = weighted[present] / total[present]
+        keys = tuple(itertools.product(*labels)) if by else ((),)
+        return GroupedShares(tuple(item.column if isinstance(item, Bands) else item for item in by),
+                             tuple(keys[i] for i in present), means, total[present], count[present])
+
+    def share(self, indicator, by=(), where=None):
+        """
+        % ponderado de filas con ``indicator`` verdadero (columna ``bool``), por grupo.
+        """
+        if self.kinds.get(indicator) != "bool":
+            raise MicrodataError(f"'{indicator}' no es una columna bool de '{self.name}'")
+        result = self.weighted_mean(indicator, by=by, where=where)
+        return GroupedShares(result.by, result.keys, result.values * 100, result.weight, result.count)
+
+
+def funnel(table, systems: Dict[str, Tuple[str, str]], by: Sequence = ()):
+    """
+    Embudo por sistema: ``{sistema: (conocimiento %, uso % entre quienes conocen)}``.
+
+    ``systems`` da, por sistema, las columnas ``bool`` de conocimiento y de uso.
+    Con ``by`` cada valor es un ``GroupedShares``; sin él, un número.
+    """
+    out = {}
+    for system, (aware, used) in systems.items():
+        awareness = table.share(aware, by=by)
+        use = table.share(used, by=by, where=aware)
+        out[system] = (awareness, use) if by else (float(awareness.values[0]), float(use.values[0]))
+    return out
+
+
+# ---------------------------
+# Encuestas
+# ---------------------------
+
+# ENIF 2024: extracto plano con una fila por adulto elegido (columnas armonizadas;
+# ``sources`` mapea a los nombres del cuestionario si se usa el archivo del INEGI tal cual)
+survey("enif_2024", "enif_2024.csv",
+       {"entidad": "category", "edad": "int", "sexo": "category", "conoce_codi": "bool", "usa_codi": "bool",
+        "conoce_dimo": "bool", "usa_dimo": "bool"},
+       weight="factor", description="ENIF 2024 (INEGI/CNBV), persona elegida")
+
+# Columnas de conocimiento y uso por sistema (embudo del Exhibit 1)
+ENIF_FUNNEL = {"CoDi": ("conoce_codi", "usa_codi"), "DiMo": ("conoce_dimo", "usa_dimo")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m toolkit.microdata",
+                                     description="Ingesta los microdatos de encuestas a la caché columnar.")
+    parser.add_argument("names", nargs="*", help="encuestas (todas por defecto)")
+    parser.add_argument("--force", action="store_true", help="re-ingesta aunque la caché esté al día")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    names = args.names or sorted(_REGISTRY)
+    unknown = [name for name in names if name not in _REGISTRY]
+    if unknown:
+        parser.error(f"Encuestas desconocidas: {', '.join(unknown)}. Disponibles: {', '.join(sorted(_REGISTRY))}")
+    status = 0
+    for name in names:
+        spec = _REGISTRY[name]
+        if not os.path.exists(spec.path):
+            sys.stdout.write(f"{name:<14} sin archivo ({os.path.relpath(spec.path, ANALYSIS_ROOT)})\n")
+            continue
+        start = time.perf_counter()
+        fresh = args.force or _cached_meta(spec) is None
+        try:
+            table = open_survey(spec, force=args.force)
+        except MicrodataError as exc:
+            sys.stdout.write(f"{name:<14} ERROR {exc}\n")
+            status = 1
+            continue
+        action = "ingesta" if fresh else "caché"
+        sys.stdout.write(f"{name:<14} {len(table):>10,} filas  {len(table.columns):>3} columnas  "
+                         f"{action} {time.perf_counter() - start:6.2f} s\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
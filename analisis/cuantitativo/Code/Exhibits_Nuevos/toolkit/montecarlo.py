@@ -0,0 +1,192 @@
+"""
+Monte Carlo vectorizado del caso de negocio a 5 años para México ("Tabla 4").
+
+En lugar de los puntos fijos de Exhibit_8.py (``savings_usd_bn``,
+``delta_gdp_pct``, ``new_users_m``), las series se derivan de distribuciones de
+parámetros:
+
+- adopción: curva logística ``techo / (1 + exp(-velocidad·(t - punto_medio)))``
+- ahorro anual (USD bn) = adopción × (volumen tarjeta × reducción de MDR
+  + volumen efectivo × (costo de manejo de efectivo − MDR Pix))
+- Δ PIB (p.p.) = traspaso al PIB × ahorro anual
+- nuevos usuarios (M) = techo de usuarios × adopción / techo de adopción
+
+La calibración sale de la Tabla 4 (``get_dataset("tabla4")``): ``calibrate``
+da, por métrica y año, el factor que lleva el escenario central (moda de cada
+parámetro) a la tabla, y ``simulate(..., calibration=...)`` lo aplica a cada
+escenario. Así el escenario central reproduce la Tabla 4 y las bandas se
+mueven con ella si se edita ``tabla4.csv``; los volúmenes de tarjeta y
+efectivo sólo fijan cuánto pesa cada parámetro en el ahorro. Las muestras se
+generan en lotes de tamaño fijo y los percentiles salen de histogramas
+acumulados por año, así que la memoria no depende del número de simulaciones.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+import numpy as np
+
+from toolkit.histograms import StreamingHistogram
+from toolkit.trace import traced
+
+YEARS = (1, 2, 3, 4, 5)
+METRICS = ("savings_usd_bn", "delta_gdp_pct", "new_users_m")
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_SEED = 2025
+
+PIX_MDR = 0.0022                # MDR del modelo Pix para el comercio
+# Pagos migrables con tarjeta y en efectivo: fijan la mezcla; la escala la da la Tabla 4 (calibrate)
+CARD_VOLUME_USD_BN = 250.0
+CASH_VOLUME_USD_BN = 463.0
+HIST_BINS = 8192
+
+
+@dataclass(frozen=True)
+class Triangular:
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng, size):
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+@dataclass(frozen=True)
+class Uniform:
+    low: float
+    high: float
+
+    def sample(self, rng, size):
+        return rng.uniform(self.low, self.high, size)
+
+
+DEFAULT_PARAMS = {
+    "adoption_ceiling": Triangular(0.22, 0.30, 0.38),    # fracción de pagos migrados en saturación
+    "adoption_speed": Triangular(0.8, 1.1, 1.4),         # pendiente logística (1/año)
+    "adoption_midpoint": Triangular(1.8, 2.2, 2.6),      # año del punto de inflexión
+    "mdr_reduction": Triangular(0.0148, 0.0228, 0.0338), # de 1.70–3.60% (tarjeta) a 0.22%
+    "cash_cost": Triangular(0.02, 0.035, 0.05),          # costos operativos del efectivo (2–5%)
+    "gdp_pass_through": Triangular(0.06, 0.08, 0.10),    # p.p. del PIB por USD bn ahorrado
+    "users_ceiling_m": Triangular(14.0, 19.0, 24.0),     # nuevos individuos en saturación (M)
+}
+
+
+@dataclass(frozen=True)
+class Calibration:
+    years: Tuple[int, ...]
+    factors: Dict[str, np.ndarray]    # métrica -> (n_años,) Tabla 4 / escenario central del modelo
+
+
+@dataclass
+class SimulationResult:
+    years: Tuple[int, ...]
+    n_draws: int
+    percentiles: Tuple[float, ...]
+    bands: Dict[str, np.ndarray] = field(default_factory=dict)   # métrica -> (n_percentiles, n_años)
+    mean: Dict[str, np.ndarray] = field(default_factory=dict)    # métrica -> (n_años,)
+
+    def band(self, metric, percentile):
+        return self.bands[metric][self.percentiles.index(percentile)]
+
+
+def project(params, years=YEARS):
+    """
+    Evalúa el modelo para arreglos de parámetros (broadcast) y devuelve
+    ``{métrica: arreglo (n, n_años)}``.
+    """
+    t = np.asarray(years, dtype=np.float64)[None, :]
+    ceiling = params["adoption_ceiling"][:, None]
+    curve = 1.0 / (1.0 + np.exp(-params["adoption_speed"][:, None] * (t - params["adoption_midpoint"][:, None])))
+    per_unit = (CARD_VOLUME_USD_BN * params["mdr_reduction"]
+                + CASH_VOLUME_USD_BN * (params["cash_cost"] - PIX_MDR))
+    savings = ceiling * curve * per_unit[:, None]
+    return {
+        "savings_usd_bn": savings,
+        "delta_gdp_pct": savings * params["gdp_pass_through"][:, None],
+        "new_users_m": params["users_ceiling_m"][:, None] * curve,
+    }
+
+
+def central_scenario(params=None, years=YEARS):
+    """
+    Series del escenario central (moda de cada parámetro).
+    """
+    params = DEFAULT_PARAMS if params is None else params
+    modes = {name: np.array([getattr(dist, "mode", (dist.low + dist.high) / 2)]) for name, dist in params.items()}
+    return {metric: values[0] for metric, values in project(modes, years).items()}
+
+
+def calibrate(table4, params=None):
+    """
+    ``Calibration`` que lleva el escenario central a ``table4`` (el dataset
+    ``tabla4``) en sus años, para cada métrica de ``METRICS``.
+    """
+    years = tuple(int(year) for year in table4.years)
+    central = central_scenario(params, years)
+    return Calibration(years, {metric: np.asarray(getattr(table4, metric), dtype=np.float64) / central[metric]
+                               for metric in METRICS})
+
+
+def _metric_bounds(params):
+    # Cotas exactas: la curva logística está en (0, 1) y el modelo es creciente en cada factor.
+    savings_max = params["adoption_ceiling"].high * (
+        CARD_VOLUME_USD_BN * params["mdr_reduction"].high
+        + CASH_VOLUME_USD_BN * (params["cash_cost"].high - PIX_MDR))
+    return {
+        "savings_usd_bn": savings_max,
+        "delta_gdp_pct": savings_max * params["gdp_pass_through"].high,
+        "new_users_m": params["users_ceiling_m"].high,
+    }
+
+
+@traced()
+def simulate(n_draws=1_000_000, params=None, years=YEARS, seed=DEFAULT_SEED,
+             chunk_size=500_000, percentiles=DEFAULT_PERCENTILES, bins=HIST_BINS, calibration=None):
+    """
+    Simula ``n_draws`` escenarios en lotes de ``chunk_size`` y devuelve bandas
+    de percentiles por año. Determinista para un mismo ``seed``/``chunk_size``.
+
+    Con ``calibration`` (``calibrate``) los años son los suyos y cada métrica
+    se escala por su factor de cada año.
+    """
+    params = DEFAULT_PARAMS if params is None else params
+    if calibration is not None:
+        years = calibration.years
+    factors = {metric: (calibration.factors[metric] if calibration is not None else np.ones(len(years)))
+               for metric in METRICS}
+    rng = np.random.default_rng(seed)
+    n_years = len(years)
+    bounds = {metric: bound * factors[metric].max() for metric, bound in _metric_bounds(params).items()}
+    hists = {metric: StreamingHistogram(0.0, bounds[metric], bins=bins, rows=n_years) for metric in METRICS}
+    sums = {metric: np.zeros(n_years) for metric in METRICS}
+
+    done = 0
+    while done < n_draws:
+        size = min(chunk_size, n_draws - done)
+        draws = {name: dist.sample(rng, size) for name, dist in params.items()}
+        for metric, values in project(draws, years).items():
+            values *= factors[metric]
+            sums[metric] += values.sum(axis=0)
+            hists[metric].add(values)
+        done += size
+
+    result = SimulationResult(tuple(years), n_draws, tuple(percentiles))
+    for metric in METRICS:
+        result.bands[metric] = hists[metric].quantiles(np.asarray(percentiles) / 100.0)
+        result.mean[metric] = sums[metric] / n_draws
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from toolkit.datasets import get_dataset
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    start = time.perf_counter()
+    res = simulate(n, calibration=calibrate(get_dataset("tabla4")))
+    print(f"{n:,} simulaciones en {time.perf_counter() - start:.2f} s")
+    for metric in METRICS:
+        print(metric)
+        for q, row in zip(res.percentiles, res.bands[metric]):
+            print(f"  p{q:<3}" + " ".join(f"{v:7.2f}" for v in row))
@@ -0,0 +1,45 @@
+"""
+Rutas compartidas por los exhibits (independientes del directorio de trabajo).
+"""
+import os
+
+# Code/Exhibits_Nuevos
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# analisis/cuantitativo
+ANALYSIS_ROOT = os.path.abspath(os.path.join(CODE_DIR, "..", ".."))
+REPO_ROOT = os.path.abspath(os.path.join(ANALYSIS_ROOT, "..", ".."))
+
+# Datasets de entrada (toolkit/datasets.py); EXHIBITS_DATA_DIR apunta a cifras alternativas
+DATA_DIR = os.environ.get("EXHIBITS_DATA_DIR") or os.path.join(ANALYSIS_ROOT, "Data")
+RESULTS_DIR = os.path.join(ANALYSIS_ROOT, "Results", "Nuevos")
+# Manifiesto de la caché incremental (llave por exhibit -> archivos producidos)
+MANIFEST_PATH = os.path.join(ANALYSIS_ROOT, "Results", ".build_manifest.json")
+# Parámetros de curvas de adopción ya ajustados (toolkit/adoption.py)
+FIT_CACHE_PATH = os.path.join(ANALYSIS_ROOT, "Results", ".adoption_fits.json")
+# Índice estático de exhibits para la CLI (toolkit/index.py)
+INDEX_PATH = os.path.join(ANALYSIS_ROOT, "Results", ".exhibit_index.json")
+# Vista previa del modo watch (toolkit/watch.py): <id>.png y latest.png
+PREVIEW_DIR = os.path.join(ANALYSIS_ROOT, "Results", ".preview")
+# Línea base de benchmarks de render (toolkit/bench.py); depende de la máquina
+BENCH_BASELINE_PATH = os.path.join(ANALYSIS_ROOT, "Results", ".bench_baseline.json")
+# Regresión visual (toolkit/visual.py): exhibits verificados e imágenes de diferencias
+VISUAL_MANIFEST_PATH = os.path.join(ANALYSIS_ROOT, "Results", ".visual_manifest.json")
+VISUAL_DIFF_DIR = os.path.join(ANALYSIS_ROOT, "Results", ".visual_diff")
+OUTPUT_DIR = os.path.join(REPO_ROOT, "output")
+# Copias para descarga inmediata (sólo si el directorio existe, p. ej. en el notebook)
+DOWNLOAD_DIR = "/mnt/data"
+
+
+def results_path(filename, results_dir=RESULTS_DIR):
+    """
+    Devuelve la ruta de ``filename`` dentro de ``results_dir``, creando el directorio si no existe.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    return os.path.join(results_dir, filename)
+
+
+def download_dirs():
+    """
+    Directorios de copias para descarga que existen en este entorno.
+    """
+    return [DOWNLOAD_DIR] if os.path.isdir(DOWNLOAD_DIR) else []
@@ -0,0 +1,295 @@
+"""
+Codificación PNG optimizada a partir del buffer RGBA del canvas Agg.
+
+``toolkit.export`` rasteriza cada figura una vez (``savefig(format="rgba")``,
+sin codificar) y entrega el arreglo a ``encode_rgba``, que corre en los hilos
+de codificación de la exportación, no en el del dibujo:
+
+1. si la figura es opaca (el fondo de siempre) se descarta el canal alfa;
+2. con 256 colores o menos, paleta exacta (sin pérdida);
+3. con más (antialiasing), paleta de 256 colores en la que el fondo y cada
+   color que cubre al menos ``EXACT_COVERAGE`` de la imagen (hasta
+   ``EXACT_COLORS``) entran exactos; el resto de la paleta sale por
+   cobertura máxima del histograma de los demás colores (una muestra de
+   ``PALETTE_SAMPLE`` píxeles con sus proporciones), y cada color que no es
+   exacto toma el más cercano. Los píxeles de los colores dominantes quedan
+   idénticos; sólo los bordes suavizados pueden moverse, y se acepta si no
+   más de ``QUANT_MAX_FRACTION`` de los píxeles se alejan más de
+   ``QUANT_TOLERANCE`` niveles en algún canal. Si no (o con más de
+   ``HISTOGRAM_COLORS`` colores, como un mapa de calor), queda en RGB sin
+   pérdida;
+4. zlib con el nivel del perfil (``RenderProfile.png_level``). Sobre una
+   paleta, el 6 tarda lo mismo que matplotlib (RGBA, 6), cuantización
+   incluida, y deja menos de la mitad de los bytes; el 9 ahorra otro ~15 %
+   por unos 150 ms más por figura de imprenta, así que sólo lo usa ``print``.
+
+Los gráficos planos del deck tienen pocos cientos de colores, así que casi
+todos quedan en paleta. El PNG conserva los metadatos de matplotlib
+(``Software`` y la resolución).
+
+    python -m toolkit.pngopt [ids...]
+
+renderiza los exhibits en memoria y compara, por exhibit, los bytes y el
+tiempo de codificación contra la codificación por defecto de matplotlib
+(RGBA, zlib 6) del mismo buffer.
+"""
+import argparse
+import io
+import sys
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from toolkit.trace import traced
+
+COMPRESS_LEVEL = 6
+QUANT_COLORS = 256
+HISTOGRAM_COLORS = 1 << 16   # con más colores que esto, queda en RGB
+PALETTE_SAMPLE = 1 << 16     # píxeles de la muestra con la que se elige la paleta
+QUANT_TOLERANCE = 8          # niveles por canal (0-255)
+QUANT_MAX_FRACTION = 1e-4    # fracción de píxeles que puede superar la tolerancia
+EXACT_COVERAGE = 1e-3        # colores con al menos esta fracción de los píxeles: exactos en la paleta
+EXACT_COLORS = 128           # con más colores exactos que esto, queda en RGB
+
+_STATS = None   # [PngStats] mientras hay un measure() activo
+_COMPARE = False
+_STATS_LOCK = threading.Lock()
+
+
+@dataclass
+class PngStats:
+    name: str
+    mode: str                  # "paleta exacta", "paleta", "rgb" o "rgba"
+    nbytes: int
+    seconds: float
+    default_nbytes: int = 0    # codificación por defecto de matplotlib (sólo con compare)
+    default_seconds: float = 0.0
+
+
+def _software():
+    import matplotlib
+
+    return f"Matplotlib version{matplotlib.__version__}, https://matplotlib.org/"
+
+
+def _keys(rgb):
+    # Color (..., 3) uint8 -> entero 0xBBGGRR, el mismo que da ``_image_keys`` para sus píxeles.
+    rgb = rgb.astype(np.uint32)
+    return rgb[..., 0] | rgb[..., 1] << 8 | rgb[..., 2] << 16
+
+
+def _image_keys(image):
+    # Píxeles de ``image`` (RGB) como 0xBBGGRR: RGBX leído como uint32 little-endian, sin el cuarto byte.
+    return np.asarray(image.convert("RGBX")).view("<u4")[..., 0] & 0xFFFFFF
+
+
+def _histogram_sample(counts, rgb):
+    # Imagen de ~PALETTE_SAMPLE píxeles con los colores ``rgb`` en las proporciones de ``counts``.
+    from PIL import Image
+
+    repeats = np.ceil(counts / counts.sum() * PALETTE_SAMPLE).astype(np.intp)
+    return Image.fromarray(np.repeat(rgb, repeats, axis=0)[np.newaxis])
+
+
+def _nearest(rgb, palette, chunk=4096):
+    # Índice del color de ``palette`` más cercano (distancia euclidiana) a cada fila de ``rgb``.
+    palette = palette.astype(np.int32)
+    index = np.empty(len(rgb), dtype=np.intp)
+    for start in range(0, len(rgb), chunk):
+        block = rgb[start:start + chunk].astype(np.int32)
+        index[start:start + chunk] = ((block[:, np.newaxis] - palette) ** 2).sum(axis=2).argmin(axis=1)
+    return index
+
+
+def _paletted(image, palette, keys, index):
+    """
+    ``image`` en modo P con ``palette``: el píxel de color ``keys[i]`` toma el
+    índice ``index[i]``. La asignación es por tabla (0xRRGGBB -> índice), no
+    con ``Image.quantize(palette=...)``, cuyo caché agrupa colores a 6 bits
+    por canal y confunde, por ejemplo, el blanco con (252, 252, 252).
+    """
+    from PIL import Image
+
+    table = np.zeros(1 << 24, dtype=np.uint8)
+    table[keys] = index
+    paletted = Image.frombytes("P", image.size, table[_image_keys(image)].tobytes())
+    paletted.putpalette(palette.astype(np.uint8).ravel().tolist())
+    return paletted
+
+
+def quantize(image):
+    """
+    ``(imagen, modo)``: ``image`` (RGB) con paleta si es exacta o casi, o tal cual.
+    """
+    from PIL import Image
+
+    colors = image.getcolors(HISTOGRAM_COLORS)
+    if colors is None:
+        return image, "rgb"
+    counts = np.array([count for count, _ in colors], dtype=np.int64)
+    rgb = np.array([color for _, color in colors], dtype=np.uint8)
+    keys = _keys(rgb)
+    if len(colors) <= QUANT_COLORS:
+        return _paletted(image, rgb, keys, np.arange(len(colors))), "paleta exacta"
+
+    # Los colores que cubren al menos EXACT_COVERAGE de la imagen (siempre el fondo) entran tal cual.
+    order = np.argsort(counts, kind="stable")[::-1]
+    exact = order[:max(1, int(np.count_nonzero(counts >= EXACT_COVERAGE * counts.sum())))]
+    if len(exact) > EXACT_COLORS:
+        return image, "rgb"
+    rest = order[len(exact):]
+    sample = _histogram_sample(counts[rest], rgb[rest])
+    reduced = sample.quantize(QUANT_COLORS - len(exact), method=Image.Quantize.MAXCOVERAGE,
+                              dither=Image.Dither.NONE)
+    used = np.unique(np.asarray(reduced))
+    extra = np.asarray(reduced.getpalette(), dtype=np.uint8).reshape(-1, 3)[used]
+    palette = np.concatenate([rgb[exact], extra])
+
+    index = np.empty(len(rgb), dtype=np.intp)
+    index[exact] = np.arange(len(exact))
+    index[rest] = _nearest(rgb[rest], palette)
+    error = np.abs(palette[index].astype(np.int16) - rgb).max(axis=1)
+    if error[exact].any() or counts[error > QUANT_TOLERANCE].sum() > QUANT_MAX_FRACTION * counts.sum():
+        return image, "rgb"
+    return _paletted(image, palette, keys, index), "paleta"
+
+
+@traced("export.encode_png")
+def encode_rgba(rgba, dpi, name="", level=COMPRESS_LEVEL):
+    """
+    PNG (bytes) del arreglo ``rgba`` (alto × ancho × 4, uint8). Registra un
+    ``PngStats`` si hay un ``measure()`` activo.
+    """
+    from PIL import Image, PngImagePlugin
+
+    start = time.perf_counter()
+    image = Image.frombuffer("RGBA", (rgba.shape[1], rgba.shape[0]), rgba, "raw", "RGBA", 0, 1)
+    if image.getchannel("A").getextrema()[0] == 255:
+        image, mode = quantize(image.convert("RGB"))
+    else:
+        mode = "rgba"
+    info = PngImagePlugin.PngInfo()
+    info.add_text("Software", _software())
+    buffer = io.BytesIO()
+    image.save(buffer, format="png", pnginfo=info, dpi=(dpi, dpi), compress_level=level)
+    data = buffer.getvalue()
+    stats = _STATS
+    if stats is not None:
+        entry = PngStats(name, mode, len(data), time.perf_counter() - start)
+        if _COMPARE:
+            entry.default_nbytes, entry.default_seconds = _default_encoding(rgba, dpi)
+        with _STATS_LOCK:
+            stats.append(entry)
+    return data
+
+
+def _default_encoding(rgba, dpi):
+    # Lo mismo que hace savefig(format="png"): imsave con Pillow, RGBA y el nivel por defecto.
+    import matplotlib.image
+
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    matplotlib.image.imsave(buffer, rgba, format="png", origin="upper", dpi=dpi)
+    return len(buffer.getvalue()), time.perf_counter() - start
+
+
+@contextmanager
+def measure(compare=False):
+    """
+    Dentro del bloque cada PNG codificado deja su ``PngStats`` en la lista que
+    entrega; con ``compare`` también codifica el mismo buffer como matplotlib.
+    """
+    global _STATS, _COMPARE
+    previous, _STATS = (_STATS, _COMPARE), []
+    _COMPARE = compare
+    try:
+        yield _STATS
+    finally:
+        _STATS, _COMPARE = previous
+
+
+# ---------------------------
+# Reporte de ahorro
+# ---------------------------
+
+@dataclass
+class ExhibitSavings:
+    exhibit_id: str
+    files: List[PngStats] = field(default_factory=list)
+    error: str = ""
+
+    def total(self, attr):
+        return sum(getattr(stats, attr) for stats in self.files)
+
+
+def measure_exhibit(exhibit_id):
+    """
+    Renderiza ``exhibit_id`` en memoria y mide cada PNG contra la codificación por defecto.
+    """
+    from toolkit import export
+    from toolkit.figures import figure_scope
+    from toolkit.registry import get_exhibit
+
+    spec = get_exhibit(exhibit_id)
+    result = ExhibitSavings(exhibit_id)
+    try:
+        with figure_scope(), measure(compare=True) as stats, export.capture(), redirect_stdout(io.StringIO()):
+            spec.builder()
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.files = list(stats)
+    return result
+
+
+def print_savings(results, stream=sys.stdout):
+    stream.write(f"{'exhibit':<12} {'PNG':>3} {'defecto KB':>10} {'optim. KB':>10} {'ahorro':>7} "
+                 f"{'defecto s':>9} {'optim. s':>8}  modos\n")
+    totals = [0, 0, 0.0, 0.0]
+    for result in results:
+        if result.error:
+            stream.write(f"{result.exhibit_id:<12} ERROR {result.error}\n")
+            continue
+        if not result.files:
+            continue
+        default, optimized = result.total("default_nbytes"), result.total("nbytes")
+        default_s, optimized_s = result.total("default_seconds"), result.total("seconds")
+        modes = ", ".join(sorted({stats.mode for stats in result.files}))
+        stream.write(f"{result.exhibit_id:<12} {len(result.files):>3} {default / 1024:10.1f} {optimized / 1024:10.1f} "
+                     f"{1 - optimized / default:7.0%} {default_s:9.2f} {optimized_s:8.2f}  {modes}\n")
+        for i, value in enumerate((default, optimized, default_s, optimized_s)):
+            totals[i] += value
+    if totals[0]:
+        stream.write(f"{'total':<12} {'':>3} {totals[0] / 1024:10.1f} {totals[1] / 1024:10.1f} "
+                     f"{1 - totals[1] / totals[0]:7.0%} {totals[2]:9.2f} {totals[3]:8.2f}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m toolkit.pngopt",
+                                     description="Ahorro en bytes y tiempo de la codificación PNG optimizada.")
+    parser.add_argument("ids", nargs="*", help="ids de exhibit (todos por defecto)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from toolkit.index import load_index
+    index = load_index()
+    try:
+        ids = [index.get(exhibit_id).exhibit_id for exhibit_id in args.ids] or [e.exhibit_id for e in index.entries]
+    except KeyError as exc:
+        parser.error(exc.args[0])
+
+    from toolkit.cli import prepare_rendering
+    from toolkit.profiles import set_profile
+    set_profile("print")
+    prepare_rendering()
+    # Con ``-m`` este archivo es ``__main__``: measure() tiene que activarse en el
+    # ``toolkit.pngopt`` que importa ``toolkit.export``.
+    from toolkit import pngopt
+    pngopt.print_savings([pngopt.measure_exhibit(exhibit_id) for exhibit_id in ids])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Perfiles de render: ``draft``, ``web``, ``print`` y ``thumb``.
+
+El perfil activo sale de ``EXHIBITS_PROFILE`` (``print`` por defecto). Los
+workers ``spawn`` del runner lo heredan, y ``set_profile`` o ``--profile`` en
+``toolkit.cli build`` lo fijan.
+
+- ``print``: 300 dpi, todos los formatos, copias en ``/mnt/data``; las rutas
+  de siempre. Su PNG se comprime con zlib 9 (los demás, 6): son los archivos
+  versionados y los que van a las diapositivas.
+- ``web``: 150 dpi, todos los formatos, en el subdirectorio ``web/``.
+- ``draft``: 100 dpi, sólo PNG y sin copias, en ``draft/``. Es para iterar
+  sobre la posición de callouts y etiquetas.
+- ``thumb``: 40 dpi, sólo PNG y sin copias, en ``thumb/``: miniaturas para
+  índices web (unos 480 px de ancho para una figura de 12 pulgadas). Es uno de
+  los medios de ``toolkit.variants``.
+
+La geometría no depende del perfil. La caja ajustada se calcula siempre a
+``LAYOUT_DPI`` y el perfil sólo cambia la resolución del raster, así que un
+borrador es la versión de imprenta escalada (mismo recorte, mismas
+posiciones relativas). Los perfiles distintos de ``print`` escriben en su
+propio subdirectorio y tienen su propia entrada en la caché incremental, para
+no pisar las salidas definitivas.
+"""
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+PROFILE_ENV = "EXHIBITS_PROFILE"
+DEFAULT_PROFILE = "print"
+LAYOUT_DPI = 300   # resolución de referencia de la geometría (la de imprenta)
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    name: str
+    dpi: int
+    formats: Optional[Tuple[str, ...]] = None   # None: los que pida el exhibit
+    copies: bool = True                          # copias para descarga (/mnt/data)
+    subdir: str = ""                             # "" = directorio definitivo
+    png_level: int = 6                           # zlib del PNG (toolkit.pngopt)
+
+    @property
+    def scale(self):
+        return self.dpi / LAYOUT_DPI
+
+
+PROFILES = {
+    "draft": RenderProfile("draft", 100, formats=("png",), copies=False, subdir="draft"),
+    "web": RenderProfile("web", 150, subdir="web"),
+    "print": RenderProfile("print", LAYOUT_DPI, png_level=9),
+    "thumb": RenderProfile("thumb", 40, formats=("png",), copies=False, subdir="thumb"),
+}
+
+
+def get_profile(name):
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Perfil de render desconocido: {name!r}. Disponibles: {', '.join(PROFILES)}") from None
+
+
+def active_profile():
+    return get_profile(os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE)
+
+
+def set_profile(name):
+    """
+    Activa el perfil ``name`` en este proceso y en los workers que arranque.
+    """
+    get_profile(name)
+    os.environ[PROFILE_ENV] = name
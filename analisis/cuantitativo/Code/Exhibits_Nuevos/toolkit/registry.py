@@ -0,0 +1,120 @@
+"""
+Registro de exhibits.
+
+Cada script ``Exhibit_*.py`` (y ``Exhibits_prototype.py``) declara una función
+por exhibit con el decorador ``@exhibit``. ``load_exhibits`` importa los scripts
+por ruta para poblar el registro; los builders devuelven la lista de archivos
+que escribieron. ``inputs`` declara los archivos de datos que lee el exhibit
+(forman parte de su llave en ``toolkit.cache``).
+"""
+import importlib.util
+import inspect
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from toolkit.index import exhibit_scripts, natural_key
+from toolkit.paths import CODE_DIR
+
+
+@dataclass(frozen=True)
+class ExhibitSpec:
+    exhibit_id: str
+    title: str
+    script: str
+    builder: Callable[[], List[str]]
+    inputs: Tuple[str, ...] = ()
+
+
+_REGISTRY: Dict[str, ExhibitSpec] = {}
+_LOADED_DIRS = set()
+
+
+def exhibit(exhibit_id, title, inputs=()):
+    """
+    Decorador que registra ``func`` como el builder del exhibit ``exhibit_id``.
+    """
+    inputs = tuple(os.path.abspath(path) for path in inputs)
+
+    def decorator(func):
+        script = os.path.abspath(inspect.getsourcefile(func))
+        previous = _REGISTRY.get(exhibit_id)
+        if previous is not None and previous.script != script:
+            raise ValueError(f"Exhibit '{exhibit_id}' ya está registrado en {previous.script}")
+        _REGISTRY[exhibit_id] = ExhibitSpec(exhibit_id, title, script, func, inputs)
+        return func
+    return decorator
+
+
+def _module_name(path):
+    # "Exhibit_5.1.py" -> "Exhibit_5_1"; así `import Exhibits_prototype` reutiliza el mismo módulo.
+    return re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+
+
+def load_exhibits(code_dir=CODE_DIR):
+    """
+    Importa (una sola vez por proceso) todos los scripts de exhibits de ``code_dir``.
+    """
+    code_dir = os.path.abspath(code_dir)
+    if code_dir in _LOADED_DIRS:
+        return
+    if code_dir not in sys.path:
+        sys.path.insert(0, code_dir)
+    for path in exhibit_scripts(code_dir):
+        name = _module_name(path)
+        if name in sys.modules:
+            continue
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    _LOADED_DIRS.add(code_dir)
+
+
+def reload_script(path):
+    """
+    Vuelve a ejecutar el script ``path`` (p. ej. tras editarlo) y reemplaza sus
+    exhibits en el registro. Si el script falla se conserva la versión anterior.
+    Devuelve los ids que registra ahora.
+    """
+    path = os.path.abspath(path)
+    name = _module_name(path)
+    previous_specs = {key: spec for key, spec in _REGISTRY.items() if spec.script == path}
+    previous_module = sys.modules.get(name)
+    for key in previous_specs:
+        del _REGISTRY[key]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        for key in [key for key, item in _REGISTRY.items() if item.script == path]:
+            del _REGISTRY[key]
+        _REGISTRY.update(previous_specs)
+        if previous_module is not None:
+            sys.modules[name] = previous_module
+        else:
+            del sys.modules[name]
+        raise
+    return [key for key, item in _REGISTRY.items() if item.script == path]
+
+
+def all_exhibits():
+    load_exhibits()
+    return sorted(_REGISTRY.values(), key=lambda spec: natural_key(spec.exhibit_id))
+
+
+def get_exhibit(exhibit_id):
+    load_exhibits()
+    try:
+        return _REGISTRY[exhibit_id]
+    except KeyError:
+        known = ", ".join(spec.exhibit_id for spec in all_exhibits())
+        raise KeyError(f"Exhibit desconocido '{exhibit_id}'. Disponibles: {known}") from None
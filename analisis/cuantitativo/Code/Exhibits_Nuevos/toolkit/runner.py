@@ -0,0 +1,177 @@
+"""
+Construcción paralela del deck: cada exhibit registrado se renderiza en un
+proceso del pool (uno por núcleo disponible), de modo que una reconstrucción
+completa tarda aproximadamente lo que el exhibit más lento. Los exhibits cuya
+llave en ``toolkit.cache`` no cambió se omiten. Los datasets de entrada
+(``toolkit.datasets``) se leen una sola vez en el proceso principal y se
+entregan ya construidos a los workers. Con ``--trace`` (``toolkit.trace``) cada
+exhibit es un span y sus eventos vuelven de los workers al proceso principal.
+
+Uso:  python -m toolkit.runner [ids...] [--force] [--jobs N] [--profile draft|web|print] [--trace traza.json]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from toolkit import datasets, export, trace
+from toolkit.cache import BuildCache, exhibit_key
+from toolkit.figures import figure_scope
+from toolkit.profiles import PROFILES, set_profile
+from toolkit.registry import all_exhibits, get_exhibit, load_exhibits
+
+
+@dataclass
+class BuildResult:
+    exhibit_id: str
+    ok: bool
+    seconds: float
+    outputs: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    cached: bool = False
+    peak_rss_mb: Optional[float] = None     # pico sobre el RSS de entrada (PeakMemory.peak_mb)
+    trace_events: List[dict] = field(default_factory=list)
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def in_pool_worker():
+    """
+    ``True`` dentro de un worker de otro pool (runner, variants, serve...): ahí no se abren pools anidados.
+    """
+    # Los workers de ProcessPoolExecutor no son daemon desde Python 3.9; todos tienen proceso padre.
+    return multiprocessing.parent_process() is not None or multiprocessing.current_process().daemon
+
+
+def _init_worker(preloaded=None):
+    import matplotlib
+    matplotlib.use("Agg")
+    if preloaded:
+        datasets.preload(preloaded)
+
+
+def build_one(exhibit_id):
+    """
+    Ejecuta el builder de un exhibit y captura éxito/error, tiempo y pico de
+    memoria; las figuras del exhibit se liberan al terminar.
+    """
+    spec = get_exhibit(exhibit_id)
+    start = time.perf_counter()
+    outputs, error = [], None
+    with figure_scope() as memory, trace.span(f"exhibit {exhibit_id}", exhibit=exhibit_id, title=spec.title):
+        try:
+            outputs = list(spec.builder() or [])
+            export.flush()   # PNG que aún se codifican en segundo plano
+        except Exception:
+            error = traceback.format_exc()
+    return BuildResult(exhibit_id, error is None, time.perf_counter() - start, outputs, error,
+                       peak_rss_mb=memory.peak_mb, trace_events=trace.collect() if trace.enabled() else [])
+
+
+def _build_in_pool(exhibit_ids, max_workers):
+    workers = min(max_workers or available_cores(), len(exhibit_ids))
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    preloaded = datasets.load_all()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(preloaded,)) as pool:
+        submitted = {}
+        for exhibit_id in exhibit_ids:
+            submitted[pool.submit(build_one, exhibit_id)] = (exhibit_id, time.perf_counter())
+        for future in as_completed(submitted):
+            exhibit_id, start = submitted[future]
+            try:
+                results[exhibit_id] = future.result()
+                trace.add_events(results[exhibit_id].trace_events)
+            except Exception:
+                # El worker murió (p. ej. BrokenProcessPool): se registra como fallo.
+                results[exhibit_id] = BuildResult(exhibit_id, False, time.perf_counter() - start,
+                                                  error=traceback.format_exc())
+    return results
+
+
+def run_exhibits(exhibit_ids=None, max_workers=None, force=False, cache=None):
+    """
+    Renderiza ``exhibit_ids`` (todos por defecto) en un pool de procesos.
+
+    Los exhibits vigentes según la caché se devuelven como ``cached=True`` sin
+    renderizarse, salvo con ``force=True``. Devuelve un ``BuildResult`` por
+    exhibit, en el orden solicitado.
+    """
+    load_exhibits()
+    if exhibit_ids is None:
+        exhibit_ids = [spec.exhibit_id for spec in all_exhibits()]
+    if not exhibit_ids:
+        return []
+    with trace.span("cache.keys", cat="runner"):
+        keys = {exhibit_id: exhibit_key(get_exhibit(exhibit_id)) for exhibit_id in exhibit_ids}
+
+    cache = BuildCache() if cache is None else cache
+    results = {}
+    stale = []
+    for exhibit_id in exhibit_ids:
+        if not force and cache.is_fresh(exhibit_id, keys[exhibit_id]):
+            results[exhibit_id] = BuildResult(exhibit_id, True, 0.0, cache.outputs(exhibit_id), cached=True)
+        else:
+            stale.append(exhibit_id)
+
+    if stale:
+        with trace.span("pool", cat="runner", exhibits=len(stale)):
+            results.update(_build_in_pool(stale, max_workers))
+        for exhibit_id in stale:
+            result = results[exhibit_id]
+            if result.ok:
+                cache.record(exhibit_id, keys[exhibit_id], result.outputs)
+            else:
+                cache.forget(exhibit_id)
+        cache.save()
+    return [results[exhibit_id] for exhibit_id in exhibit_ids]
+
+
+def print_summary(results, wall_seconds, stream=sys.stdout):
+    for result in results:
+        status = "CACHE" if result.cached else "OK   " if result.ok else "ERROR"
+        memory = f"+{result.peak_rss_mb:7.1f} MB" if result.peak_rss_mb is not None else ""
+        stream.write(f"{status} {result.exhibit_id:<10} {result.seconds:7.2f} s {memory}\n")
+        if result.error:
+            stream.write(result.error + "\n")
+    failed = sum(not result.ok for result in results)
+    cached = sum(result.cached for result in results)
+    total = sum(result.seconds for result in results)
+    stream.write(f"{len(results)} exhibits, {cached} en caché, {failed} con error — "
+                 f"{wall_seconds:.2f} s de reloj ({total:.2f} s sumando exhibits)\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye los exhibits registrados en paralelo.")
+    parser.add_argument("ids", nargs="*", help="ids de exhibit (todos por defecto)")
+    parser.add_argument("--force", action="store_true", help="ignora la caché y re-renderiza todo")
+    parser.add_argument("--jobs", type=int, default=None, help="procesos del pool (núcleos disponibles)")
+    parser.add_argument("--profile", choices=PROFILES, help="perfil de render (EXHIBITS_PROFILE o print)")
+    parser.add_argument("--trace", metavar="RUTA", help="escribe una traza Chrome trace-event del build")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        set_profile(args.profile)
+    if args.trace:
+        trace.enable(args.trace)
+    start = time.perf_counter()
+    results = run_exhibits(args.ids or None, max_workers=args.jobs, force=args.force)
+    print_summary(results, time.perf_counter() - start)
+    if args.trace:
+        sys.stdout.write(f"Traza escrita en {trace.write_trace()}\n")
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
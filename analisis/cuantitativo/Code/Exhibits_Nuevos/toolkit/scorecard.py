@@ -0,0 +1,136 @@
+"""
+Scorecards (pilares × sistemas de pago) dibujados con colecciones, sin ``plt.table``.
+
+    card = draw_scorecard(ax, pilares, ["Brasil (Pix)", "México (CoDi/DiMo)"],
+                          [["green", "yellow"], ...], SEMAFORO, row_header="Pilar")
+    scorecard_legend(ax, SEMAFORO, loc="lower center", ncol=3)
+
+La tabla vive en coordenadas de datos de ``ax``: cada columna de estado mide
+1 de ancho, la de etiquetas ``label_width``, y cada fila 1 de alto (la fila 0
+es el encabezado; el eje y va hacia abajo). Así:
+
+- la rejilla es una sola ``LineCollection`` y el fondo del encabezado un
+  ``Rectangle``;
+- los marcadores de estado son un ``scatter`` por forma de marcador (colores
+  por punto), no un parche por celda con su propio transform;
+- sólo las etiquetas de filas y columnas son textos sueltos.
+
+El número de artistas crece con filas + columnas, no con celdas, así que una
+tarjeta de 30 × 15 se dibuja en un tiempo parecido a la de 5 × 2.
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from matplotlib.patches import Rectangle
+from matplotlib.text import Text
+
+
+@dataclass(frozen=True)
+class StatusStyle:
+    label: str
+    color: str
+    marker: str = "o"
+    edgecolor: str = "black"
+
+
+# Semáforo de cumplimiento de los scorecards del deck
+SEMAFORO = {
+    "green": StatusStyle("Cumplido", "#28A745"),
+    "yellow": StatusStyle("Parcial", "#FFD700"),
+    "red": StatusStyle("No cumplido", "#DC3545"),
+}
+
+
+@dataclass
+class Scorecard:
+    grid: LineCollection
+    header: Rectangle
+    markers: List
+    texts: List[Text]
+    n_rows: int
+    n_cols: int
+    label_width: float
+
+    def cell_center(self, row, col):
+        """
+        Centro (datos) de la celda de estado ``(row, col)``, contando desde 0 sin el encabezado.
+        """
+        return self.label_width + col + 0.5, row + 1.5
+
+
+def _marker_size(ax, n_rows, width, scale):
+    # Diámetro en puntos: ``scale`` del lado menor de una celda de estado con el tamaño actual de ejes.
+    bbox = ax.get_position()
+    fig_w, fig_h = ax.figure.get_size_inches()
+    cell_w = bbox.width * fig_w * 72 / width
+    cell_h = bbox.height * fig_h * 72 / (n_rows + 1)
+    return scale * min(cell_w, cell_h)
+
+
+def draw_scorecard(ax, rows, columns, status, styles: Dict[str, StatusStyle], row_header="",
+                   label_width=2.0, fontsize=11, marker_scale=0.4, header_color="#F0F0F0",
+                   grid_color="lightgray", grid_linewidth=0.8, label_pad=0.08):
+    """
+    Dibuja en ``ax`` la tarjeta ``rows`` × ``columns``. ``status[i][j]`` es la
+    llave de ``styles`` de la celda (``None`` o ``""``: celda vacía).
+    """
+    status = np.asarray(status, dtype=object)
+    n_rows, n_cols = len(rows), len(columns)
+    if status.shape != (n_rows, n_cols):
+        raise ValueError(f"status debe ser {n_rows} × {n_cols}; es {' × '.join(map(str, status.shape))}")
+    unknown = {key for key in status.ravel() if key} - set(styles)
+    if unknown:
+        raise KeyError(f"Estados sin estilo: {', '.join(sorted(map(str, unknown)))}")
+
+    width = label_width + n_cols
+    height = n_rows + 1
+    ax.set_xlim(0, width)
+    ax.set_ylim(height, 0)
+    ax.axis("off")
+
+    header = Rectangle((0, 0), width, 1, facecolor=header_color, edgecolor="none", zorder=0)
+    ax.add_patch(header)
+
+    xs = np.concatenate(([0.0], label_width + np.arange(n_cols + 1)))
+    ys = np.arange(height + 1, dtype=float)
+    segments = [((0, y), (width, y)) for y in ys] + [((x, 0), (x, height)) for x in xs]
+    grid = LineCollection(segments, colors=grid_color, linewidths=grid_linewidth, zorder=1)
+    ax.add_collection(grid, autolim=False)
+
+    texts = [ax.text(label_pad, 0.5, row_header, ha="left", va="center", fontsize=fontsize, weight="bold")]
+    texts += [ax.text(label_width + j + 0.5, 0.5, name, ha="center", va="center", fontsize=fontsize,
+                      weight="bold") for j, name in enumerate(columns)]
+    texts += [ax.text(label_pad, i + 1.5, name, ha="left", va="center", fontsize=fontsize)
+              for i, name in enumerate(rows)]
+
+    size = _marker_size(ax, n_rows, width, marker_scale) ** 2
+    by_marker = {}
+    for key, style in styles.items():
+        by_marker.setdefault(style.marker, []).append((key, style))
+    markers = []
+    for marker, group in by_marker.items():
+        points, faces, edges = [], [], []
+        for key, style in group:
+            row_idx, col_idx = np.nonzero(status == key)
+            points.append(np.column_stack((label_width + col_idx + 0.5, row_idx + 1.5)))
+            faces += [style.color] * len(row_idx)
+            edges += [style.edgecolor] * len(row_idx)
+        points = np.concatenate(points)
+        if len(points):
+            markers.append(ax.scatter(points[:, 0], points[:, 1], s=size, marker=marker, c=faces,
+                                      edgecolors=edges, linewidths=0.6, zorder=2, clip_on=False))
+    return Scorecard(grid, header, markers, texts, n_rows, n_cols, label_width)
+
+
+def scorecard_legend(ax, styles: Dict[str, StatusStyle], markersize=12, **kwargs):
+    """
+    Leyenda con un marcador por estilo (sin agregar puntos vacíos a los ejes).
+    """
+    handles = [Line2D([], [], linestyle="none", marker=style.marker, markersize=markersize,
+                      markerfacecolor=style.color, markeredgecolor=style.edgecolor, markeredgewidth=0.6,
+                      label=style.label) for style in styles.values()]
+    kwargs.setdefault("frameon", False)
+    return ax.legend(handles=handles, **kwargs)
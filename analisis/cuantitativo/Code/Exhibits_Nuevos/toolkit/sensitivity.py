@@ -0,0 +1,207 @@
+"""
+Barridos de sensibilidad sobre una malla cartesiana completa de parámetros.
+
+El modelo es una función NumPy de arreglos que se transmiten (broadcast) entre
+sí; ``sweep`` lo evalúa por rebanadas del primer eje —nunca se materializa la
+malla completa— y reduce cada rebanada en el acto a:
+
+- conteo, suma, mínimo y máximo (con los parámetros donde ocurren);
+- medias marginales para cada par de ejes (base de los mapas de calor).
+
+Las mallas grandes se reparten por bloques del primer eje entre procesos
+(``spawn``, como ``toolkit.runner``); el modelo debe ser una función de nivel
+de módulo para poder enviarse a los workers. ``tornado`` hace el análisis
+uno-a-la-vez alrededor de un caso base.
+
+El caso PYME de Exhibit_3.py/Exhibits_prototype.py es ``pyme_annual_savings``.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from toolkit.trace import traced
+
+SLAB_ELEMENTS = 4_000_000          # elementos por rebanada (≈ 32 MB en float64)
+SHARD_MIN_ELEMENTS = 50_000_000    # por debajo de esto no compensa arrancar procesos
+
+
+def pyme_annual_savings(ventas_mensuales, tasa_alta, tasa_baja):
+    """
+    Ahorro anual (MXN) al migrar de ``tasa_alta`` a ``tasa_baja`` (fracciones).
+    El factor de tasas (chico) se calcula antes de multiplicar por las ventas.
+    """
+    return ((tasa_alta - tasa_baja) * 12.0) * ventas_mensuales
+
+
+@dataclass
+class SweepResult:
+    names: Tuple[str, ...]
+    axes: Dict[str, np.ndarray]
+    count: int = 0
+    total: float = 0.0
+    min: float = np.inf
+    max: float = -np.inf
+    argmin: Dict[str, float] = field(default_factory=dict)
+    argmax: Dict[str, float] = field(default_factory=dict)
+    pair_sums: Dict[Tuple[str, str], np.ndarray] = field(default_factory=dict)
+
+    @property
+    def mean(self):
+        return self.total / self.count
+
+    def marginal_mean(self, x, y):
+        """
+        Media del modelo sobre los demás ejes: arreglo ``(len(y), len(x))`` (listo para ``imshow``).
+        """
+        i, j = self.names.index(x), self.names.index(y)
+        sums = self.pair_sums[(self.names[min(i, j)], self.names[max(i, j)])]
+        rest = self.count // (len(self.axes[x]) * len(self.axes[y]))
+        grid = sums / rest
+        return grid.T if i < j else grid
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        if other.min < self.min:
+            self.min, self.argmin = other.min, other.argmin
+        if other.max > self.max:
+            self.max, self.argmax = other.max, other.argmax
+        for pair, sums in other.pair_sums.items():
+            if pair in self.pair_sums:
+                self.pair_sums[pair] += sums
+            else:
+                self.pair_sums[pair] = sums.copy()
+
+
+def _open_grids(axes, names, rows):
+    # Ejes como arreglos abiertos (ix_) para una rebanada del primer eje.
+    arrays = [axes[names[0]][rows]] + [axes[name] for name in names[1:]]
+    return np.ix_(*arrays)
+
+
+def _sweep_range(model, names, axes, start, stop, slab_elements=SLAB_ELEMENTS):
+    shape = [len(axes[name]) for name in names]
+    result = SweepResult(names, axes)
+    pairs = list(combinations(range(len(names)), 2))
+    for a, b in pairs:
+        rows = (stop - start) if a == 0 else shape[a]
+        result.pair_sums[(names[a], names[b])] = np.zeros((rows, shape[b]))
+    inner = int(np.prod(shape[1:], dtype=np.int64))
+    step = max(1, slab_elements // max(inner, 1))
+
+    for lo in range(start, stop, step):
+        hi = min(lo + step, stop)
+        values = np.broadcast_to(model(*_open_grids(axes, names, slice(lo, hi))), [hi - lo] + shape[1:])
+        result.count += values.size
+        result.total += float(values.sum())
+        for target, reduce, pick in (("min", np.argmin, "argmin"), ("max", np.argmax, "argmax")):
+            flat = int(reduce(values))
+            value = float(values.flat[flat])
+            if (value < result.min) if target == "min" else (value > result.max):
+                setattr(result, target, value)
+                index = np.unravel_index(flat, values.shape)
+                setattr(result, pick, {name: float(axes[name][idx + (lo if k == 0 else 0)])
+                                       for k, (name, idx) in enumerate(zip(names, index))})
+        for a, b in pairs:
+            others = tuple(k for k in range(len(names)) if k not in (a, b))
+            partial = values.sum(axis=others) if others else values
+            if a == 0:
+                result.pair_sums[(names[a], names[b])][lo - start:hi - start] += partial
+            else:
+                result.pair_sums[(names[a], names[b])] += partial
+    return result
+
+
+def _shard(model, names, axes, start, stop):
+    return start, _sweep_range(model, names, axes, start, stop)
+
+
+@traced()
+def sweep(model, axes, workers=1, slab_elements=SLAB_ELEMENTS):
+    """
+    Evalúa ``model`` sobre el producto cartesiano de ``axes`` (``{nombre:
+    valores 1-D}``); los ejes se pasan como argumentos posicionales, en orden.
+
+    ``workers > 1`` reparte el primer eje entre procesos cuando la malla
+    supera ``SHARD_MIN_ELEMENTS``; ``workers=None`` usa un proceso por núcleo,
+    salvo dentro de un worker de otro pool (p. ej. el del runner), donde
+    corre en el proceso actual para no multiplicar procesos por núcleo.
+    """
+    names = tuple(axes)
+    axes = {name: np.asarray(values, dtype=np.float64) for name, values in axes.items()}
+    n_first = len(axes[names[0]])
+    size = int(np.prod([len(v) for v in axes.values()], dtype=np.int64))
+    if workers is None:
+        from toolkit.runner import available_cores, in_pool_worker
+        workers = 1 if in_pool_worker() else available_cores()
+    workers = min(workers, n_first)
+    if workers <= 1 or size < SHARD_MIN_ELEMENTS:
+        return _sweep_range(model, names, axes, 0, n_first, slab_elements)
+
+    bounds = np.linspace(0, n_first, workers + 1).astype(int)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(_shard, model, names, axes, int(lo), int(hi))
+                   for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+        shards = sorted((future.result() for future in futures), key=lambda item: item[0])
+
+    result = SweepResult(names, axes)
+    for _, shard in shards:
+        # Los bloques del primer eje se concatenan en orden; el resto se suma.
+        first = {pair: shard.pair_sums.pop(pair) for pair in list(shard.pair_sums) if pair[0] == names[0]}
+        result.merge(shard)
+        for pair, sums in first.items():
+            prev = result.pair_sums.get(pair)
+            result.pair_sums[pair] = sums if prev is None else np.concatenate([prev, sums])
+    return result
+
+
+@dataclass
+class TornadoBar:
+    name: str
+    low: float          # valor del parámetro en el extremo bajo
+    high: float
+    output_low: float   # resultado del modelo con el parámetro en ``low``
+    output_high: float
+
+    @property
+    def swing(self):
+        return abs(self.output_high - self.output_low)
+
+
+def tornado(model, base, ranges) -> Tuple[float, List[TornadoBar]]:
+    """
+    Sensibilidad uno-a-la-vez: cada parámetro de ``ranges`` (``{nombre: (bajo, alto)}``)
+    se mueve a sus extremos con los demás en ``base``. Devuelve el resultado
+    base y las barras ordenadas de mayor a menor oscilación.
+    """
+    names = list(base)
+    base_output = float(model(**base))
+    # Todas las evaluaciones en un solo llamado vectorizado: 2 filas por parámetro.
+    columns = {name: np.full(2 * len(ranges), float(base[name])) for name in names}
+    for i, (name, (low, high)) in enumerate(ranges.items()):
+        columns[name][2 * i:2 * i + 2] = (low, high)
+    outputs = np.broadcast_to(model(**columns), (2 * len(ranges),))
+    bars = [TornadoBar(name, low, high, float(outputs[2 * i]), float(outputs[2 * i + 1]))
+            for i, (name, (low, high)) in enumerate(ranges.items())]
+    return base_output, sorted(bars, key=lambda bar: bar.swing, reverse=True)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    grid = {
+        "ventas_mensuales": np.geomspace(20_000, 2_000_000, 1000),
+        "tasa_alta": np.linspace(0.017, 0.036, 1000),
+        "tasa_baja": np.linspace(0.001, 0.005, 100),
+    }
+    start = time.perf_counter()
+    res = sweep(pyme_annual_savings, grid, workers=workers)
+    print(f"{res.count:,} puntos en {time.perf_counter() - start:.2f} s con {workers} proceso(s)")
+    print(f"  media {res.mean:,.0f}  mín {res.min:,.0f} en {res.argmin}  máx {res.max:,.0f}")
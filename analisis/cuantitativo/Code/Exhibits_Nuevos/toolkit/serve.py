@@ -0,0 +1,360 @@
+"""
+Servicio HTTP local que renderiza exhibits bajo pedido, sin pasar por disco.
+
+    python -m toolkit.serve [--port 8765] [--jobs N] [--cache-mb 256]
+
+    GET /exhibits                           ids y títulos registrados (JSON)
+    GET /exhibits/<id>.<png|svg>            la salida del exhibit en ese formato
+        ?profile=draft|web|print|thumb      perfil de render (``print`` por defecto)
+        ?figure=<nombre>                    para exhibits con varias figuras (la primera por defecto)
+    GET /metrics                            aciertos, fallos, desalojos y bytes del caché (JSON)
+
+Los builders corren en un pool ``spawn`` (el del runner, con los datasets
+precargados) dentro de ``export.capture()``: cada render devuelve los bytes de
+todas sus salidas y ninguna toca el disco. Los bytes codificados quedan en un
+LRU en memoria acotado en bytes, con llave (exhibit, perfil, marcas de sus
+archivos de ``inputs``, archivo), así que editar un CSV de datos deja de
+acertar sin reiniciar el servicio. Pedidos simultáneos de un exhibit que falta
+esperan el mismo render.
+
+Cada respuesta lleva ``ETag`` (hash del contenido) y ``Cache-Control:
+no-cache``; un ``If-None-Match`` que coincide recibe 304 sin cuerpo. Las
+respuestas llevan ``Access-Control-Allow-Origin: *`` para el prototipo de
+``src/``. El código de los exhibits es el que estaba al arrancar: tras
+editarlo hay que reiniciar el servicio (o usar ``toolkit.watch``).
+"""
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from toolkit.profiles import DEFAULT_PROFILE, PROFILES, get_profile, set_profile
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_MB = 256
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+_SEEN_STAMPS = {}   # en cada worker: marcas de entrada con las que renderizó cada exhibit
+
+
+@dataclass(frozen=True)
+class Encoded:
+    data: bytes
+    etag: str
+    content_type: str
+
+    @classmethod
+    def of(cls, name, data):
+        fmt = os.path.splitext(name)[1][1:]
+        etag = '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+        return cls(data, etag, CONTENT_TYPES.get(fmt, "application/octet-stream"))
+
+
+class LRUCache:
+    """
+    LRU acotado por la suma de bytes de sus valores, seguro entre hilos.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def record_miss(self):
+        # Pedido que ni siquiera tiene listado: cuenta como fallo sin consultar llaves.
+        with self._lock:
+            self.misses += 1
+
+    def put(self, key, value):
+        size = len(value.data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= len(previous.data)
+            self.entries[key] = value
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.nbytes -= len(evicted.data)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self.entries), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": round(self.hits / lookups, 4) if lookups else None}
+
+
+def input_stamps(paths):
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stamps.append((path, None))
+            continue
+        stamps.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def render_exhibit(exhibit_id, profile_name, stamps=(), preloaded=None):
+    """
+    Renderiza ``exhibit_id`` con el perfil ``profile_name`` en memoria y devuelve
+    ``[(nombre de archivo, bytes), ...]`` en el orden en que se exportaron.
+
+    ``preloaded`` son las marcas de las entradas cuando se precargó el pool:
+    en el primer render de este worker se comparan contra ellas. Sin ellas
+    no se sabe con qué datos quedó el worker y se vuelven a leer.
+    """
+    from toolkit import datasets, microdata
+    from toolkit.export import capture
+    from toolkit.figures import figure_scope
+    from toolkit.registry import get_exhibit
+
+    if _SEEN_STAMPS.get(exhibit_id, preloaded) != stamps:
+        # Cambió un archivo de datos (CSV o microdatos) desde que este worker lo leyó.
+        datasets.clear()
+        microdata.clear()
+    _SEEN_STAMPS[exhibit_id] = stamps
+    set_profile(profile_name)
+    spec = get_exhibit(exhibit_id)
+    with figure_scope(), capture() as outputs, redirect_stdout(io.StringIO()):
+        spec.builder()
+    return [(os.path.basename(path), data) for path, data in outputs.items()]
+
+
+def _missing_figure(exhibit_id, wanted, profile_name, names):
+    return (f"El exhibit {exhibit_id!r} no produce {wanted!r} con el perfil {profile_name!r}. "
+            f"Salidas: {', '.join(names) or '(ninguna)'}")
+
+
+class RenderService:
+    """
+    Resuelve pedidos (exhibit, perfil, figura, formato) contra el LRU y, si
+    faltan, los renderiza en el pool.
+    """
+
+    def __init__(self, max_workers=None, cache_bytes=DEFAULT_CACHE_MB << 20, default_profile=DEFAULT_PROFILE):
+        from toolkit import datasets
+        from toolkit.registry import all_exhibits
+        from toolkit.runner import _init_worker, available_cores
+
+        self.specs = {spec.exhibit_id: spec for spec in all_exhibits()}
+        self.cache = LRUCache(cache_bytes)
+        self.default_profile = get_profile(default_profile).name
+        self.listings = {}    # (id, perfil, marcas) -> nombres de archivo del último render
+        self.inflight = {}    # (id, perfil, marcas) -> Future del render en curso
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.render_errors = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        # Marcas antes de precargar: si un archivo cambia en medio, el primer render lo vuelve a leer.
+        self.preloaded_stamps = {exhibit_id: input_stamps(spec.inputs) for exhibit_id, spec in self.specs.items()}
+        ctx = multiprocessing.get_context("spawn")
+        self.pool = ProcessPoolExecutor(max_workers=max_workers or available_cores(), mp_context=ctx,
+                                        initializer=_init_worker, initargs=(datasets.load_all(),))
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def _select(self, names, figure, fmt):
+        suffix = f".{fmt}"
+        if figure:
+            wanted = figure if figure.endswith(suffix) else figure + suffix
+            return wanted if wanted in names else None
+        return next((name for name in names if name.endswith(suffix)), None)
+
+    def _render(self, render_key):
+        exhibit_id, profile_name, stamps = render_key
+        with self._lock:
+            future = self.inflight.get(render_key)
+            if future is None:
+                future = self.pool.submit(render_exhibit, exhibit_id, profile_name, stamps,
+                                          self.preloaded_stamps.get(exhibit_id))
+                self.inflight[render_key] = future
+                owner = True
+            else:
+                owner = False
+        start = time.perf_counter()
+        try:
+            files = future.result()
+        except Exception:
+            if owner:
+                with self._lock:
+                    self.inflight.pop(render_key, None)
+                    self.render_errors += 1
+            raise
+        if owner:
+            for name, data in files:
+                self.cache.put(render_key + (name,), Encoded.of(name, data))
+            with self._lock:
+                self.listings[render_key] = [name for name, _ in files]
+                self.inflight.pop(render_key, None)
+                self.renders += 1
+                self.render_seconds += time.perf_counter() - start
+        return dict(files)
+
+    def lookup(self, exhibit_id, fmt, profile_name=None, figure=None):
+        """
+        ``Encoded`` de la salida pedida; ``KeyError`` si el exhibit, el perfil o la figura no existen.
+        """
+        spec = self.specs.get(exhibit_id)
+        if spec is None:
+            raise KeyError(f"Exhibit desconocido {exhibit_id!r}")
+        if fmt not in CONTENT_TYPES:
+            raise KeyError(f"Formato no soportado {fmt!r}: {', '.join(CONTENT_TYPES)}")
+        profile_name = get_profile(profile_name or self.default_profile).name
+        render_key = (exhibit_id, profile_name, input_stamps(spec.inputs))
+        names = self.listings.get(render_key)
+        if names is not None:
+            name = self._select(names, figure, fmt)
+            if name is None:
+                raise KeyError(_missing_figure(exhibit_id, figure or fmt, profile_name, names))
+            encoded = self.cache.get(render_key + (name,))
+            if encoded is not None:
+                return encoded
+        else:
+            self.cache.record_miss()
+        files = self._render(render_key)
+        name = self._select(list(files), figure, fmt)
+        if name is None:
+            raise KeyError(_missing_figure(exhibit_id, figure or fmt, profile_name, list(files)))
+        encoded = self.cache.get(render_key + (name,))
+        if encoded is None:
+            # Más grande que todo el caché (o ya desalojado): se sirve sin guardarlo.
+            encoded = Encoded.of(name, files[name])
+        return encoded
+
+    def metrics(self):
+        with self._lock:
+            service = {"renders": self.renders, "render_errors": self.render_errors,
+                       "render_seconds": round(self.render_seconds, 3), "not_modified": self.not_modified,
+                       "inflight": len(self.inflight)}
+        return {"cache": self.cache.stats(), "service": service}
+
+
+class ExhibitHandler(BaseHTTPRequestHandler):
+    server_version = "ExhibitsNuevos/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=b"", content_type="application/json; charset=utf-8", headers=()):
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in headers:
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, payload, status=HTTPStatus.OK):
+        self._send(status, json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = unquote(url.path).rstrip("/")
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if path == "/metrics":
+            return self._send_json(self.service.metrics())
+        if path == "/exhibits":
+            return self._send_json([{"id": spec.exhibit_id, "title": spec.title}
+                                    for spec in self.service.specs.values()])
+        if not path.startswith("/exhibits/"):
+            return self._send_json({"error": "ruta desconocida"}, HTTPStatus.NOT_FOUND)
+        exhibit_id, _, fmt = path[len("/exhibits/"):].rpartition(".")
+        try:
+            encoded = self.service.lookup(exhibit_id, fmt, query.get("profile"),
+                                          query.get("figure"))
+        except (KeyError, ValueError) as exc:
+            return self._send_json({"error": exc.args[0]}, HTTPStatus.NOT_FOUND)
+        except Exception as exc:
+            return self._send_json({"error": f"falló el render: {exc}"}, HTTPStatus.INTERNAL_SERVER_ERROR)
+        headers = (("ETag", encoded.etag), ("Cache-Control", "no-cache"))
+        if encoded.etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            with self.service._lock:
+                self.service.not_modified += 1
+            return self._send(HTTPStatus.NOT_MODIFIED, headers=headers)
+        self._send(HTTPStatus.OK, encoded.data, encoded.content_type, headers)
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, max_workers=None, cache_bytes=DEFAULT_CACHE_MB << 20,
+                default_profile=DEFAULT_PROFILE, quiet=False):
+    server = ThreadingHTTPServer((host, port), ExhibitHandler)
+    server.daemon_threads = True
+    server.service = RenderService(max_workers, cache_bytes, default_profile)
+    server.quiet = quiet
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m toolkit.serve",
+                                     description="Renderiza exhibits bajo pedido por HTTP (PNG/SVG en memoria).")
+    parser.add_argument("--host", default="127.0.0.1", help="interfaz (127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"puerto ({DEFAULT_PORT})")
+    parser.add_argument("--jobs", type=int, default=None, help="procesos de render (núcleos disponibles)")
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_MB,
+                        help=f"tope del caché en memoria, en MB ({DEFAULT_CACHE_MB})")
+    parser.add_argument("--profile", choices=PROFILES, default=DEFAULT_PROFILE,
+                        help="perfil cuando el pedido no trae ?profile= (print)")
+    parser.add_argument("--quiet", action="store_true", help="sin una línea de log por pedido")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from toolkit.cli import prepare_rendering
+    prepare_rendering()
+    server = make_server(args.host, args.port, args.jobs, int(args.cache_mb * (1 << 20)), args.profile, args.quiet)
+    sys.stdout.write(f"Sirviendo {len(server.service.specs)} exhibits en http://{args.host}:{server.server_port}/ "
+                     f"(GET /exhibits, /exhibits/<id>.png, /metrics)\n")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
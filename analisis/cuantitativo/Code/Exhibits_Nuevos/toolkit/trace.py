@@ -0,0 +1,244 @@
+"""
+Spans de perfilado con salida Chrome trace-event (``chrome://tracing``, Perfetto).
+
+    with span("datos", exhibit="5.1"):
+        ...
+
+    @traced("montecarlo.simulate")
+    def simulate(...): ...
+
+Desactivado (por defecto), ``span`` devuelve un contexto nulo compartido y
+``traced`` sólo evalúa un booleano antes de llamar a la función; no se instala
+ningún gancho en matplotlib. Activado con ``EXHIBITS_TRACE=<archivo.json>``
+(o ``enable(ruta)``, p. ej. ``--trace`` en ``toolkit.cli build``), cada span
+registra inicio, duración, proceso/hilo y la variación de RSS. Además se
+envuelven los puntos costosos de matplotlib: ``annotate`` y el dibujo de cada
+anotación (flechas con ``connectionstyle``), ``Axes.table`` y su dibujo,
+``tight_layout``, el rasterizado Agg y ``savefig`` por formato.
+
+La variable de entorno la heredan los workers ``spawn`` de ``toolkit.runner``.
+Cada worker devuelve sus eventos con el ``BuildResult`` y el proceso principal
+los une a los suyos (``add_events``). El archivo se escribe al salir del
+proceso que activó el trazado. Las marcas de tiempo usan el reloj monótono del
+sistema, común a todos los procesos, así que los workers aparecen alineados
+en la línea de tiempo.
+"""
+import atexit
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+TRACE_ENV = "EXHIBITS_TRACE"
+
+_PATH = os.environ.get(TRACE_ENV) or None
+_ENABLED = _PATH is not None
+_EVENTS = []
+_LOCK = threading.Lock()
+_NULL = nullcontext()
+_HOOKS_INSTALLED = False
+_WRITER_REGISTERED = False
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def enabled():
+    return _ENABLED
+
+
+def _now_us():
+    return time.perf_counter_ns() / 1000
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@contextmanager
+def _record(name, cat, args):
+    start, rss = _now_us(), _rss_bytes()
+    try:
+        yield
+    finally:
+        end, rss_end = _now_us(), _rss_bytes()
+        if rss is not None and rss_end is not None:
+            args["rss_delta_mb"] = round((rss_end - rss) / 2**20, 3)
+        event = {"name": name, "cat": cat, "ph": "X", "ts": start, "dur": end - start,
+                 "pid": os.getpid(), "tid": threading.get_native_id(), "args": args}
+        with _LOCK:
+            _EVENTS.append(event)
+
+
+def span(name, cat="exhibit", **args):
+    """
+    Contexto que registra ``name`` como span (sin efecto si el trazado está apagado).
+    """
+    if not _ENABLED:
+        return _NULL
+    return _record(name, cat, args)
+
+
+def traced(name=None, cat="toolkit"):
+    """
+    Decorador: cada llamada a la función es un span ``name`` (por defecto ``módulo.función``).
+    """
+    def decorator(func):
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            with _record(label, cat, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def collect():
+    """
+    Devuelve y vacía los eventos registrados en este proceso.
+    """
+    with _LOCK:
+        events = list(_EVENTS)
+        _EVENTS.clear()
+    return events
+
+
+def add_events(events):
+    with _LOCK:
+        _EVENTS.extend(events)
+
+
+# ---------------------------
+# Ganchos sobre matplotlib
+# ---------------------------
+def savefig_format(args, kwargs):
+    """
+    Formato de un ``Figure.savefig(fname, ...)`` a partir de ``format`` o la extensión.
+    """
+    import matplotlib
+
+    fmt = kwargs.get("format")
+    if fmt is None and len(args) > 1 and isinstance(args[1], (str, os.PathLike)):
+        fmt = os.path.splitext(os.fspath(args[1]))[1].lstrip(".")
+    return (fmt or matplotlib.rcParams["savefig.format"]).lower()
+
+
+def patch(targets, make_wrapper):
+    """
+    Sustituye ``owner.name`` por ``make_wrapper(original, label)`` para cada
+    ``(owner, name, label)``; devuelve los originales para ``unpatch``.
+    """
+    originals = [(owner, name, vars(owner)[name]) for owner, name, _ in targets]
+    for (owner, name, label), (_, _, original) in zip(targets, originals):
+        setattr(owner, name, make_wrapper(original, label))
+    return originals
+
+
+def unpatch(originals):
+    for owner, name, original in originals:
+        setattr(owner, name, original)
+
+
+@contextmanager
+def patched(targets, make_wrapper):
+    originals = patch(targets, make_wrapper)
+    try:
+        yield
+    finally:
+        unpatch(originals)
+
+
+def _span_wrapper(func, label):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        name = label(args, kwargs) if callable(label) else label
+        with _record(name, "matplotlib", {}):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def matplotlib_targets():
+    from matplotlib.axes import Axes
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.table import Table
+    from matplotlib.text import Annotation
+
+    return [
+        (Axes, "annotate", "annotate"),
+        (Annotation, "draw", "annotation.draw"),
+        (Axes, "table", "table"),
+        (Table, "draw", "table.draw"),
+        (Figure, "tight_layout", "tight_layout"),
+        (FigureCanvasAgg, "draw", "draw (Agg)"),
+        (Figure, "savefig", lambda args, kwargs: f"savefig {savefig_format(args, kwargs)}"),
+    ]
+
+
+def install_matplotlib_hooks():
+    """
+    Envuelve en spans los puntos costosos de matplotlib, una vez por proceso y sólo si el trazado está activo.
+    """
+    global _HOOKS_INSTALLED
+    if not _ENABLED or _HOOKS_INSTALLED:
+        return
+    patch(matplotlib_targets(), _span_wrapper)
+    _HOOKS_INSTALLED = True
+
+
+# ---------------------------
+# Salida
+# ---------------------------
+def chrome_trace(events):
+    """
+    Documento trace-event con nombres de proceso (principal / worker) para el visor.
+    """
+    main_pid = os.getpid()
+    metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                 "args": {"name": "principal" if pid == main_pid else f"worker {pid}"}}
+                for pid in sorted({event["pid"] for event in events})]
+    return {"traceEvents": metadata + sorted(events, key=lambda event: event["ts"]), "displayTimeUnit": "ms"}
+
+
+def write_trace(path=None):
+    """
+    Escribe los eventos acumulados en ``path`` (por defecto el de ``EXHIBITS_TRACE``).
+    """
+    path = path or _PATH
+    events = collect()
+    if not path or not events:
+        return None
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(chrome_trace(events), fh)
+    return path
+
+
+def enable(path):
+    """
+    Activa el trazado en este proceso y en los workers que arranque; el archivo se escribe al salir.
+    """
+    global _PATH, _ENABLED
+    _PATH, _ENABLED = os.path.abspath(path), True
+    os.environ[TRACE_ENV] = _PATH
+    _register_writer()
+
+
+def _register_writer():
+    # Sólo el proceso que inicia el trazado escribe; los workers devuelven sus eventos.
+    global _WRITER_REGISTERED
+    if multiprocessing.parent_process() is None and not _WRITER_REGISTERED:
+        atexit.register(write_trace)
+        _WRITER_REGISTERED = True
+
+
+if _ENABLED:
+    _register_writer()
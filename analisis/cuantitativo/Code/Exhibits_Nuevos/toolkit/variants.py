@@ -0,0 +1,183 @@
+"""
+Variantes de un exhibit (idioma × tamaño × medio) a partir de una sola definición.
+
+    SPEC = VariantSpec("embudo", "Exhibit1_Embudo", prepare=_prepare, draw=_draw,
+                       figsize=(12, 7), texts={"title": {"es": "...", "en": "..."}})
+
+    @exhibit("1", "...")
+    def build_exhibit_1():
+        return render_variants(SPEC, [SPEC.base])
+
+    @exhibit("1-variantes", "...")
+    def build_exhibit_1_variantes():
+        return render_variants(SPEC, variant_matrix(("es", "en"), ("report", "slide"), ("web", "thumb")))
+
+- ``prepare()`` corre una sola vez (en el proceso que pide las variantes) y su
+  resultado, que debe poder serializarse con pickle, se comparte con todas.
+- ``draw(data, t, figsize)`` construye y devuelve la figura. ``t("clave",
+  **fmt)`` da el texto en el idioma de la variante (con el del primer idioma
+  de ``texts`` como respaldo).
+- Tamaños (``SIZES``): ``report`` es el ``figsize`` del exhibit, ``slide`` es
+  16:9 para diapositivas y ``square`` es cuadrado, para redes o móvil.
+- Medios: los perfiles de render de ``toolkit.profiles`` (``print``, ``web``,
+  ``thumb``...). El medio sólo cambia la resolución y los formatos, así que
+  cada figura (idioma, tamaño) se construye una vez y se exporta a todos sus
+  medios.
+
+Las figuras se reparten en un pool ``spawn`` (el del runner, con los datasets
+precargados). Cada worker recibe un bloque contiguo de la lista ordenada por
+idioma, así que reutiliza la caché de layout de texto de matplotlib
+(cadena, fuente, dpi) y la de fuentes entre los tamaños de un mismo idioma.
+Con un solo núcleo, o dentro de un worker de otro pool (``runner.in_pool_worker``),
+todo se renderiza en el proceso actual.
+
+Nombres de archivo: la variante base (primer idioma, ``report``) conserva el
+nombre del exhibit; las demás agregan ``_<idioma>_<tamaño>``. El subdirectorio
+es el del perfil (``web/``, ``thumb/``...).
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Callable, Dict, Tuple
+
+from toolkit.profiles import active_profile, get_profile
+
+SIZES = {
+    "report": None,            # figsize propio del exhibit
+    "slide": (13.333, 7.5),    # 16:9
+    "square": (8.0, 8.0),
+}
+
+_SPECS: Dict[str, "VariantSpec"] = {}
+
+
+@dataclass(frozen=True)
+class Variant:
+    locale: str
+    size: str = "report"
+    medium: str = "print"
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    name: str
+    filename_base: str
+    prepare: Callable[[], object]
+    draw: Callable
+    figsize: Tuple[float, float]
+    texts: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    formats: Tuple[str, ...] = ("png", "svg")
+
+    def __post_init__(self):
+        # Los workers encuentran la definición por nombre al importar el script del exhibit.
+        _SPECS[self.name] = self
+
+    @property
+    def locales(self):
+        return tuple(dict.fromkeys(locale for texts in self.texts.values() for locale in texts)) or ("es",)
+
+    @property
+    def base(self):
+        # Con el perfil activo, así ``build --profile draft`` sigue valiendo para el exhibit original.
+        return Variant(self.locales[0], "report", active_profile().name)
+
+    def figsize_for(self, size):
+        try:
+            return SIZES[size] or self.figsize
+        except KeyError:
+            raise ValueError(f"Tamaño de variante desconocido: {size!r}. Disponibles: {', '.join(SIZES)}") from None
+
+    def filename_for(self, locale, size):
+        if (locale, size) == (self.base.locale, self.base.size):
+            return self.filename_base
+        return f"{self.filename_base}_{locale}_{size}"
+
+
+class Translator:
+    """
+    ``t("clave", **fmt)``: texto de ``texts[clave]`` en ``locale`` (o en el idioma de respaldo).
+    """
+
+    def __init__(self, texts, locale, fallback):
+        self.texts, self.locale, self.fallback = texts, locale, fallback
+
+    def __call__(self, key, **fmt):
+        options = self.texts[key]
+        text = options.get(self.locale, options.get(self.fallback))
+        if text is None:
+            raise KeyError(f"Sin texto para {key!r} en {self.locale!r} ni en {self.fallback!r}")
+        return text.format(**fmt) if fmt else text
+
+
+def variant_matrix(locales, sizes=("report",), media=("print",)):
+    return [Variant(locale, size, medium) for locale, size, medium in product(locales, sizes, media)]
+
+
+def get_variant_spec(name):
+    from toolkit.registry import load_exhibits
+
+    load_exhibits()
+    return _SPECS[name]
+
+
+def _render_figures(name, data, jobs):
+    """
+    Construye cada figura ``(idioma, tamaño)`` de ``jobs`` y la exporta a sus medios.
+    """
+    from toolkit.export import export_figure, flush
+    from toolkit.figures import figure_scope
+
+    spec = get_variant_spec(name)
+    written = []
+    for locale, size, media in jobs:
+        with figure_scope():
+            fig = spec.draw(data, Translator(spec.texts, locale, spec.locales[0]), spec.figsize_for(size))
+            for medium in media:
+                profile = get_profile(medium)
+                written += export_figure(fig, spec.filename_for(locale, size), formats=spec.formats, profile=profile)
+    flush()
+    return written
+
+
+def _chunks(items, n):
+    size, extra = divmod(len(items), n)
+    start = 0
+    for i in range(n):
+        end = start + size + (i < extra)
+        yield items[start:end]
+        start = end
+
+
+def render_variants(spec, variants, max_workers=None):
+    """
+    Renderiza ``variants`` de ``spec`` y devuelve las rutas escritas.
+
+    Los datos se preparan una vez; cada par (idioma, tamaño) es una figura,
+    exportada a todos los medios pedidos para él.
+    """
+    from toolkit import datasets
+    from toolkit.runner import _init_worker, available_cores, in_pool_worker
+
+    data = spec.prepare()
+    figures: Dict[Tuple[str, str], list] = {}
+    for variant in variants:
+        spec.figsize_for(variant.size)
+        get_profile(variant.medium)
+        media = figures.setdefault((variant.locale, variant.size), [])
+        if variant.medium not in media:
+            media.append(variant.medium)
+    jobs = sorted(((locale, size, tuple(media)) for (locale, size), media in figures.items()),
+                  key=lambda job: (spec.locales.index(job[0]) if job[0] in spec.locales else len(spec.locales), job[1]))
+
+    workers = min(max_workers or available_cores(), len(jobs))
+    if workers <= 1 or in_pool_worker():
+        return _render_figures(spec.name, data, jobs)
+    ctx = multiprocessing.get_context("spawn")
+    written = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(datasets.load_all(),)) as pool:
+        futures = [pool.submit(_render_figures, spec.name, data, chunk) for chunk in _chunks(jobs, workers)]
+        for future in futures:
+            written += future.result()
+    return written
@@ -0,0 +1,352 @@
+"""
+Regresión visual: las salidas de cada exhibit contra las que ya están en disco.
+
+La línea base de cada archivo es la versión guardada en su ruta de salida
+(``Results/Nuevos``, ``output/``), es decir, lo versionado. Cada exhibit se
+renderiza en memoria con el perfil ``print`` (``export.capture``, sin tocar
+el disco) y cada archivo se compara por etapas, de la más barata a la más cara:
+
+1. bytes idénticos: ``igual``, sin decodificar nada. Las exportaciones son
+   deterministas (SVG sin fecha y con ``svg.hashsalt`` fijo, ver
+   ``toolkit.export``), así que un refactor que no cambia el gráfico cae aquí;
+2. PNG: miniatura en gris (promedio por bloques, ``THUMB_WIDTH`` px de ancho)
+   de ambas imágenes. Si ningún bloque difiere más de ``THUMB_TOLERANCE``
+   niveles, ``equivalente`` (ruido de antialiasing, otra versión de zlib);
+3. sólo si las miniaturas difieren: diff completo por píxel. Falla
+   (``distinto``) si más de ``--max-fraction`` de los píxeles difiere más de
+   ``--tolerance`` niveles en algún canal, y se escribe la imagen de
+   diferencias (píxeles cambiados en rojo sobre la línea base atenuada) en
+   ``VISUAL_DIFF_DIR``.
+
+Un SVG que no es idéntico se compara normalizado (sin bloque de metadatos, ids
+generados renumerados por orden de aparición). Si aun así difiere, se escribe
+un diff unificado ``.svg.diff``. Los archivos sin línea base se reportan como
+``nuevo`` y también fallan: una salida renombrada o que falta en el
+repositorio no debe pasar en silencio. ``--update`` las agrega.
+
+Los exhibits se verifican en paralelo (pool ``spawn`` como el del runner).
+Los que pasaron con la misma llave de ``toolkit.cache`` (código, datos,
+estilo) no se vuelven a renderizar salvo con ``--force``. ``--update``
+reescribe las líneas base que cambiaron.
+
+Uso:  python -m toolkit.visual [ids...] [--update] [--force] [--jobs N] [--tolerance 8] [--max-fraction 1e-4]
+"""
+import argparse
+import difflib
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from toolkit.index import load_index
+from toolkit.paths import REPO_ROOT, VISUAL_DIFF_DIR, VISUAL_MANIFEST_PATH
+
+MANIFEST_VERSION = 1
+THUMB_WIDTH = 256
+THUMB_TOLERANCE = 2          # niveles de gris (0-255) por bloque de la miniatura
+DEFAULT_TOLERANCE = 8        # niveles por canal en el diff completo
+DEFAULT_MAX_FRACTION = 1e-4  # fracción de píxeles distintos tolerada
+PASSING = ("igual", "equivalente")
+
+_SVG_METADATA = re.compile(rb"<metadata>.*?</metadata>\s*", re.S)
+_SVG_GENERATED_ID = re.compile(rb"\b[pm][0-9a-f]{10}\b")
+
+
+@dataclass
+class FileCheck:
+    path: str
+    status: str                 # igual | equivalente | distinto | nuevo
+    detail: str = ""
+    diff_path: Optional[str] = None
+
+
+@dataclass
+class VerifyResult:
+    exhibit_id: str
+    ok: bool
+    seconds: float = 0.0
+    files: List[FileCheck] = field(default_factory=list)
+    error: Optional[str] = None
+    skipped: bool = False       # vigente según el manifiesto: no se renderizó
+
+
+# ---------------------------
+# Comparación
+# ---------------------------
+def _decode(data):
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("RGBA"))
+
+
+def thumbnail(pixels, width=THUMB_WIDTH):
+    """
+    Miniatura en gris por promedio de bloques (el lado del bloque hace que el ancho quede <= ``width``).
+    """
+    gray = pixels[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    block = max(1, -(-gray.shape[1] // width))
+    h, w = gray.shape[0] // block * block, gray.shape[1] // block * block
+    return gray[:h, :w].reshape(h // block, block, w // block, block).mean(axis=(1, 3))
+
+
+def diff_image(current, baseline, changed):
+    """
+    Línea base atenuada con los píxeles de ``changed`` en rojo (ambas ya del mismo tamaño).
+    """
+    faded = 255 - (255 - baseline[..., :3].astype(np.float32).mean(axis=2)) * 0.3
+    out = np.repeat(faded[..., None], 3, axis=2).astype(np.uint8)
+    out[changed] = (220, 0, 0)
+    return out
+
+
+def _pad_to(pixels, shape):
+    out = np.full(shape + (4,), 255, dtype=np.uint8)
+    out[:pixels.shape[0], :pixels.shape[1]] = pixels
+    return out
+
+
+def _diff_path(path):
+    return os.path.join(VISUAL_DIFF_DIR, os.path.relpath(path, REPO_ROOT).replace(os.sep, "__"))
+
+
+def compare_png(path, data, baseline, tolerance=DEFAULT_TOLERANCE, max_fraction=DEFAULT_MAX_FRACTION):
+    from PIL import Image
+
+    current, reference = _decode(data), _decode(baseline)
+    if current.shape == reference.shape:
+        thumb_current, thumb_reference = thumbnail(current), thumbnail(reference)
+        if np.abs(thumb_current - thumb_reference).max(initial=0) <= THUMB_TOLERANCE:
+            return FileCheck(path, "equivalente", "miniaturas iguales")
+        changed = (np.abs(current.astype(np.int16) - reference).max(axis=2) > tolerance)
+        fraction = float(changed.mean())
+        if fraction <= max_fraction:
+            return FileCheck(path, "equivalente", f"{fraction:.2e} de píxeles distintos")
+        detail = f"{fraction:.2%} de píxeles distintos"
+    else:
+        detail = f"tamaño {current.shape[1]}x{current.shape[0]} vs. línea base {reference.shape[1]}x{reference.shape[0]}"
+        shape = (max(current.shape[0], reference.shape[0]), max(current.shape[1], reference.shape[1]))
+        current, reference = _pad_to(current, shape), _pad_to(reference, shape)
+        changed = (np.abs(current.astype(np.int16) - reference).max(axis=2) > tolerance)
+    diff_path = _diff_path(path)
+    os.makedirs(os.path.dirname(diff_path), exist_ok=True)
+    Image.fromarray(diff_image(current, reference, changed)).save(diff_path)
+    return FileCheck(path, "distinto", detail, diff_path)
+
+
+def normalize_svg(data):
+    """
+    SVG sin metadatos (fecha, versión) y con los ids generados renumerados por orden de aparición.
+    """
+    data = _SVG_METADATA.sub(b"", data)
+    ids = {}
+    return _SVG_GENERATED_ID.sub(lambda m: ids.setdefault(m.group(0), b"id%d" % len(ids)), data)
+
+
+def compare_svg(path, data, baseline):
+    current, reference = normalize_svg(data), normalize_svg(baseline)
+    if current == reference:
+        return FileCheck(path, "equivalente", "igual salvo metadatos e ids")
+    diff = difflib.unified_diff(reference.decode("utf-8", "replace").splitlines(),
+                                current.decode("utf-8", "replace").splitlines(),
+                                "línea base", "actual", lineterm="", n=2)
+    diff_path = _diff_path(path) + ".diff"
+    os.makedirs(os.path.dirname(diff_path), exist_ok=True)
+    with open(diff_path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(diff) + "\n")
+    return FileCheck(path, "distinto", "el SVG normalizado difiere", diff_path)
+
+
+def compare_file(path, data, tolerance=DEFAULT_TOLERANCE, max_fraction=DEFAULT_MAX_FRACTION):
+    """
+    Compara los bytes ``data`` que se escribirían en ``path`` con el archivo que ya está ahí.
+    """
+    if not os.path.exists(path):
+        return FileCheck(path, "nuevo", "sin línea base; --update la agrega")
+    with open(path, "rb") as fh:
+        baseline = fh.read()
+    if baseline == data:
+        return FileCheck(path, "igual")
+    fmt = os.path.splitext(path)[1].lower()
+    if fmt == ".png":
+        return compare_png(path, data, baseline, tolerance, max_fraction)
+    if fmt == ".svg":
+        return compare_svg(path, data, baseline)
+    return FileCheck(path, "distinto", "bytes distintos")
+
+
+# ---------------------------
+# Verificación por exhibit
+# ---------------------------
+def verify_one(exhibit_id, tolerance=DEFAULT_TOLERANCE, max_fraction=DEFAULT_MAX_FRACTION, update=False):
+    """
+    Renderiza ``exhibit_id`` en memoria y compara cada salida con su línea base
+    (en este proceso). Con ``update`` reescribe las que no pasaron.
+    """
+    from toolkit.export import _write_bytes, capture
+    from toolkit.figures import figure_scope
+    from toolkit.registry import get_exhibit
+
+    spec = get_exhibit(exhibit_id)
+    start = time.perf_counter()
+    try:
+        # Los builders que anuncian "guardado en ..." no escriben nada aquí: se silencian.
+        with figure_scope(), capture() as outputs, redirect_stdout(io.StringIO()):
+            spec.builder()
+    except Exception:
+        return VerifyResult(exhibit_id, False, time.perf_counter() - start, error=traceback.format_exc())
+    files = [compare_file(path, data, tolerance, max_fraction) for path, data in outputs.items()]
+    if update:
+        for check in files:
+            if check.status in ("distinto", "nuevo"):
+                os.makedirs(os.path.dirname(check.path), exist_ok=True)
+                _write_bytes(check.path, outputs[check.path])
+                check.status, check.detail = "actualizado", check.detail or "línea base nueva"
+    ok = all(check.status in PASSING + ("actualizado",) for check in files)
+    return VerifyResult(exhibit_id, ok, time.perf_counter() - start, files)
+
+
+def _verify_in_pool(exhibit_ids, max_workers, **options):
+    from toolkit import datasets
+    from toolkit.runner import _init_worker, available_cores
+
+    workers = min(max_workers or available_cores(), len(exhibit_ids))
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(datasets.load_all(),)) as pool:
+        submitted = {pool.submit(verify_one, exhibit_id, **options): exhibit_id for exhibit_id in exhibit_ids}
+        for future in as_completed(submitted):
+            exhibit_id = submitted[future]
+            try:
+                results[exhibit_id] = future.result()
+            except Exception:
+                results[exhibit_id] = VerifyResult(exhibit_id, False, error=traceback.format_exc())
+    return results
+
+
+def load_manifest(path=VISUAL_MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("exhibits", {}) if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def save_manifest(entries, path=VISUAL_MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump({"version": MANIFEST_VERSION, "exhibits": entries}, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def run_verification(exhibit_ids, max_workers=None, force=False, update=False,
+                     tolerance=DEFAULT_TOLERANCE, max_fraction=DEFAULT_MAX_FRACTION):
+    """
+    ``VerifyResult`` por exhibit, en el orden pedido. Los vigentes según el
+    manifiesto (misma llave y mismas líneas base) se devuelven con ``skipped=True``.
+    """
+    from toolkit.cache import exhibit_key
+    from toolkit.registry import get_exhibit, load_exhibits
+
+    load_exhibits()
+    manifest = load_manifest()
+    keys = {exhibit_id: exhibit_key(get_exhibit(exhibit_id)) for exhibit_id in exhibit_ids}
+    results, pending = {}, []
+    for exhibit_id in exhibit_ids:
+        entry = manifest.get(exhibit_id)
+        if not force and not update and entry and entry["key"] == keys[exhibit_id] \
+                and all(_stamp(path) == stamp for path, stamp in entry["baselines"].items()):
+            results[exhibit_id] = VerifyResult(exhibit_id, True, skipped=True)
+        else:
+            pending.append(exhibit_id)
+    if pending:
+        results.update(_verify_in_pool(pending, max_workers, tolerance=tolerance,
+                                       max_fraction=max_fraction, update=update))
+    for exhibit_id in pending:
+        result = results[exhibit_id]
+        if result.ok:
+            manifest[exhibit_id] = {"key": keys[exhibit_id],
+                                    "baselines": {check.path: _stamp(check.path) for check in result.files}}
+        else:
+            manifest.pop(exhibit_id, None)
+    save_manifest(manifest)
+    return [results[exhibit_id] for exhibit_id in exhibit_ids]
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def print_report(results, wall_seconds, stream=sys.stdout):
+    for result in results:
+        if result.skipped:
+            stream.write(f"VIGENTE {result.exhibit_id}\n")
+            continue
+        if result.error:
+            stream.write(f"ERROR   {result.exhibit_id}\n{result.error}\n")
+            continue
+        stream.write(f"{'OK' if result.ok else 'FALLA':<7} {result.exhibit_id:<10} {result.seconds:6.2f} s\n")
+        for check in result.files:
+            if check.status != "igual":
+                detail = f" ({check.detail})" if check.detail else ""
+                stream.write(f"    {check.status:<11} {os.path.relpath(check.path, REPO_ROOT)}{detail}\n")
+                if check.diff_path:
+                    stream.write(f"    {'':<11} diff: {os.path.relpath(check.diff_path, REPO_ROOT)}\n")
+    failed = sum(not result.ok for result in results)
+    skipped = sum(result.skipped for result in results)
+    files = [check for result in results for check in result.files]
+    counts = {status: sum(check.status == status for check in files)
+              for status in ("igual", "equivalente", "distinto", "nuevo", "actualizado")}
+    summary = ", ".join(f"{count} {status}" for status, count in counts.items() if count)
+    stream.write(f"{len(results)} exhibits ({skipped} vigentes), {failed} con diferencias o error; "
+                 f"archivos: {summary or 'ninguno'} — {wall_seconds:.2f} s\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m toolkit.visual",
+                                     description="Compara las salidas de los exhibits con las guardadas.")
+    parser.add_argument("ids", nargs="*", help="ids de exhibit (todos por defecto)")
+    parser.add_argument("--update", action="store_true", help="reescribe las líneas base que cambiaron")
+    parser.add_argument("--force", action="store_true", help="verifica también los exhibits vigentes")
+    parser.add_argument("--jobs", type=int, default=None, help="procesos del pool (núcleos disponibles)")
+    parser.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE,
+                        help="diferencia por canal (0-255) que cuenta como píxel distinto")
+    parser.add_argument("--max-fraction", type=float, default=DEFAULT_MAX_FRACTION,
+                        help="fracción de píxeles distintos tolerada")
+    args = parser.parse_args(argv)
+
+    index = load_index()
+    try:
+        ids = [index.get(exhibit_id).exhibit_id for exhibit_id in args.ids] or [e.exhibit_id for e in index.entries]
+    except KeyError as exc:
+        parser.error(exc.args[0])
+
+    from toolkit.cli import prepare_rendering
+    from toolkit.profiles import set_profile
+    set_profile("print")   # las líneas base son las salidas definitivas
+    prepare_rendering()
+    start = time.perf_counter()
+    results = run_verification(ids, args.jobs, args.force, args.update, args.tolerance, args.max_fraction)
+    print_report(results, time.perf_counter() - start)
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
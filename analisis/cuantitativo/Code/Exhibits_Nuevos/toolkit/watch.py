@@ -0,0 +1,209 @@
+"""
+Modo watch: un intérprete caliente que re-renderiza sólo lo que se editó.
+
+El proceso importa matplotlib (Agg), NumPy, el toolkit y todos los exhibits una
+sola vez, precalienta las fuentes y los datasets, y después revisa cada
+``--interval`` segundos los scripts de ``Code/Exhibits_Nuevos``, el toolkit y
+los archivos de ``DATA_DIR``:
+
+- script de exhibit: se vuelve a ejecutar (``registry.reload_script``) y se
+  renderizan sólo los exhibits cuyo builder cambió. Si cambió el resto del
+  módulo (imports, constantes, auxiliares), se renderizan todos los del script;
+- archivo de datos: se invalidan los datasets y se renderizan los exhibits que
+  lo declaran en ``inputs``;
+- módulo de ``toolkit/``: el proceso se reinicia (``os.execv``), porque los
+  exhibits ya cargados guardan referencias a las versiones anteriores.
+
+Cada render actualiza ``PREVIEW_DIR/<id>.png`` y ``PREVIEW_DIR/latest.png``
+(basta con dejarlo abierto en un visor que recargue). El perfil por defecto
+es ``draft`` (``toolkit.profiles``). No se usa la caché incremental: el watch
+siempre renderiza.
+
+Uso:  python -m toolkit.watch [ids...] [--profile draft|web|print] [--interval 0.2]
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from glob import glob
+
+from toolkit.cli import prepare_rendering
+from toolkit.index import builder_fingerprints, exhibit_scripts
+from toolkit.paths import CODE_DIR, DATA_DIR, PREVIEW_DIR
+from toolkit.profiles import PROFILES, set_profile
+
+POLL_INTERVAL = 0.2
+TOOLKIT_DIR = os.path.join(CODE_DIR, "toolkit")
+
+
+def _stamps(paths):
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stamps[path] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def _warm_up():
+    # Primer dibujo de texto: carga FreeType y las fuentes por defecto fuera del ciclo de edición.
+    from toolkit.figures import managed_figure
+
+    with managed_figure(figsize=(2, 1)) as (fig, ax):
+        ax.set_title("Exhibit")
+        fig.canvas.draw()
+
+
+class Watcher:
+    def __init__(self, focus=None, interval=POLL_INTERVAL, stream=sys.stdout):
+        from toolkit import datasets
+        from toolkit.registry import all_exhibits, load_exhibits
+
+        load_exhibits()
+        datasets.load_all()
+        _warm_up()
+        self.focus = set(focus) if focus else None
+        self.interval = interval
+        self.stream = stream
+        self.specs = {spec.exhibit_id: spec for spec in all_exhibits()}
+        self.fingerprints = {}
+        for script in exhibit_scripts():
+            try:
+                self.fingerprints[script] = builder_fingerprints(script)
+            except SyntaxError:
+                self.fingerprints[script] = (None, {})
+        self.stamps = _stamps(self._watched())
+
+    def _watched(self):
+        return (exhibit_scripts() + glob(os.path.join(TOOLKIT_DIR, "*.py"))
+                + glob(os.path.join(DATA_DIR, "*")))
+
+    def log(self, message):
+        self.stream.write(f"[{time.strftime('%H:%M:%S')}] {message}\n")
+        self.stream.flush()
+
+    def poll(self):
+        """
+        Rutas que cambiaron (o aparecieron/desaparecieron) desde la revisión anterior.
+        """
+        stamps = _stamps(self._watched())
+        changed = sorted(path for path in set(stamps) | set(self.stamps) if stamps.get(path) != self.stamps.get(path))
+        self.stamps = stamps
+        return changed
+
+    def _script_changed(self, script):
+        from toolkit.registry import all_exhibits, reload_script
+
+        old_module, old_builders = self.fingerprints.get(script, (None, {}))
+        try:
+            module, builders = builder_fingerprints(script)
+            reload_script(script)
+        except Exception as exc:
+            # A medio editar: se conserva la versión anterior hasta el siguiente guardado.
+            self.log(f"{os.path.basename(script)}: {type(exc).__name__}: {exc}")
+            return []
+        self.fingerprints[script] = (module, builders)
+        self.specs = {spec.exhibit_id: spec for spec in all_exhibits()}
+        if module != old_module:
+            return sorted(builders)
+        return sorted(exhibit_id for exhibit_id, digest in builders.items() if old_builders.get(exhibit_id) != digest)
+
+    def _data_changed(self, path):
+        from toolkit import datasets
+
+        datasets.clear()
+        path = os.path.abspath(path)
+        return sorted(exhibit_id for exhibit_id, spec in self.specs.items() if path in spec.inputs)
+
+    def affected(self, changed):
+        """
+        Exhibits a renderizar por ``changed``; ``None`` si hay que reiniciar el proceso.
+        """
+        scripts = set(exhibit_scripts())
+        ids = []
+        for path in changed:
+            if path in scripts:
+                ids += self._script_changed(path)
+            elif os.path.dirname(path) == TOOLKIT_DIR:
+                return None
+            else:
+                ids += self._data_changed(path)
+        ids = list(dict.fromkeys(ids))
+        return [exhibit_id for exhibit_id in ids if self.focus is None or exhibit_id in self.focus]
+
+    def render(self, exhibit_id, saved_at=None):
+        from toolkit.runner import build_one
+
+        result = build_one(exhibit_id)
+        if not result.ok:
+            self.log(f"{exhibit_id}: ERROR\n{result.error}")
+            return None
+        preview = self._update_preview(exhibit_id, result.outputs)
+        latency = f", {time.time() - saved_at:.2f} s desde el guardado" if saved_at else ""
+        self.log(f"{exhibit_id}: {result.seconds:.2f} s de render{latency} → {preview or '(sin PNG)'}")
+        return preview
+
+    def _update_preview(self, exhibit_id, outputs):
+        png = next((path for path in outputs if path.endswith(".png")), None)
+        if png is None:
+            return None
+        os.makedirs(PREVIEW_DIR, exist_ok=True)
+        preview = os.path.join(PREVIEW_DIR, f"{exhibit_id}.png")
+        latest = os.path.join(PREVIEW_DIR, "latest.png")
+        for target in (preview, latest):
+            tmp_path = target + ".tmp"
+            shutil.copyfile(png, tmp_path)
+            os.replace(tmp_path, target)   # el visor nunca ve un PNG a medio escribir
+        return preview
+
+    def run(self):
+        if self.focus:
+            for exhibit_id in sorted(self.focus):
+                self.render(exhibit_id)
+        self.log(f"Vigilando {CODE_DIR} y {DATA_DIR} (Ctrl+C para salir)")
+        while True:
+            time.sleep(self.interval)
+            changed = self.poll()
+            if not changed:
+                continue
+            saved_at = max(self.stamps.get(path, (0, 0))[0] for path in changed) / 1e9 or None
+            ids = self.affected(changed)
+            if ids is None:
+                return changed
+            for exhibit_id in ids:
+                self.render(exhibit_id, saved_at)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(prog="python -m toolkit.watch",
+                                     description="Re-renderiza los exhibits editados en un proceso caliente.")
+    parser.add_argument("ids", nargs="*", help="exhibits a vigilar y renderizar al inicio (todos por defecto)")
+    parser.add_argument("--profile", choices=PROFILES, default="draft", help="perfil de render (draft)")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="segundos entre revisiones")
+    args = parser.parse_args(argv)
+
+    set_profile(args.profile)
+    prepare_rendering()
+    from toolkit.index import load_index
+    index = load_index()
+    try:
+        focus = [index.get(exhibit_id).exhibit_id for exhibit_id in args.ids]
+    except KeyError as exc:
+        parser.error(exc.args[0])
+
+    watcher = Watcher(focus, args.interval)
+    try:
+        changed = watcher.run()
+    except KeyboardInterrupt:
+        return 0
+    watcher.log(f"{', '.join(os.path.relpath(p, CODE_DIR) for p in changed)} cambió: reiniciando el proceso")
+    os.chdir(CODE_DIR)
+    os.execv(sys.executable, [sys.executable, "-m", "toolkit.watch"] + list(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())